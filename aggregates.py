@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+메시지 집계 모듈
+새로 수집된 메시지만 반영해 시간 창(최근 1분/15분/1시간 등)별 개수와 필드 값별 개수를 유지
+(메시지 1개당 O(1), 전체 이력을 다시 훑지 않음)
+"""
+
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+import time
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from config import AGGREGATE_WINDOWS, AGGREGATE_FIELDS, AGGREGATE_BUCKET_SECONDS, AGGREGATE_SEEN_LIMIT
+
+logger = logging.getLogger(__name__)
+
+def parse_timestamp(value) -> Optional[float]:
+    """ISO 8601 시각 → 유닉스 시간(초) (시간대 정보가 없으면 UTC로 간주, 해석 실패 시 None)"""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+class SlidingWindow:
+    """고정 크기 버킷 링으로 구현한 슬라이딩 시간 창 (키별 합계를 따로 유지해 조회 시 버킷 합산 불필요)"""
+
+    def __init__(self, seconds: int, bucket_seconds: int):
+        self.seconds = seconds
+        self.bucket_seconds = bucket_seconds
+        self.size = max(seconds // bucket_seconds, 1)
+        self._slots = [None] * self.size  # (버킷 번호, Counter)
+        self.totals = Counter()
+
+    def _expire_slot(self, index: int):
+        slot = self._slots[index]
+        if slot is not None:
+            self.totals.subtract(slot[1])
+            self._slots[index] = None
+
+    def add(self, ts: float, keys: Iterable[str], now: float) -> bool:
+        """ts 시각의 메시지 1개 반영 (창 밖이면 False)"""
+        now_bucket = int(now // self.bucket_seconds)
+        bucket = min(int(ts // self.bucket_seconds), now_bucket)  # 시계 오차로 미래 시각이면 현재로 간주
+        if bucket <= now_bucket - self.size:
+            return False
+
+        index = bucket % self.size
+        slot = self._slots[index]
+        if slot is None or slot[0] != bucket:
+            self._expire_slot(index)
+            slot = self._slots[index] = (bucket, Counter())
+        for key in keys:
+            slot[1][key] += 1
+            self.totals[key] += 1
+        return True
+
+    def expire(self, now: float):
+        """창을 벗어난 버킷 제거 (조회 시 1회, 버킷 수에 비례)"""
+        oldest = int(now // self.bucket_seconds) - self.size
+        for index, slot in enumerate(self._slots):
+            if slot is not None and slot[0] <= oldest:
+                self._expire_slot(index)
+        self.totals = +self.totals  # 0 이하 항목 정리
+
+class MessageAggregator:
+    """새 메시지(id 기준)를 시간 창별로 집계 (created_at 기준, 없으면 수집 시각)"""
+
+    def __init__(self, windows: Dict[str, int] = None, fields: List[str] = None,
+                 bucket_seconds: int = AGGREGATE_BUCKET_SECONDS, seen_limit: int = AGGREGATE_SEEN_LIMIT):
+        windows = AGGREGATE_WINDOWS if windows is None else windows
+        self.fields = AGGREGATE_FIELDS if fields is None else fields
+        self.windows = {name: SlidingWindow(int(seconds), bucket_seconds) for name, seconds in windows.items()}
+        self.lifetime = Counter()
+        self.seen_limit = seen_limit
+        self._seen = OrderedDict()  # 최근에 본 메시지 id (오래된 것부터 제거)
+
+    def _keys(self, msg: Dict) -> List[str]:
+        """집계 키 목록 ("total", "<필드>:<값>")"""
+        keys = ["total"]
+        for field in self.fields:
+            value = msg.get(field)
+            if value is not None:
+                keys.append(f"{field}:{value}")
+        return keys
+
+    def ingest(self, messages: List[Dict], now: Optional[float] = None) -> int:
+        """이번 사이클에 조회한 메시지 중 처음 본 메시지만 반영, 반영한 개수 반환"""
+        now = time.time() if now is None else now
+        added = 0
+        for msg in messages:
+            msg_id = msg.get("id")
+            if msg_id is not None:
+                if msg_id in self._seen:
+                    continue
+                self._seen[msg_id] = None
+                if len(self._seen) > self.seen_limit:
+                    self._seen.popitem(last=False)
+
+            ts = parse_timestamp(msg.get("created_at"))
+            keys = self._keys(msg)
+            self.lifetime.update(keys)
+            for window in self.windows.values():
+                window.add(now if ts is None else ts, keys, now)
+            added += 1
+        return added
+
+    @staticmethod
+    def _group(counts: Counter) -> Dict:
+        """{"total": n, "<필드>": {"<값>": n}} 형태로 변환"""
+        result = {"total": counts.get("total", 0)}
+        for key, count in counts.items():
+            if key == "total":
+                continue
+            field, value = key.split(":", 1)
+            result.setdefault(field, {})[value] = count
+        return result
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        """스냅샷 metadata에 넣을 집계 (JSON 직렬화 가능)"""
+        now = time.time() if now is None else now
+        windows = {}
+        for name, window in self.windows.items():
+            window.expire(now)
+            grouped = self._group(window.totals)
+            grouped["perMinute"] = round(grouped["total"] * 60 / window.seconds, 2)
+            windows[name] = grouped
+        return {
+            "computedAt": datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+            "windows": windows,
+            "lifetime": self._group(self.lifetime)
+        }
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+과거 메시지 백필 도구
+기간을 나눠 export 엔드포인트에서 병렬로 내려받고, 기간별 파일과 체크포인트로 중단 지점부터 이어받기
+
+사용법:
+    python backfill.py [--start 2025-01-01] [--end 2025-01-31] [--chunk-days 7] [--workers 4] [--out ./archive]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    DEFAULT_START_DATE, DEFAULT_END_DATE, BACKFILL_OUTPUT_DIR, BACKFILL_CHUNK_DAYS, BACKFILL_WORKERS
+)
+from db_client import DBClient, split_date_range, first_open_day
+from logger import get_logger
+
+CHECKPOINT_FILENAME = "backfill_checkpoint.json"
+ARCHIVE_FILENAME = "messages_archive.jsonl"
+
+class Backfill:
+    """기간 분할 병렬 백필 (기간별 결과는 chunks/ 폴더에 바로 기록)"""
+
+    def __init__(self, output_dir: str = BACKFILL_OUTPUT_DIR, workers: int = BACKFILL_WORKERS,
+                 db_client: Optional[DBClient] = None):
+        self.logger = get_logger("Backfill")
+        self.output_dir = output_dir
+        self.chunk_dir = os.path.join(output_dir, "chunks")
+        self.workers = max(int(workers), 1)
+        self.db_client = db_client or DBClient()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        self.checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILENAME)
+        self.checkpoint = self._load_checkpoint()
+
+    # ------------------------------------------------------------------
+    # 체크포인트
+    # ------------------------------------------------------------------
+    def _load_checkpoint(self) -> Dict:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"done": {}}
+
+    def _save_checkpoint(self):
+        """체크포인트 기록 (임시 파일 후 교체, 호출자가 _lock 보유)"""
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoint, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    @staticmethod
+    def _chunk_key(chunk: Tuple[str, str]) -> str:
+        return f"{chunk[0]}_{chunk[1]}"
+
+    def _chunk_path(self, chunk: Tuple[str, str]) -> str:
+        return os.path.join(self.chunk_dir, f"messages_{self._chunk_key(chunk)}.jsonl")
+
+    def _is_done(self, chunk: Tuple[str, str]) -> bool:
+        """이미 받은 기간인지 (기간이 끝나기 전에 받은 기록은 완료로 보지 않음)"""
+        entry = self.checkpoint["done"].get(self._chunk_key(chunk))
+        return (entry is not None and entry.get("fetchedAt", "")[:10] > chunk[1]
+                and os.path.exists(self._chunk_path(chunk)))
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+    def _fetch_chunk(self, chunk: Tuple[str, str]) -> Optional[int]:
+        """기간 1개 조회 → JSON Lines 파일로 기록 후 체크포인트 갱신 (실패 시 None)
+
+        아직 끝나지 않은 날짜(오늘 등)가 포함된 기간은 체크포인트에 남기지 않아 다시 실행하면 새로 받음
+        """
+        messages = self.db_client.export_messages(*chunk)
+        if messages is None:
+            return None
+
+        path = self._chunk_path(chunk)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for msg in messages:
+                f.write(json.dumps(msg, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+
+        if chunk[1] >= first_open_day():
+            self.logger.info(f"📦 {chunk[0]} ~ {chunk[1]}: 아직 메시지가 추가될 수 있는 기간이라 완료 처리하지 않습니다")
+            return len(messages)
+
+        with self._lock:
+            self.checkpoint["done"][self._chunk_key(chunk)] = {
+                "count": len(messages),
+                "fetchedAt": datetime.now().isoformat(timespec="seconds")
+            }
+            self._save_checkpoint()
+        return len(messages)
+
+    def run(self, start_date: str, end_date: Optional[str], chunk_days: int) -> bool:
+        """백필 실행 (이미 받은 기간은 건너뜀), 모든 기간 성공 시 True"""
+        chunks = split_date_range(start_date, end_date, chunk_days)
+        pending = [chunk for chunk in chunks if not self._is_done(chunk)]
+        self.logger.info(f"📦 백필 시작: {start_date} ~ {end_date or '오늘'} "
+                         f"({len(chunks)}개 기간 중 {len(chunks) - len(pending)}개 완료됨, 동시 {self.workers}개)")
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Backfill") as executor:
+            futures = {executor.submit(self._fetch_chunk, chunk): chunk for chunk in pending}
+            for index, future in enumerate(as_completed(futures), 1):
+                chunk = futures[future]
+                try:
+                    count = future.result()
+                except Exception as e:
+                    self.logger.error_emoji(f"기간 {chunk[0]} ~ {chunk[1]} 처리 오류: {e}")
+                    count = None
+
+                if count is None:
+                    failed.append(chunk)
+                    self.logger.error_emoji(f"[{index}/{len(pending)}] {chunk[0]} ~ {chunk[1]} 실패")
+                else:
+                    self.logger.progress(f"[{index}/{len(pending)}] {chunk[0]} ~ {chunk[1]}: {count}개")
+
+        if failed:
+            self.logger.warning_emoji(f"{len(failed)}개 기간 실패 - 다시 실행하면 실패한 기간부터 이어받습니다")
+            return False
+
+        total = self.merge(chunks)
+        self.logger.success(f"백필 완료: {total}개 메시지 → {os.path.join(self.output_dir, ARCHIVE_FILENAME)}")
+        return True
+
+    def merge(self, chunks: List[Tuple[str, str]]) -> int:
+        """기간별 파일을 순서대로 이어 하나의 아카이브로 기록 (id 중복 제거, 한 줄씩 처리)"""
+        archive_path = os.path.join(self.output_dir, ARCHIVE_FILENAME)
+        tmp_path = f"{archive_path}.tmp"
+        seen_ids = set()
+        total = 0
+
+        with open(tmp_path, 'w', encoding='utf-8') as archive:
+            for chunk in chunks:
+                with open(self._chunk_path(chunk), 'r', encoding='utf-8') as f:
+                    for line in f:
+                        msg_id = json.loads(line).get("id")
+                        if msg_id is not None:
+                            if msg_id in seen_ids:
+                                continue
+                            seen_ids.add(msg_id)
+                        archive.write(line)
+                        total += 1
+        os.replace(tmp_path, archive_path)
+        return total
+
+    def close(self):
+        self.db_client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="export 엔드포인트로 과거 메시지 전체를 내려받습니다")
+    parser.add_argument("--start", default=DEFAULT_START_DATE, help="시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--end", default=DEFAULT_END_DATE, help="종료 날짜 (YYYY-MM-DD, 기본: 오늘)")
+    parser.add_argument("--chunk-days", type=int, default=BACKFILL_CHUNK_DAYS, help="요청 1건의 기간(일)")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS, help="동시 요청 수")
+    parser.add_argument("--out", default=BACKFILL_OUTPUT_DIR, help="저장 폴더")
+    args = parser.parse_args()
+
+    backfill = Backfill(args.out, args.workers)
+    try:
+        success = backfill.run(args.start, args.end, args.chunk_days)
+    except KeyboardInterrupt:
+        print("\n사용자에 의해 중단되었습니다. 다시 실행하면 이어받습니다.")
+        success = False
+    finally:
+        backfill.close()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
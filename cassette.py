@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+카세트 모듈
+API 응답 녹화(record) 및 재생(replay)을 담당
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, Optional
+import logging
+
+from requests.structures import CaseInsensitiveDict
+
+from config import API_ENDPOINTS
+
+logger = logging.getLogger(__name__)
+
+REDACTED = "[REDACTED]"
+
+# 카세트에 남기지 않을 응답 헤더 (소문자)
+_SENSITIVE_HEADERS = {"authorization", "set-cookie", "cookie"}
+
+def _redact_tokens(value):
+    """JSON 값에서 이름에 token이 들어간 키의 값을 가림 (응답 구조는 유지해 재생 시 로그인 흐름은 그대로)"""
+    if isinstance(value, dict):
+        return {key: REDACTED if "token" in key.lower() and value[key] is not None else _redact_tokens(value[key])
+                for key in value}
+    if isinstance(value, list):
+        return [_redact_tokens(item) for item in value]
+    return value
+
+def _redact_body(text: str) -> str:
+    """로그인 응답 본문의 토큰 제거 (JSON이 아니면 본문 전체 제거)"""
+    try:
+        return json.dumps(_redact_tokens(json.loads(text)), ensure_ascii=False)
+    except ValueError:
+        return REDACTED if text else text
+
+class CassetteRecorder:
+    """API 응답을 카세트 파일(gzip 압축 JSON Lines)로 녹화하는 클래스"""
+
+    def __init__(self, path: str, redact_endpoints: Iterable[str] = (API_ENDPOINTS["login"],)):
+        self.path = path
+        self.redact_endpoints = set(redact_endpoints)  # 응답 본문의 토큰을 가릴 엔드포인트
+        self.recorded_count = 0
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+        cassette_dir = os.path.dirname(path)
+        if cassette_dir and not os.path.exists(cassette_dir):
+            os.makedirs(cassette_dir)
+
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        logger.info(f"🎙️ API 응답 녹화 시작: {path}")
+
+    def record(self, method: str, endpoint: str, response, started_at: float):
+        """응답 1건 기록 (started_at: 요청 시작 시각, time.monotonic 기준)
+
+        카세트 파일은 암호화되지 않으므로 인증 헤더와 로그인 응답의 토큰은 가려서 기록
+        """
+        headers = {name: REDACTED if name.lower() in _SENSITIVE_HEADERS else value
+                   for name, value in response.headers.items()}
+        body = _redact_body(response.text) if endpoint in self.redact_endpoints else response.text
+        entry = {
+            "t": round(started_at - self._start, 4),
+            "elapsed": round(response.elapsed.total_seconds(), 4),
+            "method": method,
+            "endpoint": endpoint,
+            "status": response.status_code,
+            "headers": headers,
+            "body": body
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            # 강제 종료 시에도 녹화분이 남도록 레코드마다 flush
+            self._file.flush()
+            self.recorded_count += 1
+
+    def close(self):
+        """카세트 파일 닫기"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info(f"🎙️ API 응답 녹화 종료: {self.recorded_count}건 → {self.path}")
+
+class ReplayResponse:
+    """카세트에서 복원한 응답 (requests.Response 호환 최소 인터페이스)"""
+
+    def __init__(self, entry: Dict):
+        self.status_code = entry.get("status", 0)
+        self.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        self.text = entry.get("body", "")
+        self.content = self.text.encode('utf-8')
+        self.elapsed = timedelta(seconds=entry.get("elapsed", 0))
+
+    def json(self):
+        """응답 본문 JSON 파싱 (실패 시 json.JSONDecodeError)"""
+        return json.loads(self.text)
+
+class CassettePlayer:
+    """카세트 파일을 녹화 당시의 시간 간격(또는 배속)으로 재생하는 클래스"""
+
+    def __init__(self, path: str, speed: float = 1.0):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"카세트 파일이 없습니다: {path}")
+
+        self.path = path
+        self.speed = speed
+        self.replayed_count = 0
+        self.exhausted = False
+        self._entries = self._read_entries()
+        self._start = None
+        logger.info(f"▶️ API 응답 재생 준비: {path} (배속: {speed if speed > 0 else '최대'})")
+
+    def _read_entries(self) -> Iterator[Dict]:
+        """카세트 레코드를 한 줄씩 읽기 (전체를 메모리에 올리지 않음)"""
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def _wait_until(self, offset: float):
+        """재생 시작 시점 기준 offset(녹화 시간)에 도달할 때까지 대기"""
+        if self.speed <= 0:
+            return
+
+        if self._start is None:
+            # 첫 응답 시점을 재생 기준점으로 사용
+            self._start = time.monotonic() - offset / self.speed
+            return
+
+        delay = self._start + offset / self.speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def next_response(self, method: str, endpoint: str) -> Optional[ReplayResponse]:
+        """다음 녹화 응답 반환 (카세트가 끝나면 None)"""
+        for entry in self._entries:
+            if entry.get("method") != method or entry.get("endpoint") != endpoint:
+                logger.debug(f"⏭️ 요청 불일치로 건너뜀: {entry.get('method')} {entry.get('endpoint')}")
+                continue
+
+            self._wait_until(entry.get("t", 0) + entry.get("elapsed", 0))
+            self.replayed_count += 1
+            return ReplayResponse(entry)
+
+        if not self.exhausted:
+            self.exhausted = True
+            logger.info(f"⏹️ 카세트 재생 완료: {self.replayed_count}건 재생")
+        return None
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+회로 차단기 모듈
+API 서버 장애가 이어지면 일정 시간 요청을 차단하고, 이후 1건만 시험 요청(half-open)
+"""
+
+import threading
+import time
+from typing import Dict
+import logging
+
+from config import BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 회로 차단기 (closed → open → half_open → closed/open)"""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 cooldown: float = BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trip_count = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def remaining_cooldown(self) -> float:
+        """차단 해제(시험 요청)까지 남은 시간(초)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(self._opened_at + self.cooldown - time.monotonic(), 0.0)
+
+    def allow_request(self) -> bool:
+        """요청 허용 여부 (open 상태에서 대기 시간이 지나면 시험 요청 1건만 허용)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+                logger.info("🔌 회로 반개방: 시험 요청 1건 허용")
+            # half_open: 진행 중인 시험 요청이 없을 때만 허용
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("🔌 회로 복구: API 요청 재개")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.trip_count += 1
+                    logger.warning(f"⛔ 회로 차단: 연속 {self.consecutive_failures}회 실패, "
+                                   f"{self.cooldown}초 동안 API 요청 중지")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def record_inconclusive(self):
+        """서버 상태를 판단할 수 없는 결과 (예상치 못한 예외, 사이클 제한 시간 초과 등)
+
+        반개방 상태의 시험 요청이었다면 시험 요청을 해제하고 다시 차단 (대기 후 새 시험 요청 허용)
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                logger.warning(f"⛔ 시험 요청 결과를 확인할 수 없어 {self.cooldown}초 후 다시 시험합니다")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def get_status(self) -> Dict:
+        """상태 요약 (JSON 직렬화 가능)"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trip_count": self.trip_count,
+            "retry_in": round(self.remaining_cooldown(), 1)
+        }
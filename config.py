@@ -8,29 +8,170 @@ ArtistSul CMS 데이터베이스 연동 설정
 BASE_URL = "https://artistsul-cms-worker.directorkim.workers.dev"
 JWT_TOKEN = "None"
 
+# 세션 토큰 자동 관리 (계정 정보는 환경 변수 또는 .env 파일로 전달, config.py에 저장하지 않음)
+LOGIN_ID_FIELD = "username"  # 로그인 요청 본문의 계정 필드 이름 ("username" 또는 "email")
+LOGIN_ID_ENV = "CMS_LOGIN_ID"
+LOGIN_PASSWORD_ENV = "CMS_PASSWORD"
+TOKEN_CACHE_PATH = "./cache/session_token"  # 재시작 후 재사용할 토큰 (Windows: DPAPI 암호화)
+TOKEN_REFRESH_MARGIN = 300  # 만료 몇 초 전에 미리 갱신할지 (토큰 수명의 절반을 넘지 않음)
+TOKEN_MIN_LOGIN_INTERVAL = 30  # 자동 로그인 사이 최소 간격(초), 로그인 엔드포인트 과부하 방지
+LOGIN_DEADLINE = 30  # 로그인 요청(재시도 포함) 제한 시간(초), 수집 사이클 제한과 별도
+LOGIN_RETRY_BUDGET = 2  # 로그인 요청의 재시도 횟수, 수집 사이클 재시도 예산과 별도
+
 # 출력 설정
 OUTPUT_DIR = "C:/HMG-messagw-visualizer/Assets/StreamingAssets"
 JSON_FILENAME_PREFIX = "messages"
 JSON_FILENAME = "messages.json"  # 고정 파일명 (갱신 방식)
-USE_FIXED_FILENAME = True  # True: 고정 파일명, False: 타임스탬프 포함
+USE_FIXED_FILENAME = True  # True: 고정 파일만 갱신, False: 고정 파일 갱신 + 변경 이력을 HISTORY_DIR에 보관
+
+# 스냅샷 이력 설정 (USE_FIXED_FILENAME = False일 때, 주기적 전체 스냅샷 + 변경분을 세그먼트 파일로 보관)
+HISTORY_DIR = "./history"
+HISTORY_FULL_INTERVAL = 3600  # 전체 스냅샷(새 세그먼트) 간격(초), 그 사이에는 메시지가 바뀐 사이클의 변경분만 기록
+HISTORY_RETENTION_DAYS = 7  # 마지막 기록이 이보다 오래된 세그먼트는 index.json 기준으로 삭제
+
+# 출력 스키마 (메시지 1개의 출력 구조, 시작 시 한 번 컴파일되어 매 사이클 재사용)
+# 문자열: 같은 이름의 필드를 그대로 출력
+# dict: name(출력 이름), source(원본 필드, 생략 시 name), default(값이 없을 때),
+#       truncate(최대 글자 수), epoch("s" 또는 "ms": ISO 시각 → 유닉스 시간)
+OUTPUT_SCHEMA = [
+    "id", "author", "content", "timestamp", "status", "language", "created_at", "updated_at",
+    # {"name": "preview", "source": "content", "truncate": 40, "default": ""},
+    # {"name": "createdAtMs", "source": "created_at", "epoch": "ms"},
+    # {"name": "duplicateOf", "default": None},  # DEDUP_ACTION = "mark"일 때 중복 메시지의 원본 id
+]
+
+# 분할 출력 설정 (화면별로 필요한 메시지만 messages.<name>.json으로 추가 저장, 전체 파일은 그대로 유지)
+# field(OUTPUT_SCHEMA의 출력 이름) 값이 value와 같은(value가 리스트면 그중 하나인) 메시지를 최신순으로 최대 limit개 저장
+# 필드 값별 최신 메시지는 사이클마다 누적 유지되므로, 전체 최신 FETCH_LIMIT개에 없는 값도 limit개까지 채워짐
+OUTPUT_SHARDS = [
+    # {"name": "ko", "field": "language", "value": "ko", "limit": 30},
+    # {"name": "en", "field": "language", "value": "en", "limit": 30},
+    # {"name": "approved", "field": "status", "value": ["approved", "active"], "limit": 50},
+]
+PARTITION_LIMIT = 50  # 분할 출력에 limit이 없을 때 필드 값별로 유지할 개수
+
+# 추가 출력 대상 (OUTPUT_DIR과 같은 파일을 병렬로 복사 기록, 느린 대상이 로컬 출력을 지연시키지 않음)
+OUTPUT_TARGETS = [
+    # {"name": "display2", "path": "//DISPLAY-PC2/StreamingAssets", "timeout": 3},
+    # {"name": "backup", "path": "D:/backup/messages"},
+]
+OUTPUT_WRITE_TIMEOUT = 5  # 로컬 기록 대기 시간(초), 다른 대상은 기다리지 않고 이 시간을 넘기도록 끝나지 않으면 시간 초과로 집계
+OUTPUT_WRITER_THREADS = 4
+
+# 집계 설정 (새로 수집된 메시지만 반영해 스냅샷 metadata.aggregates로 출력, 시각화 앱의 재계산 불필요)
+AGGREGATE_WINDOWS = {"1m": 60, "15m": 900, "1h": 3600}  # 이름: 최근 몇 초 (created_at 기준)
+AGGREGATE_FIELDS = ["language", "status"]  # 값별 개수를 셀 원본 필드
+AGGREGATE_BUCKET_SECONDS = 10  # 시간 창 해상도(초)
+AGGREGATE_SEEN_LIMIT = 10000  # 중복 집계 방지용으로 기억할 최근 메시지 id 개수
+
+# 검색 색인 설정 (content 역색인, 엔진 "search" 명령으로 조회)
+SEARCH_INDEX_MAX_DOCS = 200000  # 색인에 유지할 최대 메시지 수 (오래된 것부터 제외)
+SEARCH_HIGHLIGHT_KEYWORDS = []  # 캠페인 키워드 (현재 스냅샷에서 포함 메시지 id를 metadata.highlights로 출력)
+SEARCH_INDEX_EXPORT = False  # True: 색인이 바뀔 때 OUTPUT_DIR에 SEARCH_INDEX_FILENAME으로 내보내기
+SEARCH_INDEX_FILENAME = "messages.index.json"
+
+# 검열 설정 (금칙어 목록 파일: 한 줄에 하나, #으로 시작하면 주석, 문장부호는 무시하고 비교)
+# 띄어쓰기 경계는 넘지 않음 ("시 발표"는 "시발"과 불일치), 띄어쓰기까지 무시할 단어는 앞에 ~ (예: ~시발)
+MODERATION_ENABLED = False
+MODERATION_WORDLIST_PATH = "./moderation/banned_words.txt"  # 파일이 바뀌면 다음 사이클에 자동 반영
+MODERATION_ACTION = "drop"  # "drop": 금칙어 포함 메시지 제외, "tag": flagged/flaggedWords 필드 추가 (OUTPUT_SCHEMA에 이름을 넣어야 출력)
+MODERATION_CACHE_LIMIT = 10000  # 판정 결과를 기억할 최근 메시지 수
+
+# 중복 메시지 감지 (content의 SimHash로 시간 창 안의 거의 같은 메시지 판정)
+DEDUP_ENABLED = False  # 판정 결과는 OUTPUT_SCHEMA에 duplicateOf/duplicateCount를 넣거나 "collapse"일 때만 출력에 반영
+DEDUP_ACTION = "mark"  # "mark": duplicateOf/duplicateCount 필드 추가 (OUTPUT_SCHEMA에 이름을 넣어야 출력), "collapse": 중복 메시지 제외
+DEDUP_WINDOW = 600  # 이 시간(초) 안에 등록된 메시지끼리만 비교
+DEDUP_MAX_DISTANCE = 3  # 64비트 SimHash 해밍 거리가 이 값 이하이면 중복
+DEDUP_MIN_LENGTH = 3  # 비교할 최소 글자 수 (공백 제외, 이보다 짧은 메시지는 중복 판정하지 않음)
+DEDUP_HISTORY_LIMIT = 10000  # 판정 결과를 기억할 최근 메시지 수
 
 # 실행 설정
 INTERVAL_SECONDS = 5  # 최소 5초 강제
 FETCH_LIMIT = 50
 AUTO_START = True  # 프로그램 실행 시 자동으로 데이터 수집 시작
 
+# 수집 엔진 설정 (GUI 등 모니터가 로컬 소켓으로 접속)
+ENGINE_HOST = "127.0.0.1"
+ENGINE_PORT = 12346  # 엔진 제어 포트 (바인딩 성공 = 엔진 단일 실행 보장)
+ENGINE_LOG_BUFFER_SIZE = 1000  # 모니터에 제공할 최근 로그 개수
+
+# 월 서버 설정 (같은 PC의 시각화 앱에 메모리의 최신 스냅샷을 HTTP/WebSocket으로 제공)
+WALL_SERVER_ENABLED = False
+WALL_SERVER_HOST = "127.0.0.1"
+WALL_SERVER_PORT = 8765  # http://127.0.0.1:8765/messages.json, ws://127.0.0.1:8765/ws
+WALL_ALLOWED_ORIGINS = []  # 접속을 허용할 웹 페이지 Origin (예: "http://localhost:3000", file:// 페이지는 "null"), Origin 헤더가 없는 앱과 같은 서버 주소는 항상 허용
+
+# 공유 메모리 배포 설정 (같은 PC의 시각화 앱이 파일 대신 메모리에서 직접 읽기, 파일 저장은 그대로 유지)
+SHM_ENABLED = False
+SHM_NAME = "hmg_message_wall"  # 공유 메모리 이름 (Windows: MemoryMappedFile.OpenExisting 이름과 동일)
+SHM_SLOT_SIZE = 4 * 1024 * 1024  # 스냅샷 1개 최대 크기 (이중 버퍼이므로 실제 사용량은 약 2배)
+
 # 로그 설정
 LOG_TO_CONSOLE = True
-LOG_TO_FILE = True
+LOG_TO_FILE = True  # 수집 엔진(main.py) 프로세스만 로그 파일에 기록 (GUI/도구 스크립트는 콘솔만)
 LOG_FILE_PATH = "./logs/app.log"
+LOG_LEVEL = "INFO"  # 이 레벨 미만의 로그는 메시지 생성 자체를 생략 (DEBUG: 응답 헤더/본문까지 기록)
+LOG_ROTATE_WHEN = None  # None: 크기 기준 회전, "midnight" 등: 시간 기준 회전 (TimedRotatingFileHandler 형식)
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 크기 기준 회전 시 파일 하나의 최대 크기 (10MB)
+LOG_BACKUP_COUNT = 14  # 보관할 이전 로그 파일 개수
+LOG_COMPRESS_BACKUPS = True  # 회전된 로그 파일 gzip 압축
+
+# 요청 추적 설정
+TRACE_BUFFER_SIZE = 500  # 메모리에 보관할 최근 요청 span 개수
+TRACE_SAMPLE_RATE = 0.02  # 로그로 출력할 span 비율 (0.02: 50건 중 1건)
+TRACE_DUMP_DIR = "./logs/traces"  # 요청 실패 시 링 버퍼 전체를 덤프할 폴더
+TRACE_DUMP_MIN_INTERVAL = 60  # 덤프 최소 간격(초), 장애 중 매 사이클 덤프 방지
+
+# GUI 로그 화면 설정
+GUI_LOG_MAX_LINES = 1000  # 로그 창에 유지할 최대 줄 수 (전체 로그는 로그 파일 참고)
+GUI_LOG_REFRESH_MS = 100  # 로그 창 갱신 주기(밀리초)
+GUI_POLL_MS = 1000  # 엔진 상태/로그 조회 주기(밀리초)
 
 # 재시도 설정
-MAX_RETRIES = 3
-RETRY_DELAY = 5
+MAX_RETRIES = 3  # 요청 1건의 최대 시도 횟수
+RETRY_DELAY = 5  # 백오프 기준 시간(초), 실제 대기는 0 ~ RETRY_DELAY * 2^n 사이 무작위 (full jitter)
+RETRY_MAX_DELAY = 30  # 백오프 최대 시간(초), 서버의 Retry-After가 이보다 길면 재시도하지 않음
+CYCLE_RETRY_BUDGET = 3  # 한 사이클 안의 모든 요청이 나눠 쓰는 재시도 횟수
+CYCLE_DEADLINE = 30  # 한 사이클의 요청/재시도 전체 제한 시간(초), 초과 시 다음 사이클로 넘김
+CONNECT_TIMEOUT = 3.05  # 연결 타임아웃(초)
+READ_TIMEOUT = 15  # 응답 대기 타임아웃(초, 사이클 남은 시간보다 길게 잡히지 않음)
+
+# 헤징 설정 (GET 응답이 최근 응답 시간의 백분위수보다 늦으면 같은 요청을 한 번 더 보내 먼저 온 응답 사용)
+HEDGE_ENABLED = False
+HEDGE_PERCENTILE = 95  # 이 백분위수의 응답 시간이 지나도 응답이 없으면 헤지 요청
+HEDGE_MIN_DELAY = 0.3  # 헤지 요청 전 최소 대기(초)
+HEDGE_MIN_SAMPLES = 20  # 응답 시간 표본이 이보다 적으면 헤징하지 않음
+HEDGE_MAX_RATE = 0.1  # 전체 요청 중 헤지 요청 비율 상한 (서버 부하 방지)
+
+# 회로 차단 설정 (API 장애가 이어지면 요청을 멈추고 마지막 정상 스냅샷을 stale 표시로 유지)
+BREAKER_FAILURE_THRESHOLD = 3  # 연속 실패 횟수가 이 값에 도달하면 차단
+BREAKER_COOLDOWN = 60  # 차단 유지 시간(초), 이후 시험 요청 1건으로 복구 여부 확인
+
+# 녹화/재생 설정 (부하 재현용)
+CASSETTE_MODE = None  # None: 사용 안 함, "record": API 응답 녹화 (인증 헤더/로그인 토큰은 가려서 기록), "replay": 녹화된 응답 재생
+CASSETTE_PATH = "./cassettes/traffic.jsonl.gz"
+REPLAY_SPEED = 1.0  # 재생 배속 (1.0: 실제 속도, 10.0: 10배속, 0: 대기 없이 최대 속도)
 
 # 데이터베이스 쿼리 설정
 DEFAULT_START_DATE = "2025-01-01"
 DEFAULT_END_DATE = None
+EXPORT_DATE_PARAMS = ("startDate", "endDate")  # export 엔드포인트의 기간 쿼리 파라미터 이름
+
+# 기간 조회 캐시 (DBClient.get_messages_between: 끝난 날짜는 로컬 캐시에서 응답, 오늘(UTC 기준) 포함 구간만 매번 조회)
+RANGE_CACHE_ENABLED = True
+RANGE_CACHE_DIR = "./cache/ranges"
+API_VERSION_HEADER = "X-API-Version"  # 서버 버전 응답 헤더 (값이 바뀌면 캐시 전체 무효화)
+
+# 과거 데이터 백필 설정 (python backfill.py)
+BACKFILL_OUTPUT_DIR = "./archive"
+BACKFILL_CHUNK_DAYS = 7  # 요청 1건이 담당할 기간(일)
+BACKFILL_WORKERS = 4  # 동시에 조회할 기간 수 (서버 부하 고려)
+
+# 분석용 내보내기 설정 (python export_analytics.py, 날짜별 Parquet/Arrow 파일)
+ANALYTICS_OUTPUT_DIR = "./analytics"
+ANALYTICS_BATCH_ROWS = 50000  # 파일 1개의 최대 행 수 (메모리 사용량 상한)
+ANALYTICS_TIMESTAMP_FIELDS = ["created_at", "updated_at", "timestamp"]  # timestamp(UTC) 형식으로 저장할 컬럼
+ANALYTICS_CATEGORY_FIELDS = ["language", "status"]  # 범주형으로 저장할 컬럼
 
 # API 엔드포인트
 API_ENDPOINTS = {
@@ -4,13 +4,24 @@
 JSON 저장 및 데이터 변환을 담당
 """
 
+import hashlib
 import json
 import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 
-from config import OUTPUT_DIR, JSON_FILENAME_PREFIX, JSON_FILENAME, USE_FIXED_FILENAME
+from config import (
+    OUTPUT_DIR, JSON_FILENAME_PREFIX, JSON_FILENAME, USE_FIXED_FILENAME, SHM_ENABLED, OUTPUT_SHARDS,
+    OUTPUT_SCHEMA, DEDUP_ENABLED, MODERATION_ENABLED, PARTITION_LIMIT
+)
+from dedup import NearDuplicateDetector
+from history import SnapshotHistory
+from moderation import ModerationFilter
+from output_writer import OutputFanout
+from partitions import PartitionIndex
+from projection import compile_projection
+from shm_publisher import SharedSnapshotPublisher
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +33,48 @@ class DataHandler:
         self.filename_prefix = JSON_FILENAME_PREFIX
         self.fixed_filename = JSON_FILENAME
         self.use_fixed_filename = USE_FIXED_FILENAME
+        self.shards = OUTPUT_SHARDS
+        self.partitions = PartitionIndex(self._partition_limits())
+        self._project = compile_projection(OUTPUT_SCHEMA)
+        self.moderation = ModerationFilter() if MODERATION_ENABLED else None
+        self.dedup = NearDuplicateDetector() if DEDUP_ENABLED else None
+        self.history = None
+        self.last_snapshot = None  # 마지막으로 저장한 스냅샷 (월 서버 등 메모리 소비자용)
+        self.shm_publisher = None
+        self.fanout = OutputFanout(self.output_dir)
         self._ensure_output_dir()
-    
+
+        # 버전 사이드카 (소비자가 큰 JSON 대신 작은 파일로 변경 여부 확인)
+        self.version_filename = f"{os.path.splitext(self.fixed_filename)[0]}.version.json"
+        self._manifest = self._load_manifest()
+        self._load_last_snapshot()
+
+        if not self.use_fixed_filename:
+            try:
+                self.history = SnapshotHistory()
+            except Exception as e:
+                logger.error(f"❌ 스냅샷 이력 초기화 실패 (고정 파일만 갱신): {e}")
+
+        if SHM_ENABLED:
+            try:
+                self.shm_publisher = SharedSnapshotPublisher()
+            except Exception as e:
+                logger.error(f"❌ 공유 메모리 배포 초기화 실패 (파일 저장만 사용): {e}")
+
+    def close(self):
+        """공유 메모리, 출력 스레드 등 자원 정리"""
+        self.fanout.close()
+        if self.shm_publisher is not None:
+            self.shm_publisher.close()
+            self.shm_publisher = None
+
+    def set_output_dir(self, output_dir: str):
+        """출력 폴더 변경 (새 폴더의 사이드카 버전을 이어서 사용)"""
+        self.output_dir = output_dir
+        self.fanout.set_local_dir(output_dir)
+        self._ensure_output_dir()
+        self._manifest = self._load_manifest()
+
     def _ensure_output_dir(self):
         """출력 디렉토리 생성"""
         try:
@@ -33,32 +84,140 @@ class DataHandler:
         except Exception as e:
             logger.error(f"❌ 출력 디렉토리 생성 실패: {e}")
     
+    def _load_manifest(self) -> Dict:
+        """기존 사이드카 로드 (재시작 후에도 버전이 이어지도록)"""
+        try:
+            with open(os.path.join(self.output_dir, self.version_filename), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"version": 0, "hash": None}
+
+    def _build_manifest(self, filename: str, snapshot: Dict, newest_created_at: Optional[str]) -> Dict:
+        """사이드카 내용 생성 (메시지 내용이 바뀐 경우에만 버전 증가)
+
+        파일 크기처럼 저장 시각/집계에 따라 매 사이클 바뀌는 값은 넣지 않음
+        (메시지와 stale 여부가 같으면 내용이 같아 다시 기록되지 않으므로 mtime을 변경 신호로 쓸 수 있음)
+        """
+        messages = snapshot["messages"]
+        # exportedAt은 매 사이클 바뀌므로 메시지 내용만 해시
+        digest = hashlib.sha256(
+            json.dumps(messages, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+
+        version = self._manifest.get("version", 0)
+        if digest != self._manifest.get("hash"):
+            version += 1
+
+        manifest = {
+            "version": version,
+            "hash": digest,
+            "count": len(messages),
+            "newestCreatedAt": newest_created_at,
+            "file": filename,
+            "stale": snapshot["metadata"].get("stale", False)
+        }
+        return manifest
+
+    def _load_last_snapshot(self):
+        """기존 고정 파일을 마지막 스냅샷으로 로드 (재시작 직후 API 장애에도 stale 제공 가능하도록)"""
+        try:
+            with open(os.path.join(self.output_dir, self.fixed_filename), 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if isinstance(snapshot.get("metadata"), dict) and isinstance(snapshot.get("messages"), list):
+                self.last_snapshot = snapshot
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def _is_snapshot_file(self, filename: str) -> bool:
+        """메시지 스냅샷 파일 여부 (사이드카 등 부가 파일 제외)"""
+        if filename == self.fixed_filename:
+            return True
+        return filename.startswith(f"{self.filename_prefix}_") and filename.endswith('.json')
+
     def _generate_filename(self) -> str:
-        """JSON 파일명 생성 (고정 파일명 또는 타임스탬프 포함)"""
-        if self.use_fixed_filename:
-            return self.fixed_filename
-        else:
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
-            return f"{self.filename_prefix}_{timestamp}.json"
+        """JSON 파일명 (항상 고정 파일명, 이전 스냅샷은 SnapshotHistory가 변경분으로 보관)"""
+        return self.fixed_filename
     
     def _format_message_data(self, messages: List[Dict]) -> List[Dict]:
-        """메시지 데이터 포맷팅 (QR Message Wall API 구조)"""
-        formatted_messages = []
-        
-        for msg in messages:
-            formatted_msg = {
-                "id": msg.get("id"),
-                "author": msg.get("author"),
-                "content": msg.get("content"),
-                "timestamp": msg.get("timestamp"),
-                "status": msg.get("status"),
-                "language": msg.get("language"),
-                "created_at": msg.get("created_at"),
-                "updated_at": msg.get("updated_at")
+        """메시지 데이터 포맷팅 (OUTPUT_SCHEMA로 컴파일된 변환 함수 사용)"""
+        return self._project(messages)
+    
+    def _partition_limits(self) -> Dict[str, int]:
+        """분할 출력이 쓰는 필드별 유지 개수 (같은 필드를 쓰는 분할 출력 중 가장 큰 limit)"""
+        limits: Dict[str, int] = {}
+        for shard in self.shards:
+            field = shard["field"]
+            limits[field] = max(limits.get(field, 0), shard.get("limit", PARTITION_LIMIT))
+        return limits
+
+    def _split_shards(self) -> Dict[str, List[Dict]]:
+        """분할 출력별 메시지 (필드 값별로 누적 유지 중인 최신 메시지에서 선택, 최신순)"""
+        results = {}
+        for shard in self.shards:
+            expected = shard["value"]
+            values = expected if isinstance(expected, (list, tuple, set)) else [expected]
+            results[shard["name"]] = self.partitions.top(shard["field"], values, shard.get("limit", PARTITION_LIMIT))
+        return results
+
+    def _shard_outputs(self, snapshot: Dict) -> List[Tuple[str, bytes]]:
+        """분할 출력 파일 내용 (messages.<name>.json)"""
+        outputs = []
+        for name, shard_messages in self._split_shards().items():
+            shard_data = {
+                "metadata": {**snapshot["metadata"], "totalCount": len(shard_messages), "shard": name},
+                "messages": shard_messages
             }
-            formatted_messages.append(formatted_msg)
+            outputs.append((f"{self.filename_prefix}.{name}.json",
+                            json.dumps(shard_data, ensure_ascii=False, indent=2).encode('utf-8')))
+        return outputs
+
+    def moderate(self, messages: List[Dict]) -> List[Dict]:
+        """금칙어 포함 메시지 제외/표시 (집계/색인/저장 전에 호출, 처음 본 메시지만 판정)"""
+        if self.moderation is None:
+            return messages
+        return self.moderation.process(messages)
+    
+    def discard(self, msg_ids: Iterable) -> int:
+        """분할 출력에서 메시지 제거 (금칙어로 제외된 메시지 등), 제거한 개수 반환"""
+        return self.partitions.discard(msg_ids)
+
+    def discard_missing(self, fetched: List[Dict], complete: bool) -> int:
+        """조회 범위 안인데 조회되지 않은(원본에서 삭제된) 메시지를 분할 출력에서 제거
+
+        조회 범위는 가장 오래된 조회 메시지의 created_at 이후. complete가 False(조회 개수 한도에 걸림)면
+        가장 오래된 메시지와 같은 시각의 메시지는 한도로 잘렸을 수 있으므로 제거하지 않음
+        """
+        oldest = min((msg.get("created_at") or "" for msg in fetched), default="")
+        fetched_ids = {msg.get("id") for msg in fetched}
+        missing = self.partitions.ids_since(oldest, inclusive=complete) - fetched_ids
+        return self.partitions.discard(missing) if missing else 0
+
+    def build_snapshot(self, messages: List[Dict], metadata: Optional[Dict] = None) -> Dict:
+        """저장/배포할 스냅샷 구조 생성 (metadata + 포맷팅된 messages, messages는 moderate를 거친 목록)"""
+        # 메타데이터 준비
+        if metadata is None:
+            metadata = {}
+        
+        # 중복 메시지 표시/제외 (처음 본 메시지만 판정)
+        if self.dedup is not None:
+            messages = self.dedup.process(messages)
         
-        return formatted_messages
+        formatted = self._format_message_data(messages)
+        self.partitions.ingest(messages, formatted)
+        
+        exported_at = datetime.now().isoformat()
+        return {
+            "metadata": {
+                "exportedAt": exported_at,
+                "totalCount": len(messages),
+                "source": "QR Message Wall CMS",
+                "version": "1.0",
+                "stale": False,
+                "lastSuccessAt": exported_at,
+                **metadata
+            },
+            "messages": formatted
+        }
     
     def save_messages_to_json(self, messages: List[Dict], 
                             metadata: Optional[Dict] = None) -> Optional[str]:
@@ -73,36 +232,91 @@ class DataHandler:
             filename = self._generate_filename()
             filepath = os.path.join(self.output_dir, filename)
             
-            # 메타데이터 준비
-            if metadata is None:
-                metadata = {}
-            
             # 저장할 데이터 구조
-            save_data = {
+            save_data = self.build_snapshot(messages, metadata)
+            
+            # 출력 스키마와 무관하도록 원본 메시지의 created_at 사용
+            created = [msg["created_at"] for msg in messages if msg.get("created_at")]
+            if not self._write_snapshot(filename, save_data, max(created) if created else None):
+                logger.error(f"❌ JSON 저장 실패: {filepath}")
+                return None
+
+            logger.info(f"💾 JSON 갱신 완료: {filename} ({len(messages)}개 메시지)")
+            return filepath
+            
+        except Exception as e:
+            logger.error(f"❌ JSON 저장 실패: {e}")
+            return None
+    
+    def _write_snapshot(self, filename: str, save_data: Dict, newest_created_at: Optional[str]) -> bool:
+        """스냅샷 1개를 공유 메모리와 모든 출력 대상에 기록 (로컬 기록 실패 시에만 False)"""
+        # 한 번만 직렬화해 파일과 공유 메모리에 같은 내용을 기록
+        payload = json.dumps(save_data, ensure_ascii=False, indent=2).encode('utf-8')
+
+        self.last_snapshot = save_data
+        if self.shm_publisher is not None:
+            self.shm_publisher.publish(payload)
+
+        # 대상 폴더마다 스냅샷 → 분할 출력 → 사이드카 순서로 기록
+        # (내용이 같은 파일은 다시 쓰지 않으므로 사이드카 mtime도 변경 신호로 쓸 수 있음)
+        manifest = self._build_manifest(filename, save_data, newest_created_at)
+        outputs = [(filename, payload)] + self._shard_outputs(save_data)
+        outputs.append((self.version_filename, json.dumps(manifest, ensure_ascii=False).encode('utf-8')))
+
+        if not self.fanout.write(outputs):
+            return False
+
+        if self.history is not None and not save_data["metadata"].get("stale"):
+            try:
+                self.history.append(save_data)
+            except Exception as e:
+                logger.warning(f"⚠️ 스냅샷 이력 기록 실패: {e}")
+
+        if manifest["version"] != self._manifest.get("version"):
+            logger.info(f"🔖 스냅샷 버전 갱신: v{manifest['version']} ({manifest['count']}개 메시지)")
+        self._manifest = manifest
+        return True
+
+    def save_stale_snapshot(self) -> Optional[str]:
+        """조회 실패 시 마지막 정상 스냅샷을 stale 표시와 함께 다시 기록 (정상 스냅샷이 없으면 None)"""
+        if self.last_snapshot is None:
+            return None
+
+        try:
+            filename = self._generate_filename()
+            filepath = os.path.join(self.output_dir, filename)
+            stale_data = {
                 "metadata": {
+                    **self.last_snapshot["metadata"],
                     "exportedAt": datetime.now().isoformat(),
-                    "totalCount": len(messages),
-                    "source": "QR Message Wall CMS",
-                    "version": "1.0",
-                    **metadata
+                    "stale": True
                 },
-                "messages": self._format_message_data(messages)
+                "messages": self.last_snapshot["messages"]
             }
-            
-            # JSON 파일 저장
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
-            
-            if self.use_fixed_filename:
-                logger.info(f"💾 JSON 갱신 완료: {filename} ({len(messages)}개 메시지)")
-            else:
-                logger.info(f"💾 JSON 저장 완료: {filename} ({len(messages)}개 메시지)")
+
+            if not self._write_snapshot(filename, stale_data, self._manifest.get("newestCreatedAt")):
+                logger.error(f"❌ stale 스냅샷 저장 실패: {filepath}")
+                return None
+
+            logger.warning(f"🕰️ 마지막 정상 스냅샷 유지 (stale, 마지막 성공: {stale_data['metadata'].get('lastSuccessAt')})")
             return filepath
-            
+
         except Exception as e:
-            logger.error(f"❌ JSON 저장 실패: {e}")
+            logger.error(f"❌ stale 스냅샷 저장 실패: {e}")
             return None
+
+    def get_partition_stats(self) -> Dict[str, Dict[str, int]]:
+        """필드 값별로 유지 중인 메시지 수"""
+        return self.partitions.get_stats()
     
+    def get_history_stats(self) -> Optional[Dict]:
+        """스냅샷 이력 세그먼트 수/크기 (이력을 쓰지 않으면 None)"""
+        return self.history.get_stats() if self.history is not None else None
+    
+    def get_output_stats(self) -> List[Dict]:
+        """출력 대상별 기록 지연/실패 통계"""
+        return self.fanout.get_stats()
+
     def save_messages_with_api_response(self, api_response: Dict) -> Optional[str]:
         """API 응답을 그대로 JSON으로 저장"""
         try:
@@ -152,7 +366,7 @@ class DataHandler:
             
             files = []
             for filename in os.listdir(self.output_dir):
-                if filename.endswith('.json') and filename.startswith(self.filename_prefix):
+                if self._is_snapshot_file(filename):
                     files.append(filename)
             
             # 파일명으로 정렬 (최신순)
@@ -171,27 +385,14 @@ class DataHandler:
         return None
     
     def cleanup_old_files(self, keep_days: int = 7) -> int:
-        """오래된 파일 정리 (기본 7일 이상 된 파일 삭제)"""
+        """오래된 이력 정리 (기본 7일, 이력 index 기준으로 삭제해 폴더를 조회하지 않음)"""
+        if self.history is None:
+            return 0
         try:
-            files = self.get_saved_files()
-            deleted_count = 0
-            cutoff_date = datetime.now().timestamp() - (keep_days * 24 * 60 * 60)
-            
-            for filename in files:
-                filepath = os.path.join(self.output_dir, filename)
-                file_time = os.path.getmtime(filepath)
-                
-                if file_time < cutoff_date:
-                    os.remove(filepath)
-                    deleted_count += 1
-                    logger.info(f"🗑️ 오래된 파일 삭제: {filename}")
-            
+            deleted_count = self.history.prune(keep_days)
             if deleted_count > 0:
-                logger.info(f"🧹 파일 정리 완료: {deleted_count}개 파일 삭제")
-            
+                logger.info(f"🧹 이력 정리 완료: {deleted_count}개 세그먼트 삭제")
             return deleted_count
-            
         except Exception as e:
-            logger.error(f"❌ 파일 정리 실패: {e}")
+            logger.error(f"❌ 이력 정리 실패: {e}")
             return 0
-
@@ -6,93 +6,354 @@ ArtistSul CMS API와의 통신을 담당
 
 import requests
 import json
-from datetime import datetime, timedelta
+import math
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional, Tuple
 import time
 import logging
 
 from config import (
-    BASE_URL, JWT_TOKEN, API_ENDPOINTS, DEFAULT_HEADERS,
-    MAX_RETRIES, RETRY_DELAY, FETCH_LIMIT
+    BASE_URL, API_ENDPOINTS, DEFAULT_HEADERS,
+    MAX_RETRIES, RETRY_DELAY, RETRY_MAX_DELAY, CYCLE_RETRY_BUDGET, CYCLE_DEADLINE,
+    LOGIN_DEADLINE, LOGIN_RETRY_BUDGET,
+    CONNECT_TIMEOUT, READ_TIMEOUT, FETCH_LIMIT, HEDGE_ENABLED,
+    CASSETTE_MODE, CASSETTE_PATH, REPLAY_SPEED, EXPORT_DATE_PARAMS,
+    RANGE_CACHE_ENABLED, API_VERSION_HEADER
 )
+from aggregates import parse_timestamp
+from cassette import CassetteRecorder, CassettePlayer
+from circuit_breaker import CircuitBreaker, HALF_OPEN
+from hedging import RequestHedger
+from range_cache import RangeCache
+from token_manager import TokenManager
+from tracing import RequestTracer
 
 logger = logging.getLogger(__name__)
 
+# 재시도할 응답 코드 (그 외 오류는 즉시 실패)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP 날짜) → 대기 시간(초)"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+def first_open_day() -> str:
+    """아직 메시지가 추가될 수 있는 첫 날짜 (YYYY-MM-DD)
+
+    created_at은 UTC 기준이므로 UTC 날짜를 쓰되, 로컬 날짜가 더 이르면(UTC보다 늦은 시간대) 그 날짜부터
+    """
+    return min(datetime.now(timezone.utc).date(), datetime.now().date()).isoformat()
+
+def _utc_day(created_at) -> Optional[str]:
+    """created_at의 UTC 날짜 (YYYY-MM-DD, 시간대 정보가 없으면 UTC로 간주, 해석 실패 시 None)"""
+    ts = parse_timestamp(created_at)
+    return None if ts is None else datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+
+def split_date_range(start_date: str, end_date: Optional[str], chunk_days: int) -> List[Tuple[str, str]]:
+    """기간(YYYY-MM-DD, 양 끝 포함)을 chunk_days일 단위로 분할 (end_date가 None이면 오늘까지)"""
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else datetime.now().date()
+    chunk_days = max(int(chunk_days), 1)
+    
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=chunk_days - 1), end)
+        chunks.append((start.isoformat(), chunk_end.isoformat()))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+class RequestLimits:
+    """요청 묶음(수집 사이클, 로그인 등)이 공유하는 제한 시간과 재시도 횟수 (여러 스레드에서 사용)"""
+    
+    def __init__(self, deadline: float, retry_budget: int):
+        self.deadline = deadline
+        self.expires_at = time.monotonic() + deadline
+        self._retry_budget = retry_budget
+        self._lock = threading.Lock()
+    
+    def remaining(self) -> float:
+        """남은 시간(초)"""
+        return self.expires_at - time.monotonic()
+    
+    def take_retry(self) -> bool:
+        """재시도 1회 사용 (남은 횟수가 없으면 False)"""
+        with self._lock:
+            if self._retry_budget <= 0:
+                return False
+            self._retry_budget -= 1
+            return True
+
 class DBClient:
     """ArtistSul CMS API 클라이언트"""
     
-    def __init__(self):
+    def __init__(self, cassette_mode: Optional[str] = CASSETTE_MODE,
+                 cassette_path: str = CASSETTE_PATH, replay_speed: float = REPLAY_SPEED):
         self.base_url = BASE_URL
-        self.jwt_token = JWT_TOKEN
         self.session = requests.Session()
         self.session.headers.update(DEFAULT_HEADERS)
+        self.tracer = RequestTracer()
+        self._random = random.Random()
+        self.breaker = CircuitBreaker()
+        self.last_success_at = None  # 마지막으로 요청이 성공한 시각
+        
+        # 사이클 단위 제한 (begin_cycle 호출 전에는 요청별 재시도 횟수만 적용)
+        self._cycle_limits: Optional[RequestLimits] = None
+        # 스레드별 제한 (로그인 요청은 사이클 제한 대신 자체 제한 사용)
+        self._local = threading.local()
+        
+        # 녹화/재생 모드 설정
+        self.recorder = None
+        self.player = None
+        if cassette_mode == "record":
+            self.recorder = CassetteRecorder(cassette_path)
+        elif cassette_mode == "replay":
+            self.player = CassettePlayer(cassette_path, replay_speed)
+        elif cassette_mode:
+            logger.warning(f"⚠️ 알 수 없는 카세트 모드: {cassette_mode} (무시됨)")
+        
+        # GET 헤징 (재생 모드에서는 카세트 응답을 그대로 사용하므로 비활성)
+        self.hedger = RequestHedger(self.session) if HEDGE_ENABLED and self.player is None else None
+        
+        # 지난 날짜 기간 조회 캐시 (재생 모드에서는 카세트 응답을 그대로 사용하므로 비활성)
+        self.range_cache = RangeCache() if RANGE_CACHE_ENABLED and self.player is None else None
+        
+        # 세션 토큰 (만료 전 백그라운드 갱신, 재생 모드에서는 카세트의 로그인 응답만 사용)
+        self.token_manager = TokenManager(self._login_request)
+        if self.player is None:
+            self.token_manager.start()
+    
+    @property
+    def is_replaying(self) -> bool:
+        """재생 모드 여부"""
+        return self.player is not None
+    
+    def replay_finished(self) -> bool:
+        """재생 모드에서 카세트를 모두 소진했는지 여부"""
+        return self.player is not None and self.player.exhausted
+    
+    def begin_cycle(self, deadline: float = CYCLE_DEADLINE, retry_budget: int = CYCLE_RETRY_BUDGET):
+        """새 사이클 시작 (이후 요청들이 제한 시간과 재시도 횟수를 공유)"""
+        self._cycle_limits = RequestLimits(deadline, retry_budget)
+    
+    def _limits(self) -> Optional[RequestLimits]:
+        """현재 요청에 적용할 제한 (로그인 중이면 로그인 제한, 아니면 사이클 제한)"""
+        return getattr(self._local, "limits", None) or self._cycle_limits
+    
+    def _remaining(self) -> Optional[float]:
+        """사이클 남은 시간(초), 제한이 없으면 None"""
+        limits = self._limits()
+        if limits is None or self.is_replaying:
+            return None
+        return limits.remaining()
+    
+    def close(self):
+        """세션 및 녹화 파일 정리"""
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.hedger is not None:
+            self.hedger.close()
+        self.token_manager.stop()
+        self.session.close()
+    
+    def _send(self, method: str, endpoint: str, url: str, **kwargs):
+        """HTTP 요청 전송 (재생 모드: 카세트 응답 반환, 녹화 모드: 응답 기록)"""
+        if self.player is not None:
+            return self.player.next_response(method, endpoint)
+        
+        started_at = time.monotonic()
+        read_timeout = READ_TIMEOUT
+        remaining = self._remaining()
+        if remaining is not None:
+            read_timeout = max(min(read_timeout, remaining), 0.1)
+        if self.hedger is not None and method == "GET":
+            response = self.hedger.request(method, url, timeout=(CONNECT_TIMEOUT, read_timeout), **kwargs)
+        else:
+            response = self.session.request(method, url, timeout=(CONNECT_TIMEOUT, read_timeout), **kwargs)
+        
+        if self.range_cache is not None:
+            self.range_cache.set_version(response.headers.get(API_VERSION_HEADER))
+        
+        if self.recorder is not None:
+            try:
+                self.recorder.record(method, endpoint, response, started_at)
+            except Exception as e:
+                logger.warning(f"⚠️ 응답 녹화 실패: {e}")
+        
+        return response
+    
+    def _backoff(self, attempt: int, retry_after: Optional[float] = None,
+                 max_attempts: int = MAX_RETRIES) -> bool:
+        """재시도 가능하면 대기 후 True (full jitter, Retry-After 우선, 사이클 제한 시간/재시도 예산 확인)"""
+        if attempt >= max_attempts - 1:
+            if max_attempts > 1:
+                logger.error(f"❌ 최대 재시도 횟수 초과: {max_attempts}")
+            return False
+        
+        # 사이클 제한이 없는 호출(백필 등)이 긴 Retry-After로 몇 시간씩 멈추지 않도록 상한 초과 시 포기
+        if retry_after is not None and retry_after > RETRY_MAX_DELAY:
+            logger.warning(f"⚠️ Retry-After {retry_after:.0f}초가 최대 대기 {RETRY_MAX_DELAY}초를 넘어 재시도하지 않습니다")
+            return False
+        
+        limits = self._limits()
+        if limits is not None and not limits.take_retry():
+            logger.warning("⚠️ 재시도 예산(사이클 또는 로그인)을 모두 사용해 재시도하지 않습니다")
+            return False
+        
+        # 재생 모드에서는 카세트 시간이 대기를 대신함
+        if self.is_replaying:
+            return True
+        
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            # 여러 PC가 같은 시각에 재시도하지 않도록 0 ~ 상한 사이 무작위 대기
+            delay = self._random.uniform(0, min(RETRY_MAX_DELAY, RETRY_DELAY * (2 ** attempt)))
+        
+        remaining = self._remaining()
+        if remaining is not None and delay + CONNECT_TIMEOUT >= remaining:
+            logger.warning(f"⏱️ 사이클 제한 시간 부족으로 재시도하지 않습니다 (대기 {delay:.1f}초, 남은 시간 {max(remaining, 0):.1f}초)")
+            return False
+        
+        logger.info(f"🔁 {delay:.1f}초 후 재시도 ({attempt + 2}/{max_attempts})")
+        time.sleep(delay)
+        return True
+        
+    def _make_request(self, method: str, endpoint: str, authenticate: bool = True,
+                      **kwargs) -> Optional[Dict]:
+        """API 요청을 보내고 응답을 처리 (회로 차단 중이면 요청 생략, 401/419 시 1회 재인증 후 재전송,
+        실패 시 요청 추적 링 버퍼 덤프)"""
+        # 재생 모드에서는 카세트 순서대로 재현하도록 회로 차단기를 거치지 않음
+        if not self.is_replaying and not self.breaker.allow_request():
+            logger.warning(f"⛔ 회로 차단 중: {method} {endpoint} 요청 생략 "
+                           f"(재시도까지 {self.breaker.remaining_cooldown():.0f}초)")
+            return None
+        
+        # 반개방 상태의 시험 요청은 재시도 없이 1회만
+        probe = self.breaker.state == HALF_OPEN and not self.is_replaying
+        max_attempts = 1 if probe else MAX_RETRIES
+        token = self.token_manager.get_token() if authenticate else None
+        result, upstream_ok = None, None
+        try:
+            result, upstream_ok, auth_failed = self._request_with_retries(method, endpoint, max_attempts, token, **kwargs)
+            
+            if auth_failed and authenticate:
+                logger.info("🔑 세션 인증 실패: 재로그인 후 요청을 다시 보냅니다")
+                if self.token_manager.refresh(token):
+                    result, upstream_ok, auth_failed = self._request_with_retries(
+                        method, endpoint, max_attempts, self.token_manager.get_token(), **kwargs)
+        finally:
+            # 결과와 관계없이 반드시 반영 (반개방 시험 요청이 해제되지 않으면 이후 요청이 모두 차단됨)
+            if not self.is_replaying:
+                if upstream_ok:
+                    self.breaker.record_success()
+                elif upstream_ok is False:
+                    self.breaker.record_failure()
+                elif probe:
+                    self.breaker.record_inconclusive()
+        
+        if result is not None:
+            self.last_success_at = datetime.now()
+        elif not self.replay_finished():
+            self.tracer.dump(f"{method} {endpoint} 실패")
         
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[Dict]:
-        """API 요청을 보내고 응답을 처리"""
+        return result
+    
+    def _request_with_retries(self, method: str, endpoint: str, max_attempts: int = MAX_RETRIES,
+                              token: Optional[str] = None,
+                              **kwargs) -> Tuple[Optional[Dict], Optional[bool], bool]:
+        """재시도를 포함한 API 요청 (시도마다 span 1건 기록)
+        
+        반환: (응답 JSON, 서버 정상 여부, 인증 실패 여부)
+        서버 정상 여부는 회로 차단기에 반영 (None: 판단 불가)
+        """
         url = f"{self.base_url}{endpoint}"
+        
+        # 토큰은 요청마다 헤더로 전달 (세션 헤더에 남기지 않아 로그인 요청에 섞이지 않음)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
 
-        for attempt in range(MAX_RETRIES):
+        for attempt in range(max_attempts):
+            remaining = self._remaining()
+            if remaining is not None and remaining <= 0:
+                logger.warning(f"⏱️ 제한 시간({self._limits().deadline}초) 초과: {method} {endpoint} 요청 생략")
+                return None, None, False
+            
+            started_at = time.monotonic()
             try:
-                logger.info(f"🔄 API 요청 시도 {attempt + 1}/{MAX_RETRIES}: {method} {url}")
-
-                # JWT 토큰이 있으면 헤더에 추가 (CMS 개발자 제공 형식)
-                if self.jwt_token and self.jwt_token not in ["your_jwt_token_here", "your_actual_jwt_token_here", "REQUIRED"]:
-                    self.session.headers["Authorization"] = f"Bearer {self.jwt_token}"
-                    logger.info(f"🔐 JWT 토큰 사용: {self.jwt_token[:20]}...")
-                else:
-                    logger.info("🔓 개발 모드: JWT 토큰 없이 API 접근 (보안상 주의 필요)")
+                response = self._send(method, endpoint, url, headers=headers, **kwargs)
+                if response is None:
+                    logger.info("⏹️ 재생할 응답이 더 이상 없습니다")
+                    return None, None, False
                 
-                response = self.session.request(method, url, timeout=30, **kwargs)
-                
-                # 응답 내용 로깅
-                logger.info(f"📡 응답 상태: {response.status_code}")
-                logger.info(f"📡 응답 헤더: {dict(response.headers)}")
-                logger.info(f"📡 응답 내용 (처음 200자): {response.text[:200]}")
+                latency = response.elapsed.total_seconds() if self.is_replaying else time.monotonic() - started_at
+                self.tracer.record(method, endpoint, response.status_code, len(response.content),
+                                   latency, attempt + 1)
                 
                 # 응답 상태 코드 확인
                 if response.status_code == 200:
                     try:
                         # JSON 파싱 시도
-                        json_data = response.json()
-                        logger.info(f"✅ API 요청 성공: {response.status_code}")
-                        return json_data
+                        return response.json(), True, False
                     except json.JSONDecodeError as e:
                         logger.error(f"❌ JSON 파싱 오류: {e}")
                         logger.error(f"❌ 응답 내용: {response.text}")
-                        return None
+                        return None, False, False  # 프록시 오류 페이지 등
                 elif response.status_code == 401:
                     logger.warning(f"⚠️ 인증 실패 (401): JWT 토큰 확인 필요")
                     logger.warning(f"⚠️ 응답 내용: {response.text}")
-                    return None
+                    return None, True, True
                 elif response.status_code == 419:
                     logger.warning(f"⚠️ 인증 만료 (419): 새 로그인 필요")
                     logger.warning(f"⚠️ 응답 내용: {response.text}")
-                    return None
-                elif response.status_code == 500:
-                    logger.error(f"❌ 서버 오류 (500): {response.text}")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY * (2 ** attempt))  # 지수적 백오프
+                    return None, True, True
+                elif response.status_code in RETRYABLE_STATUS:
+                    logger.error(f"❌ 서버 오류 ({response.status_code}): {response.text}")
+                    if self._backoff(attempt, _parse_retry_after(response.headers.get("Retry-After")), max_attempts):
                         continue
+                    return None, False, False
                 else:
                     logger.error(f"❌ API 오류 ({response.status_code}): {response.text}")
-                    return None
+                    return None, True, False
                     
             except requests.exceptions.ConnectionError as e:
+                self.tracer.record(method, endpoint, latency=time.monotonic() - started_at,
+                                   attempt=attempt + 1, error="ConnectionError")
                 logger.error(f"❌ 연결 오류: {e}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY * (2 ** attempt))
+                if self._backoff(attempt, max_attempts=max_attempts):
                     continue
+                return None, False, False
             except requests.exceptions.Timeout as e:
+                self.tracer.record(method, endpoint, latency=time.monotonic() - started_at,
+                                   attempt=attempt + 1, error="Timeout")
                 logger.error(f"❌ 타임아웃 오류: {e}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY * (2 ** attempt))
+                if self._backoff(attempt, max_attempts=max_attempts):
                     continue
+                return None, False, False
             except Exception as e:
+                self.tracer.record(method, endpoint, latency=time.monotonic() - started_at,
+                                   attempt=attempt + 1, error=type(e).__name__)
                 logger.error(f"❌ 예상치 못한 오류: {e}")
-                return None
+                return None, None, False
         
-        logger.error(f"❌ 최대 재시도 횟수 초과: {MAX_RETRIES}")
-        return None
+        return None, False, False
     
     def get_messages(self, limit: int = None) -> Optional[Dict]:
         """메시지 데이터 조회 (QR Message Wall API)"""
@@ -149,16 +410,106 @@ class DBClient:
             return messages
         return None
     
+    def export_messages(self, start_date: str, end_date: str) -> Optional[List[Dict]]:
+        """기간별 메시지 내보내기 (export 엔드포인트, 양 끝 날짜 포함)"""
+        start_param, end_param = EXPORT_DATE_PARAMS
+        response = self._make_request("GET", API_ENDPOINTS["export"],
+                                      params={start_param: start_date, end_param: end_date})
+        if not response or not (response.get("success") or response.get("ok")):
+            logger.error(f"❌ 내보내기 실패 ({start_date} ~ {end_date}): {response}")
+            return None
+        
+        # 응답 형식: {"success", "data": [...]} 또는 {"ok", "data": {"items": [...]}}
+        data = response.get("data", [])
+        if isinstance(data, dict):
+            data = data.get("items", [])
+        return data
+    
+    def _export_closed_days(self, days: List[str]) -> Optional[List[Dict]]:
+        """연속된 지난 날짜 조회 후 날짜별로 캐시에 저장"""
+        messages = self.export_messages(days[0], days[-1])
+        if messages is None:
+            return None
+        
+        by_day = {day: [] for day in days}
+        for msg in messages:
+            day_messages = by_day.get(_utc_day(msg.get("created_at")))
+            if day_messages is None:
+                # 서버의 날짜 기준(시간대 등)을 created_at으로 나눌 수 없으면 캐시하지 않음
+                logger.debug(f"🗂️ 기간 캐시 생략 ({days[0]} ~ {days[-1]}): 범위 밖 created_at {msg.get('created_at')}")
+                return messages
+            day_messages.append(msg)
+        
+        for day, day_messages in by_day.items():
+            self.range_cache.put(day, day_messages)
+        return messages
+    
+    def get_messages_between(self, start_date: str, end_date: Optional[str] = None) -> Optional[List[Dict]]:
+        """기간별 메시지 조회 (YYYY-MM-DD, 양 끝 포함, end_date가 None이면 오늘까지, 최신순)
+        
+        날짜 필터는 서버에서 적용하고, 끝난 날짜(닫힌 구간)는 서버 버전별 로컬 캐시에서 응답.
+        아직 메시지가 추가될 수 있는 날짜(first_open_day 이후, created_at과 같은 UTC 기준)만 매번 조회
+        """
+        days = [day for day, _ in split_date_range(start_date, end_date, 1)]
+        open_since = first_open_day()
+        closed_days = [day for day in days if day < open_since]
+        open_days = [day for day in days if day >= open_since]
+        
+        messages = []
+        # 열린 구간을 먼저 조회해 캐시를 확인하기 전에 서버 버전을 갱신
+        if open_days:
+            fetched = self.export_messages(open_days[0], open_days[-1])
+            if fetched is None:
+                return None
+            messages.extend(fetched)
+        
+        if closed_days and self.range_cache is None:
+            fetched = self.export_messages(closed_days[0], closed_days[-1])
+            if fetched is None:
+                return None
+            messages.extend(fetched)
+        elif closed_days:
+            missing = []
+            for day in closed_days:
+                cached = self.range_cache.get(day)
+                if cached is None:
+                    missing.append(day)
+                else:
+                    messages.extend(cached)
+            
+            # 캐시에 없는 날짜는 연속 구간별로 한 번에 조회
+            run = []
+            for day in missing + [None]:
+                if run and (day is None or
+                            datetime.strptime(day, "%Y-%m-%d") - datetime.strptime(run[-1], "%Y-%m-%d") != timedelta(days=1)):
+                    fetched = self._export_closed_days(run)
+                    if fetched is None:
+                        return None
+                    messages.extend(fetched)
+                    run = []
+                if day is not None:
+                    run.append(day)
+            
+            logger.info(f"🗂️ 기간 조회 {days[0]} ~ {days[-1]}: 캐시 {len(closed_days) - len(missing)}일, "
+                        f"서버 {len(missing) + (len(days) - len(closed_days))}일")
+        
+        messages.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+        return messages
+    
     def test_connection(self) -> bool:
         """API 연결 테스트"""
         logger.info("🔍 API 연결 테스트 중...")
         
+        if self.is_replaying:
+            logger.info(f"▶️ 재생 모드: 네트워크 연결 테스트 생략 ({self.player.path})")
+            return True
+        
         try:
             # 1. 기본 URL 연결 테스트
             test_url = f"{self.base_url}/"
             logger.info(f"🔍 기본 URL 테스트: {test_url}")
             
-            response = self.session.get(test_url, timeout=10)
+            response = self.session.get(test_url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
             logger.info(f"📡 기본 URL 응답: {response.status_code}")
             
             if response.status_code == 200:
@@ -186,7 +537,7 @@ class DBClient:
             url = f"{self.base_url}{endpoint}"
             logger.info(f"🔍 엔드포인트 테스트: {url}")
             
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
             logger.info(f"📡 {endpoint} 응답: {response.status_code}")
             
             # JSON 응답인지 확인
@@ -202,39 +553,17 @@ class DBClient:
             logger.error(f"❌ {endpoint} 테스트 오류: {e}")
             return False
     
-    def login(self, email: str, password: str) -> bool:
-        """사용자 로그인 (세션 토큰 갱신) - QR Message Wall API"""
-        logger.info(f"🔐 사용자 로그인 시도: {email}")
-        
-        # QR Message Wall API 로그인 형식
-        login_data = {
-            "email": email,
-            "password": password
-        }
-        
-        # 로그인 시에는 JWT 토큰 없이 요청
-        original_token = self.jwt_token
-        self.jwt_token = None
+    def _login_request(self, payload: Dict) -> Optional[Dict]:
+        """로그인 요청 (토큰 없이 전송, TokenManager가 사용)
         
+        백그라운드 갱신이나 엔진 중지 중에도 동작하도록 사이클 제한 대신 자체 제한 시간/재시도 횟수 사용
+        """
+        self._local.limits = RequestLimits(LOGIN_DEADLINE, LOGIN_RETRY_BUDGET)
         try:
-            response = self._make_request("POST", API_ENDPOINTS["auth"], json=login_data)
-            
-            if response and response.get("success"):
-                # QR Message Wall API 응답 형식
-                token = response.get("token")
-                user = response.get("user", {})
-                expires_at = response.get("expires_at")
-                
-                if token:
-                    self.jwt_token = token
-                    logger.info(f"✅ 로그인 성공! 세션 토큰 갱신됨 (사용자: {user.get('username', email)})")
-                    return True
-            
-            logger.error("❌ 로그인 실패!")
-            return False
-            
+            return self._make_request("POST", API_ENDPOINTS["login"], authenticate=False, json=payload)
         finally:
-            # 원래 토큰 복원 (로그인 실패 시)
-            if not self.jwt_token:
-                self.jwt_token = original_token
-
+            self._local.limits = None
+    
+    def login(self, email: str, password: str) -> bool:
+        """사용자 로그인 (세션 토큰 갱신) - 이후 만료 전 갱신은 TokenManager가 담당"""
+        return self.token_manager.login(email, password)
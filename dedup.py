@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+중복 메시지 감지 모듈
+content의 64비트 SimHash를 밴드별로 색인해, 시간 창 안에서 거의 같은 메시지를 전체 비교 없이 찾음
+(해밍 거리 d 이하인 두 값은 d+1개 밴드 중 적어도 하나가 일치)
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from config import DEDUP_ACTION, DEDUP_WINDOW, DEDUP_MAX_DISTANCE, DEDUP_HISTORY_LIMIT, DEDUP_MIN_LENGTH
+from aggregates import parse_timestamp
+from search_index import normalize
+
+logger = logging.getLogger(__name__)
+
+_IGNORED_CHARS = re.compile(r"[\W_]+")
+_WHITESPACE = re.compile(r"\s+")
+
+def simhash(text: str, min_length: int = DEDUP_MIN_LENGTH) -> Optional[int]:
+    """글자 3-gram 기반 64비트 SimHash (공백/문장부호 무시)
+
+    이모지/문장부호만 있는 메시지는 공백만 빼고 비교하며, min_length보다 짧으면 None (판정하지 않음)
+    """
+    normalized = normalize(text)
+    compact = _IGNORED_CHARS.sub("", normalized) or _WHITESPACE.sub("", normalized)
+    if len(compact) < max(min_length, 1):
+        return None
+    if len(compact) < 3:
+        features = [compact]
+    else:
+        features = [compact[i:i + 3] for i in range(len(compact) - 2)]
+
+    # 비트 위치별로 1인 특징이 절반을 넘으면 1 (문자열 열 단위로 세어 비트별 파이썬 루프를 피함)
+    values = [format(int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), "big"), "064b")
+              for feature in features]
+    half = len(values) / 2
+    return int("".join("1" if column.count("1") > half else "0" for column in zip(*values)), 2)
+
+class NearDuplicateDetector:
+    """시간 창 안의 유사 메시지 표시(mark) 또는 제외(collapse)
+
+    mark: 중복 메시지에 duplicateOf(원본 id), 원본에 duplicateCount 추가
+          (OUTPUT_SCHEMA에 해당 이름이 있어야 출력됨)
+    collapse: 중복 메시지를 목록에서 빼고 원본에 duplicateCount 추가
+    """
+
+    def __init__(self, action: str = DEDUP_ACTION, window: float = DEDUP_WINDOW,
+                 max_distance: int = DEDUP_MAX_DISTANCE, history_limit: int = DEDUP_HISTORY_LIMIT):
+        if action not in ("mark", "collapse"):
+            raise ValueError(f"알 수 없는 DEDUP_ACTION: {action}")
+        self.action = action
+        self.window = window
+        self.max_distance = max_distance
+        self.history_limit = history_limit
+
+        # 64비트를 max_distance + 1개 밴드로 분할
+        bands = max_distance + 1
+        width = 64 // bands
+        self._bands = [(i * width, 64 - i * width if i == bands - 1 else width) for i in range(bands)]
+
+        self._buckets: Dict[Tuple[int, int], List] = {}  # (밴드 번호, 밴드 값) → [(시각, id, 지문)]
+        self._recent = deque()  # 시간 창 관리용 (시각, id, 밴드 키 목록), 시각 순
+        self._decisions = OrderedDict()  # id → 원본 id (원본이면 None), 한 번 판정한 메시지는 다시 계산하지 않음
+        self._counts: Dict = {}  # 원본 id → 중복 개수
+        self.stats = {"checked": 0, "duplicates": 0}
+
+    def _band_keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        return [(index, (fingerprint >> shift) & ((1 << width) - 1))
+                for index, (shift, width) in enumerate(self._bands)]
+
+    def _expire(self, now: float):
+        """창을 벗어난 지문 제거"""
+        while self._recent and self._recent[0][0] < now - self.window:
+            ts, msg_id, keys = self._recent.popleft()
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                bucket[:] = [entry for entry in bucket if entry[1] != msg_id]
+                if not bucket:
+                    del self._buckets[key]
+
+    def _find_original(self, ts: float, fingerprint: int, keys) -> Optional[object]:
+        """같은 밴드를 가진 후보 중 해밍 거리 이내인 가장 이른 메시지 id"""
+        best = None
+        for key in keys:
+            for other_ts, other_id, other_fp in self._buckets.get(key, ()):
+                if abs(ts - other_ts) > self.window:
+                    continue
+                if bin(fingerprint ^ other_fp).count("1") <= self.max_distance:
+                    if best is None or other_ts < best[0]:
+                        best = (other_ts, other_id)
+        return best[1] if best is not None else None
+
+    def _classify(self, msg: Dict, ts: float):
+        """새 메시지 1건 판정 (중복이면 원본 id, 아니면 None)"""
+        self.stats["checked"] += 1
+        fingerprint = simhash(msg.get("content") or "")
+        if fingerprint is None:
+            return None  # 너무 짧아 비교하지 않음 (서로 다른 짧은 메시지가 같은 지문이 되지 않도록)
+        keys = self._band_keys(fingerprint)
+
+        original = self._find_original(ts, fingerprint, keys)
+        # 원본을 가리키도록 (중복의 중복도 같은 원본으로)
+        if original is not None:
+            original = self._decisions.get(original) or original
+            self._counts[original] = self._counts.get(original, 0) + 1
+            self.stats["duplicates"] += 1
+
+        for key in keys:
+            self._buckets.setdefault(key, []).append((ts, msg["id"], fingerprint))
+        self._recent.append((ts, msg["id"], keys))
+        return original
+
+    def process(self, messages: List[Dict]) -> List[Dict]:
+        """중복 표시/제외한 메시지 목록 (원래 순서 유지, 원본 dict는 수정하지 않음)"""
+        # 이른 메시지가 원본이 되도록 created_at 순으로 판정
+        new_messages = [msg for msg in messages
+                        if msg.get("id") is not None and msg["id"] not in self._decisions]
+        for msg in sorted(new_messages, key=lambda x: x.get("created_at") or ""):
+            ts = parse_timestamp(msg.get("created_at")) or time.time()
+            self._expire(ts)
+            self._decisions[msg["id"]] = self._classify(msg, ts)
+
+        while len(self._decisions) > self.history_limit:
+            msg_id, _ = self._decisions.popitem(last=False)
+            self._counts.pop(msg_id, None)
+
+        result = []
+        for msg in messages:
+            original = self._decisions.get(msg.get("id"))
+            if original is not None:
+                if self.action == "collapse":
+                    continue
+                msg = {**msg, "duplicateOf": original}
+            count = self._counts.get(msg.get("id"))
+            if count:
+                msg = {**msg, "duplicateCount": count}
+            result.append(msg)
+        return result
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "action": self.action, "tracked": len(self._recent)}
@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+"""
+수집 엔진 모듈
+주기적 조회 → JSON 저장 루프를 GUI와 무관하게 실행하고,
+로컬 소켓(JSON Lines)으로 상태 조회/로그 열람/설정 변경 명령을 제공
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+from config import (
+    INTERVAL_SECONDS, FETCH_LIMIT, ENGINE_HOST, ENGINE_PORT, ENGINE_LOG_BUFFER_SIZE,
+    WALL_SERVER_ENABLED, SEARCH_HIGHLIGHT_KEYWORDS, SEARCH_INDEX_EXPORT, SEARCH_INDEX_FILENAME
+)
+from aggregates import MessageAggregator
+from db_client import DBClient
+from data_handler import DataHandler
+from logger import get_logger, add_listener_handler
+from output_writer import write_atomic
+from search_index import SearchIndex
+from wall_server import WallServer
+
+class EngineLogBuffer(logging.Handler):
+    """엔진 로그 링 버퍼 (모니터가 마지막으로 받은 번호 이후의 로그만 가져감)"""
+
+    def __init__(self, capacity: int = ENGINE_LOG_BUFFER_SIZE):
+        super().__init__(level=logging.INFO)
+        self._entries = deque(maxlen=capacity)
+        self._seq = 0
+        self._buffer_lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            entry = {
+                "time": datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S"),
+                "level": record.levelname,
+                "message": record.getMessage()
+            }
+            with self._buffer_lock:
+                self._seq += 1
+                entry["seq"] = self._seq
+                self._entries.append(entry)
+        except Exception:
+            self.handleError(record)
+
+    def since(self, seq: int, limit: int = 500) -> List[Dict]:
+        """seq 이후의 로그 (최대 limit건, 최신 로그 우선)"""
+        with self._buffer_lock:
+            entries = [entry for entry in self._entries if entry["seq"] > seq]
+        return entries[-limit:]
+
+class CollectionEngine:
+    """헤드리스 수집 엔진 (DBClient 조회 → DataHandler 저장 루프)"""
+
+    def __init__(self, db_client: Optional[DBClient] = None,
+                 data_handler: Optional[DataHandler] = None):
+        self.logger = get_logger("CollectionEngine")
+        self.db_client = db_client or DBClient()
+        self.data_handler = data_handler or DataHandler()
+        self.aggregator = MessageAggregator()
+        self.search_index = SearchIndex()
+        self._exported_index_version = 0
+        self.interval = max(INTERVAL_SECONDS, 5)
+        self.fetch_limit = FETCH_LIMIT
+
+        self.running = False
+        self.stats = {
+            "start_time": None,
+            "total_runs": 0,
+            "successful_runs": 0,
+            "failed_runs": 0,
+            "total_messages_saved": 0,
+            "last_run_time": None
+        }
+        self.cpu_start = None
+
+        self.log_buffer = EngineLogBuffer()
+        add_listener_handler(self.log_buffer)
+
+        # 시각화 앱용 로컬 월 서버 (선택)
+        self.wall_server = None
+        if WALL_SERVER_ENABLED:
+            self.wall_server = WallServer()
+            if not self.wall_server.start():
+                self.wall_server = None
+
+        self._thread = None
+        self._wake_event = threading.Event()
+        self.shutdown_event = threading.Event()
+
+    # ------------------------------------------------------------------
+    # 수집 루프
+    # ------------------------------------------------------------------
+    def test_connection(self) -> bool:
+        """API 연결 테스트"""
+        self.logger.info("🔍 API 연결 테스트 중...")
+        return self.db_client.test_connection()
+
+    def start(self) -> bool:
+        """수집 루프 시작 (별도 스레드)"""
+        if self.running:
+            return False
+
+        self.running = True
+        self._wake_event.clear()
+        self.stats.update({
+            "start_time": datetime.now(),
+            "total_runs": 0,
+            "successful_runs": 0,
+            "failed_runs": 0,
+            "total_messages_saved": 0,
+            "last_run_time": None
+        })
+        self.cpu_start = time.process_time()
+
+        self.logger.info(f"🚀 데이터 수집 시작 ({self.interval}초 간격, {self.fetch_limit}개 메시지)")
+        self._thread = threading.Thread(target=self._main_loop, name="CollectionLoop", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """수집 루프 중지 (진행 중인 사이클은 끝까지 실행)"""
+        if not self.running:
+            return
+
+        self.running = False
+        self._wake_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=60)
+        self._thread = None
+        self.print_final_stats()
+        self.logger.info("🛑 데이터 수집이 중지되었습니다.")
+
+    def close(self):
+        """엔진 종료 시 부가 서버 및 공유 메모리 정리"""
+        if self.wall_server is not None:
+            self.wall_server.stop()
+            self.wall_server = None
+        self.data_handler.close()
+
+    def request_shutdown(self):
+        """엔진 프로세스 종료 요청"""
+        self.shutdown_event.set()
+        self._wake_event.set()
+
+    def _main_loop(self):
+        """메인 실행 루프"""
+        self.logger.info("🔄 메인 루프 시작")
+
+        while self.running:
+            try:
+                self.run_single_cycle()
+
+                if self.db_client.replay_finished():
+                    self.logger.info("⏹️ 카세트 재생이 끝나 루프를 종료합니다")
+                    self.request_shutdown()
+                    break
+
+                self._wait_for_next_cycle()
+
+            except Exception as e:
+                self.logger.error_emoji(f"실행 루프 오류: {e}")
+                self.stats["failed_runs"] += 1
+                self._wake_event.wait(5)  # 오류 시 5초 대기 후 재시도
+
+    def run_single_cycle(self):
+        """단일 실행 사이클"""
+        self.stats["total_runs"] += 1
+        self.stats["last_run_time"] = datetime.now()
+
+        self.logger.info(f"🔄 실행 사이클 #{self.stats['total_runs']} 시작")
+
+        try:
+            # 최근 메시지 조회 (사이클 제한 시간/재시도 예산은 조회 요청 전체가 공유)
+            self.db_client.begin_cycle()
+            messages = self.db_client.get_recent_messages(self.fetch_limit)
+
+            if messages is None:
+                if self.db_client.replay_finished():
+                    # 카세트 소진은 실패가 아닌 재생 종료
+                    self.stats["total_runs"] -= 1
+                    return
+                self.logger.error_emoji("메시지 조회 실패")
+                self.stats["failed_runs"] += 1
+                
+                # 마지막 정상 스냅샷을 stale 표시로 계속 제공
+                if self.data_handler.save_stale_snapshot() and self.wall_server is not None:
+                    self.wall_server.publish(self.data_handler.last_snapshot)
+                return
+
+            # 메시지가 없어도 빈 데이터로 저장
+            if not messages:
+                self.logger.info("📝 조회된 메시지가 없습니다. 빈 데이터로 JSON 파일을 갱신합니다")
+                messages = []  # 빈 리스트로 설정
+
+            # 금칙어 검열을 먼저 적용 (제외된 메시지는 집계/검색/강조/분할 출력에도 남기지 않음)
+            fetched = messages
+            messages = self.data_handler.moderate(messages)
+            if len(messages) < len(fetched):
+                kept = {msg.get("id") for msg in messages}
+                dropped = [msg.get("id") for msg in fetched if msg.get("id") not in kept]
+                self.search_index.discard(dropped)
+                self.data_handler.discard(dropped)
+
+            # 조회 범위 안인데 조회되지 않은(삭제된) 메시지는 분할 출력에서 제거
+            removed = self.data_handler.discard_missing(fetched, complete=len(fetched) < self.fetch_limit)
+            if removed:
+                self.logger.info(f"🗑️ 삭제된 메시지 {removed}개를 분할 출력에서 제거")
+
+            # 새 메시지만 집계에 반영 (시간 창 집계는 metadata.aggregates로 함께 저장)
+            new_count = self.aggregator.ingest(messages)
+            if new_count:
+                self.logger.info(f"📈 새 메시지 {new_count}개 집계 반영")
+
+            # 검색 색인 갱신 (새 메시지와 content가 바뀐 메시지만)
+            self.search_index.add(messages)
+            self._export_search_index()
+
+            metadata = {"aggregates": self.aggregator.snapshot()}
+            if SEARCH_HIGHLIGHT_KEYWORDS:
+                # 현재 스냅샷의 메시지만 (색인 전체의 id를 매 사이클 출력하지 않음)
+                metadata["highlights"] = self.search_index.find_keywords(
+                    SEARCH_HIGHLIGHT_KEYWORDS, within=[msg.get("id") for msg in messages])
+
+            # JSON 파일로 저장
+            filepath = self.data_handler.save_messages_to_json(messages, metadata)
+
+            if filepath:
+                if self.wall_server is not None:
+                    self.wall_server.publish(self.data_handler.last_snapshot)
+                
+                self.logger.success(f"{len(messages)}개 메시지 저장 완료 → {filepath}")
+                self.stats["successful_runs"] += 1
+                self.stats["total_messages_saved"] += len(messages)
+            else:
+                self.logger.error_emoji("JSON 저장 실패")
+                self.stats["failed_runs"] += 1
+
+        except Exception as e:
+            self.logger.error_emoji(f"실행 사이클 오류: {e}")
+            self.stats["failed_runs"] += 1
+
+    def _export_search_index(self):
+        """색인이 바뀌었을 때만 출력 폴더에 내보내기 (SEARCH_INDEX_EXPORT)"""
+        if not SEARCH_INDEX_EXPORT or self.search_index.version == self._exported_index_version:
+            return
+        try:
+            path = os.path.join(self.data_handler.output_dir, SEARCH_INDEX_FILENAME)
+            write_atomic(path, self.search_index.to_bytes())
+            self._exported_index_version = self.search_index.version
+        except Exception as e:
+            self.logger.warning_emoji(f"검색 색인 내보내기 실패: {e}")
+
+    def _wait_for_next_cycle(self):
+        """다음 사이클까지 대기 (중지/설정 변경 시 즉시 깨어남)"""
+        if not self.running:
+            return
+
+        # 재생 모드에서는 카세트의 녹화 시간 간격이 대기를 대신함
+        if self.db_client.is_replaying:
+            return
+
+        self.logger.info(f"⏰ 다음 실행까지 {self.interval}초 대기...")
+        self._wake_event.wait(self.interval)
+        self._wake_event.clear()
+
+    def print_final_stats(self):
+        """최종 통계 출력"""
+        if self.stats["start_time"]:
+            runtime = datetime.now() - self.stats["start_time"]
+            self.logger.info("📊 === 실행 통계 ===")
+            self.logger.info(f"⏱️ 총 실행 시간: {runtime}")
+            self.logger.info(f"🔄 총 실행 횟수: {self.stats['total_runs']}")
+            self.logger.info(f"✅ 성공한 실행: {self.stats['successful_runs']}")
+            self.logger.info(f"❌ 실패한 실행: {self.stats['failed_runs']}")
+            self.logger.info(f"💾 총 저장된 메시지: {self.stats['total_messages_saved']}개")
+
+            if self.stats['total_runs'] > 0:
+                success_rate = (self.stats['successful_runs'] / self.stats['total_runs']) * 100
+                self.logger.info(f"📈 성공률: {success_rate:.1f}%")
+
+            for target in self.data_handler.get_output_stats():
+                self.logger.info(f"📤 출력 [{target['name']}] 성공 {target['writes']}회, 실패 {target['failures']}회, "
+                                 f"시간 초과 {target['timeouts']}회, 건너뜀 {target['skipped']}회, "
+                                 f"평균 {target['avg_latency_ms']}ms")
+
+            if self.db_client.hedger is not None:
+                hedging = self.db_client.hedger.get_stats()
+                self.logger.info(f"🪁 헤징: 요청 {hedging['requests']}건 중 {hedging['hedged']}건 헤지 "
+                                 f"({hedging['hedge_rate'] * 100:.1f}%), 헤지 승률 {hedging['win_rate'] * 100:.1f}%")
+
+            if self.db_client.is_replaying:
+                cpu_time = time.process_time() - self.cpu_start
+                self.logger.info(f"▶️ 재생 배속: {self.db_client.player.speed}, 재생 응답: {self.db_client.player.replayed_count}건")
+                self.logger.info(f"🧮 CPU 사용 시간: {cpu_time:.2f}초 (실행 시간 대비 {cpu_time / max(runtime.total_seconds(), 0.001) * 100:.1f}%)")
+
+    # ------------------------------------------------------------------
+    # 상태 / 설정
+    # ------------------------------------------------------------------
+    def get_status(self) -> Dict:
+        """현재 상태 (JSON 직렬화 가능)"""
+        stats = dict(self.stats)
+        for key in ("start_time", "last_run_time"):
+            if stats[key] is not None:
+                stats[key] = stats[key].isoformat(timespec="seconds")
+
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "fetch_limit": self.fetch_limit,
+            "output_dir": self.data_handler.output_dir,
+            "stats": stats,
+            "outputs": self.data_handler.get_output_stats(),
+            "partitions": self.data_handler.get_partition_stats(),
+            "history": self.data_handler.get_history_stats(),
+            "circuit": self.db_client.breaker.get_status(),
+            "session": self.db_client.token_manager.get_status(),
+            "hedging": self.db_client.hedger.get_stats() if self.db_client.hedger is not None else None,
+            "search_index": self.search_index.get_stats()
+        }
+
+    def update_settings(self, interval: Optional[int] = None, fetch_limit: Optional[int] = None,
+                        output_dir: Optional[str] = None) -> Dict:
+        """실행 중 설정 변경 (다음 사이클부터 적용)"""
+        if interval is not None:
+            self.interval = max(int(interval), 5)  # 최소 5초 강제
+        if fetch_limit is not None:
+            self.fetch_limit = max(int(fetch_limit), 1)
+        if output_dir:
+            self.data_handler.set_output_dir(output_dir)
+
+        self.logger.info(f"⚙️ 설정 변경: {self.interval}초 간격, {self.fetch_limit}개 메시지, 출력 폴더 {self.data_handler.output_dir}")
+        self._wake_event.set()
+        return self.get_status()
+
+    def handle_command(self, request: Dict) -> Dict:
+        """모니터(GUI 등)에서 받은 명령 처리"""
+        command = request.get("command")
+
+        if command == "ping":
+            return {"ok": True}
+        if command == "status":
+            return {"ok": True, "status": self.get_status()}
+        if command == "logs":
+            return {"ok": True, "logs": self.log_buffer.since(int(request.get("since", 0)))}
+        if command == "start":
+            return {"ok": True, "started": self.start()}
+        if command == "stop":
+            # 응답을 먼저 돌려주고 루프는 백그라운드에서 정리
+            threading.Thread(target=self.stop, daemon=True).start()
+            return {"ok": True}
+        if command == "set":
+            return {"ok": True, "status": self.update_settings(
+                request.get("interval"), request.get("fetch_limit"), request.get("output_dir"))}
+        if command == "search":
+            return {"ok": True, "results": self.search_index.search(
+                str(request.get("query", "")), int(request.get("limit", 50)))}
+        if command == "shutdown":
+            self.request_shutdown()
+            return {"ok": True}
+
+        return {"ok": False, "error": f"알 수 없는 명령: {command}"}
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    """연결당 JSON Lines 요청/응답 처리"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.engine.handle_command(json.loads(line))
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode('utf-8'))
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        # 포트 바인딩을 중복 실행 방지에 사용하므로, 실행 중인 엔진의 포트는 빼앗지 않도록 설정
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            # Windows: SO_REUSEADDR는 사용 중인 포트도 바인딩되므로 배타적 사용 지정
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            # 그 외: 종료 직후(TIME_WAIT) 재시작만 허용
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        super().server_bind()
+
+class EngineServer:
+    """엔진 제어용 로컬 소켓 서버 (포트 바인딩 = 엔진 단일 실행 보장)"""
+
+    def __init__(self, engine: Optional[CollectionEngine] = None,
+                 host: str = ENGINE_HOST, port: int = ENGINE_PORT):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self._server = None
+        self._serving = False
+
+    def bind(self) -> bool:
+        """포트 바인딩 (실패 = 다른 엔진 실행 중)"""
+        try:
+            self._server = _ThreadingServer((self.host, self.port), _CommandHandler)
+            self._server.engine = self.engine
+            return True
+        except OSError:
+            return False
+
+    def attach(self, engine: CollectionEngine):
+        """명령을 처리할 엔진 연결 (포트 선점 후 엔진 생성 시)"""
+        self.engine = engine
+        if self._server is not None:
+            self._server.engine = engine
+
+    def start(self):
+        """명령 수신 시작 (백그라운드 스레드)"""
+        self._serving = True
+        threading.Thread(target=self._server.serve_forever, name="EngineServer", daemon=True).start()
+        self.engine.logger.info(f"🔌 엔진 제어 포트 대기 중: {self.host}:{self.port}")
+
+    def close(self):
+        """서버 종료"""
+        if self._server is not None:
+            if self._serving:
+                self._server.shutdown()
+                self._serving = False
+            self._server.server_close()
+            self._server = None
+
+class EngineClient:
+    """수집 엔진에 접속하는 모니터용 클라이언트"""
+
+    def __init__(self, host: str = ENGINE_HOST, port: int = ENGINE_PORT, timeout: float = 3.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile('rb')
+
+    def close(self):
+        """연결 종료"""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        for closable in (self._reader, self._sock):
+            try:
+                if closable is not None:
+                    closable.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def request(self, command: str, **params) -> Dict:
+        """명령 전송 후 응답 반환 (연결 실패 시 OSError)"""
+        payload = (json.dumps({"command": command, **params}, ensure_ascii=False) + "\n").encode('utf-8')
+
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(payload)
+                    line = self._reader.readline()
+                    if not line:
+                        raise ConnectionError("엔진 연결이 끊어졌습니다")
+                    return json.loads(line)
+                except OSError:
+                    # 끊어진 연결은 한 번만 다시 연결해서 재시도
+                    self._close()
+                    if attempt == 1:
+                        raise
+
+    def is_alive(self) -> bool:
+        """엔진 실행 여부"""
+        try:
+            return self.request("ping").get("ok", False)
+        except OSError:
+            return False
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+분석용 컬럼 형식 내보내기 도구
+스냅샷 이력(또는 백필 아카이브)의 메시지를 날짜별로 나눈 Parquet/Arrow IPC 파일로 변환
+(시각 컬럼은 timestamp 형식, 언어/상태는 범주형, 전체를 한 번에 메모리에 올리지 않고 일정 행 수씩 기록)
+모든 파일은 OUTPUT_SCHEMA로 정한 같은 Arrow 스키마로 기록하므로 폴더 전체를 하나의 데이터셋으로 읽을 수 있음
+
+사용법:
+    python export_analytics.py [--source history|archive] [--format parquet|arrow] [--out ./analytics] [--overwrite]
+
+결과 폴더 구조:
+    analytics/date=2025-10-03/part-00000.parquet
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from config import (
+    HISTORY_DIR, BACKFILL_OUTPUT_DIR, ANALYTICS_OUTPUT_DIR, ANALYTICS_BATCH_ROWS,
+    ANALYTICS_TIMESTAMP_FIELDS, ANALYTICS_CATEGORY_FIELDS, OUTPUT_SCHEMA
+)
+from aggregates import parse_timestamp
+from history import read_index, iter_records
+from logger import get_logger
+
+ARCHIVE_FILENAME = "messages_archive.jsonl"
+_UNKNOWN_DATE = "unknown"
+
+def iter_history_messages(history_dir: str) -> Iterator[Dict]:
+    """이력에 기록된 메시지를 최신 기록부터 (세그먼트 하나씩 읽어 역순으로)"""
+    for segment in reversed(read_index(history_dir)):
+        try:
+            records = list(iter_records(history_dir, segment))
+        except OSError:
+            continue
+        for record in reversed(records):
+            yield from record.get("messages") or record.get("upserts") or []
+
+def iter_archive_messages(archive_path: str) -> Iterator[Dict]:
+    """백필 아카이브(JSON Lines)의 메시지"""
+    with open(archive_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def schema_columns(source: str) -> Tuple[List[str], List[str]]:
+    """내보낼 컬럼과 그중 유닉스 시간(정수) 컬럼
+
+    history: OUTPUT_SCHEMA의 출력 이름, archive: OUTPUT_SCHEMA가 읽는 원본 필드 (epoch 변환 전이므로 정수 컬럼 없음)
+    """
+    fields = [{"name": field} if isinstance(field, str) else field for field in OUTPUT_SCHEMA]
+    if source == "archive":
+        return list(dict.fromkeys(field.get("source", field["name"]) for field in fields)), []
+    return [field["name"] for field in fields], [field["name"] for field in fields if "epoch" in field]
+
+def analytics_schema(columns: Sequence[str], epoch_columns: Sequence[str] = ()) -> "pa.Schema":
+    """모든 파일이 공유하는 Arrow 스키마 (파일마다 값으로 타입을 추론하면 빈 컬럼이 null 타입이 되어 합쳐 읽을 수 없음)
+
+    유닉스 시간 → int64, ANALYTICS_TIMESTAMP_FIELDS → timestamp[us, UTC],
+    ANALYTICS_CATEGORY_FIELDS → dictionary<int32, string>, 나머지 → string
+    """
+    fields = []
+    for column in columns:
+        if column in epoch_columns:
+            fields.append(pa.field(column, pa.int64()))
+        elif column in ANALYTICS_TIMESTAMP_FIELDS:
+            fields.append(pa.field(column, pa.timestamp("us", tz="UTC")))
+        elif column in ANALYTICS_CATEGORY_FIELDS:
+            fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+def _as_string(value):
+    """string 컬럼 값 (문자열이 아닌 값은 JSON 문자열로)"""
+    return value if value is None or isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+class ColumnarExporter:
+    """메시지를 날짜 파티션별로 모아 ANALYTICS_BATCH_ROWS행마다 파일 1개로 기록 (모든 파일이 같은 스키마)"""
+
+    def __init__(self, output_dir: str, schema: "pa.Schema", file_format: str = "parquet",
+                 batch_rows: int = ANALYTICS_BATCH_ROWS):
+        self.logger = get_logger("ColumnarExporter")
+        self.output_dir = output_dir
+        self.schema = schema
+        self.file_format = file_format
+        self.batch_rows = max(int(batch_rows), 1)
+        self._buffers: Dict[str, List[Dict]] = {}
+        self._parts: Dict[str, int] = {}
+        self._seen = set()
+        self._ignored = set()  # 스키마에 없어 기록하지 않은 필드
+        self.stats = {"rows": 0, "files": 0, "skipped": 0, "coerced": 0}
+
+    @staticmethod
+    def _partition_date(msg: Dict) -> str:
+        """created_at의 UTC 날짜 (없거나 해석할 수 없으면 unknown)"""
+        ts = parse_timestamp(msg.get("created_at"))
+        return _UNKNOWN_DATE if ts is None else datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+    def add(self, msg: Dict):
+        """메시지 1개 추가 (같은 id는 처음 받은 것만, 이력은 최신 기록부터 주므로 최종 내용이 남음)"""
+        msg_id = msg.get("id")
+        if msg_id is not None:
+            if msg_id in self._seen:
+                self.stats["skipped"] += 1
+                return
+            self._seen.add(msg_id)
+
+        date = self._partition_date(msg)
+        buffer = self._buffers.setdefault(date, [])
+        buffer.append(msg)
+        if len(buffer) >= self.batch_rows:
+            self._flush(date)
+
+    def _to_table(self, rows: List[Dict]) -> "pa.Table":
+        """행 목록 → self.schema의 Arrow 테이블 (없는 필드는 빈 값)"""
+        for row in rows:
+            self._ignored.update(key for key in row if key not in self.schema.names)
+
+        columns = {}
+        for field in self.schema:
+            values = pd.Series([row.get(field.name) for row in rows], dtype=object)
+            if pa.types.is_timestamp(field.type):
+                # 오프셋·소수점 자릿수가 행마다 달라도 첫 행 형식으로 추론하지 않도록 ISO 8601로 고정
+                parsed = pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601")
+                coerced = int((values.notna() & parsed.isna()).sum())
+                if coerced:
+                    self.stats["coerced"] += coerced
+                    self.logger.warning_emoji(f"{field.name}: 해석할 수 없는 시각 {coerced}개를 빈 값(NaT)으로 기록")
+                columns[field.name] = parsed.dt.floor("us")
+            elif pa.types.is_integer(field.type):
+                columns[field.name] = values.map(lambda value: value if isinstance(value, int) else None)
+            else:
+                columns[field.name] = values.map(_as_string)
+        return pa.Table.from_pandas(pd.DataFrame(columns), schema=self.schema, preserve_index=False)
+
+    def _flush(self, date: str):
+        rows = self._buffers.pop(date, None)
+        if not rows:
+            return
+
+        part = self._parts.get(date, 0)
+        self._parts[date] = part + 1
+        partition_dir = os.path.join(self.output_dir, f"date={date}")
+        os.makedirs(partition_dir, exist_ok=True)
+
+        table = self._to_table(rows)
+        if self.file_format == "arrow":
+            path = os.path.join(partition_dir, f"part-{part:05d}.arrow")
+            feather.write_feather(table, path)  # Feather v2 = Arrow IPC 파일 형식
+        else:
+            path = os.path.join(partition_dir, f"part-{part:05d}.parquet")
+            pq.write_table(table, path)
+
+        self.stats["rows"] += len(rows)
+        self.stats["files"] += 1
+        self.logger.progress(f"date={date} part-{part:05d}: {len(rows)}행")
+
+    def close(self):
+        """남은 행 모두 기록"""
+        for date in list(self._buffers):
+            self._flush(date)
+        if self._ignored:
+            self.logger.warning_emoji(f"스키마(OUTPUT_SCHEMA)에 없어 기록하지 않은 필드: {', '.join(sorted(map(str, self._ignored)))}")
+
+def main():
+    parser = argparse.ArgumentParser(description="메시지 이력을 날짜별 Parquet/Arrow 파일로 내보냅니다")
+    parser.add_argument("--source", choices=("history", "archive"), default="history",
+                        help="history: 스냅샷 이력(OUTPUT_SCHEMA 필드), archive: 백필 아카이브(OUTPUT_SCHEMA가 읽는 원본 필드)")
+    parser.add_argument("--format", choices=("parquet", "arrow"), default="parquet", help="파일 형식")
+    parser.add_argument("--out", default=ANALYTICS_OUTPUT_DIR, help="저장 폴더")
+    parser.add_argument("--batch-rows", type=int, default=ANALYTICS_BATCH_ROWS, help="파일 1개의 최대 행 수")
+    parser.add_argument("--overwrite", action="store_true", help="기존 date=* 폴더를 지우고 다시 내보내기")
+    args = parser.parse_args()
+
+    logger = get_logger("ExportAnalytics")
+    if pa is None:
+        logger.error_emoji("pyarrow가 설치되어 있지 않습니다: pip install -r requirements.txt")
+        sys.exit(2)
+
+    if os.path.isdir(args.out):
+        existing = [name for name in os.listdir(args.out) if name.startswith("date=")]
+        if existing and not args.overwrite:
+            logger.error_emoji(f"{args.out}에 이전 내보내기 결과가 있습니다 (--overwrite로 덮어쓰기)")
+            sys.exit(1)
+        for name in existing:
+            shutil.rmtree(os.path.join(args.out, name))
+
+    if args.source == "archive":
+        archive_path = os.path.join(BACKFILL_OUTPUT_DIR, ARCHIVE_FILENAME)
+        if not os.path.exists(archive_path):
+            logger.error_emoji(f"백필 아카이브가 없습니다: {archive_path} (python backfill.py 먼저 실행)")
+            sys.exit(1)
+        messages = iter_archive_messages(archive_path)
+    else:
+        if not read_index(HISTORY_DIR):
+            logger.error_emoji(f"스냅샷 이력이 없습니다: {HISTORY_DIR} (USE_FIXED_FILENAME = False로 수집)")
+            sys.exit(1)
+        messages = iter_history_messages(HISTORY_DIR)
+
+    columns, epoch_columns = schema_columns(args.source)
+    exporter = ColumnarExporter(args.out, analytics_schema(columns, epoch_columns), args.format, args.batch_rows)
+    for msg in messages:
+        exporter.add(msg)
+    exporter.close()
+
+    logger.success(f"내보내기 완료: {exporter.stats['rows']}행, {exporter.stats['files']}개 파일 → {args.out}")
+    if exporter.stats["coerced"]:
+        logger.warning_emoji(f"시각을 해석할 수 없어 빈 값으로 기록한 항목: {exporter.stats['coerced']}개")
+
+if __name__ == "__main__":
+    main()
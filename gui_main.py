@@ -12,59 +12,26 @@ from datetime import datetime
 import os
 import json
 import sys
-import socket
+import re
+import queue
+import subprocess
 
 from config import *
-from db_client import DBClient
-from data_handler import DataHandler
-from logger import get_logger
-
-class SingleInstance:
-    """프로그램 중복 실행 방지 클래스"""
-    
-    def __init__(self, port=12345):
-        self.port = port
-        self.socket = None
-        
-    def is_running(self):
-        """다른 인스턴스가 실행 중인지 확인"""
-        try:
-            # 소켓을 사용해서 포트를 바인딩 시도
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket.bind(('localhost', self.port))
-            self.socket.listen(1)
-            return False  # 바인딩 성공 = 다른 인스턴스 없음
-        except socket.error:
-            return True  # 바인딩 실패 = 다른 인스턴스 실행 중
-    
-    def cleanup(self):
-        """소켓 정리"""
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
+from engine import EngineClient
+from logger import get_log_files, read_log_file
 
 class DBToJSONGUI:
-    """DB → JSON 플러그인 GUI 클래스"""
+    """DB → JSON 플러그인 GUI 클래스 (수집 엔진에 접속하는 모니터)"""
     
     def __init__(self):
-        # 중복 실행 방지
-        self.single_instance = SingleInstance()
-        if self.single_instance.is_running():
-            messagebox.showerror("오류", "프로그램이 이미 실행 중입니다!\n\n다른 창을 확인해주세요.")
-            sys.exit(1)
-        
         self.root = tk.Tk()
         self.root.title("LoadDB(directorkim@scenes.kr)")
         self.root.geometry("400x600")
         self.root.resizable(True, True)
         
-        # 상태 변수
+        # 상태 변수 (엔진에서 주기적으로 받아옴)
         self.is_running = False
-        self.db_client = None
-        self.data_handler = None
+        self.engine_connected = False
         self.stats = {
             "start_time": None,
             "total_runs": 0,
@@ -73,6 +40,16 @@ class DBToJSONGUI:
             "total_messages_saved": 0
         }
         
+        # 로그 큐 (작업 스레드는 큐에 넣기만 하고, 위젯 갱신은 Tk 메인 루프에서 일괄 처리)
+        self.log_queue = queue.Queue()
+        self.stats_dirty = False
+        
+        # 엔진 접속 (엔진이 없으면 백그라운드로 실행)
+        self.engine_client = EngineClient()
+        self.last_log_seq = 0
+        self.auto_start_pending = False
+        self.closing = False
+        
         # GUI 구성 요소 생성
         self.create_widgets()
         self.load_config()
@@ -80,8 +57,11 @@ class DBToJSONGUI:
         # 창 닫기 이벤트 처리
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
-        # 자동 시작 체크 (GUI 로드 후 약간의 지연을 두고 실행)
-        self.root.after(1000, self.check_auto_start)
+        # 엔진 상태/로그 조회 시작 (자동 시작 체크는 첫 조회 후)
+        threading.Thread(target=self.poll_engine_loop, daemon=True).start()
+        
+        # 로그/통계 화면 갱신 시작
+        self.root.after(GUI_LOG_REFRESH_MS, self.drain_log_queue)
     
     def create_widgets(self):
         """GUI 위젯 생성"""
@@ -217,6 +197,11 @@ class DBToJSONGUI:
         self.log_text = scrolledtext.ScrolledText(log_frame, height=15, width=40)
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
+        # 로그 레벨별 색상 태그 (한 번만 설정)
+        self.log_text.tag_config("ERROR", foreground="red")
+        self.log_text.tag_config("SUCCESS", foreground="green")
+        self.log_text.tag_config("WARNING", foreground="orange")
+        
         # 로그 제어 버튼
         log_control_frame = ttk.Frame(log_frame)
         log_control_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
@@ -225,30 +210,58 @@ class DBToJSONGUI:
         ttk.Button(log_control_frame, text="💾 로그 저장", command=self.save_log).pack(side=tk.LEFT)
     
     def log_message(self, message, level="INFO"):
-        """로그 메시지 추가"""
+        """로그 메시지 추가 (어느 스레드에서든 호출 가능, 화면 반영은 drain_log_queue에서)"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {level} {message}\n"
-        
-        self.log_text.insert(tk.END, log_entry)
-        self.log_text.see(tk.END)
-        
-        # 로그 레벨에 따른 색상 설정
-        if level == "ERROR":
-            self.log_text.tag_add("error", f"end-{len(log_entry)}c", "end-1c")
-            self.log_text.tag_config("error", foreground="red")
-        elif level == "SUCCESS":
-            self.log_text.tag_add("success", f"end-{len(log_entry)}c", "end-1c")
-            self.log_text.tag_config("success", foreground="green")
-        elif level == "WARNING":
-            self.log_text.tag_add("warning", f"end-{len(log_entry)}c", "end-1c")
-            self.log_text.tag_config("warning", foreground="orange")
+        self.log_queue.put((f"[{timestamp}] {level} {message}\n", level))
+    
+    def drain_log_queue(self):
+        """쌓인 로그를 일정 주기로 모아서 위젯에 반영 (최대 GUI_LOG_MAX_LINES줄 유지)"""
+        try:
+            entries = []
+            while True:
+                try:
+                    entries.append(self.log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if entries:
+                # 어차피 잘려나갈 줄은 그리지 않음
+                entries = entries[-GUI_LOG_MAX_LINES:]
+                
+                # 한 번의 insert 호출로 일괄 추가 (텍스트, 태그 쌍)
+                insert_args = []
+                for log_entry, level in entries:
+                    insert_args.extend((log_entry, level))
+                self.log_text.insert(tk.END, *insert_args)
+                
+                # 오래된 줄 제거
+                line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+                if line_count > GUI_LOG_MAX_LINES:
+                    self.log_text.delete("1.0", f"{line_count - GUI_LOG_MAX_LINES + 1}.0")
+                
+                self.log_text.see(tk.END)
+            
+            if self.stats_dirty:
+                self.stats_dirty = False
+                self.update_stats()
+            
+            if self.auto_start_pending:
+                self.auto_start_pending = False
+                self.check_auto_start()
+        finally:
+            self.root.after(GUI_LOG_REFRESH_MS, self.drain_log_queue)
     
     def clear_log(self):
         """로그 지우기"""
         self.log_text.delete(1.0, tk.END)
     
     def save_log(self):
-        """로그 저장"""
+        """로그 저장 (화면에 남은 일부가 아닌 엔진 로그 파일 전체를 저장)"""
+        log_files = get_log_files() if LOG_TO_FILE else []
+        if not log_files:
+            messagebox.showwarning("로그 저장", "저장할 로그 파일이 없습니다.\n\nconfig.py의 LOG_TO_FILE 설정을 확인해주세요.")
+            return
+        
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
             filetypes=[("텍스트 파일", "*.txt"), ("모든 파일", "*.*")]
@@ -256,8 +269,9 @@ class DBToJSONGUI:
         if filename:
             try:
                 with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(self.log_text.get(1.0, tk.END))
-                self.log_message("로그가 저장되었습니다.", "SUCCESS")
+                    for log_file in log_files:
+                        f.write(read_log_file(log_file))
+                self.log_message(f"로그가 저장되었습니다. (로그 파일 {len(log_files)}개)", "SUCCESS")
             except Exception as e:
                 self.log_message(f"로그 저장 실패: {e}", "ERROR")
     
@@ -436,14 +450,16 @@ class DBToJSONGUI:
             self.log_message("⏸️ 자동 시작이 비활성화되었습니다.", "INFO")
     
     def check_auto_start(self):
-        """자동 시작 체크"""
+        """자동 시작 체크 (엔진에 처음 접속했을 때 1회)"""
         try:
             from config import AUTO_START
             
             # config.py의 AUTO_START 설정과 GUI 체크박스 동기화
             self.auto_start_var.set(AUTO_START)
             
-            if AUTO_START and not self.is_running:
+            if self.is_running:
+                self.log_message("🔌 이미 데이터를 수집 중인 엔진에 접속했습니다.", "SUCCESS")
+            elif AUTO_START:
                 self.log_message("🔄 자동 시작이 활성화되어 있습니다. 데이터 수집을 시작합니다...", "INFO")
                 self.start_plugin()
             else:
@@ -469,61 +485,42 @@ class DBToJSONGUI:
         except Exception as e:
             self.log_message(f"설정 로드 실패: {e}", "ERROR")
     
-    def save_config(self):
-        """설정 자동 저장 (프로그램 종료 시 호출)"""
+    def save_config(self, wait: bool = False):
+        """설정 자동 저장 (프로그램 종료 시 호출, wait: 엔진 반영이 끝날 때까지 대기)"""
         try:
-            # config.py 파일 업데이트
-            config_content = f'''# -*- coding: utf-8 -*-
-"""
-DB → JSON 자동 저장 플러그인 설정 파일
-ArtistSul CMS 데이터베이스 연동 설정
-"""
-
-# API 설정 (하드코딩)
-BASE_URL = "https://artistsul-cms-worker.directorkim.workers.dev"
-JWT_TOKEN = "None"
-
-# 출력 설정
-OUTPUT_DIR = "{self.output_dir_var.get()}"
-JSON_FILENAME_PREFIX = "messages"
-JSON_FILENAME = "messages.json"  # 고정 파일명 (갱신 방식)
-USE_FIXED_FILENAME = True  # True: 고정 파일명, False: 타임스탬프 포함
-
-# 실행 설정
-INTERVAL_SECONDS = {max(int(self.interval_var.get()), 5)}  # 최소 5초 강제
-FETCH_LIMIT = {self.fetch_limit_var.get()}
-AUTO_START = {self.auto_start_var.get()}  # 프로그램 실행 시 자동으로 데이터 수집 시작
-
-# 로그 설정
-LOG_TO_CONSOLE = True
-LOG_TO_FILE = True
-LOG_FILE_PATH = "./logs/app.log"
-
-# 재시도 설정
-MAX_RETRIES = 3
-RETRY_DELAY = 5
-
-# 데이터베이스 쿼리 설정
-DEFAULT_START_DATE = "2025-01-01"
-DEFAULT_END_DATE = None
-
-# API 엔드포인트
-API_ENDPOINTS = {{
-    "messages": "/api/messages",
-    "login": "/api/admin/login",
-    "export": "/api/messages/export"
-}}
-
-# 요청 헤더
-DEFAULT_HEADERS = {{
-    "Content-Type": "application/json",
-    "User-Agent": "DBToJSON-Plugin/1.0"
-}}
-'''
+            # config.py 파일 업데이트 (GUI에서 관리하는 항목만 교체, 나머지 설정은 유지)
+            gui_settings = {
+                "OUTPUT_DIR": f'"{self.output_dir_var.get()}"',
+                "INTERVAL_SECONDS": str(max(int(self.interval_var.get()), 5)),
+                "FETCH_LIMIT": str(self.fetch_limit_var.get()),
+                "AUTO_START": str(self.auto_start_var.get())
+            }
+            
+            with open("config.py", 'r', encoding='utf-8') as f:
+                config_content = f.read()
+            
+            for key, value in gui_settings.items():
+                # 값만 교체하고 행 끝의 주석은 유지
+                config_content = re.sub(
+                    rf'^({key}\s*=\s*)("[^"]*"|[^#\n]*?)(\s*(#.*)?)$',
+                    lambda m, value=value: f"{m.group(1)}{value}{m.group(3)}",
+                    config_content,
+                    count=1,
+                    flags=re.MULTILINE
+                )
             
             with open("config.py", 'w', encoding='utf-8') as f:
                 f.write(config_content)
             
+            # 실행 중인 엔진에도 즉시 반영
+            self.send_engine_command(
+                "set",
+                interval=max(int(self.interval_var.get()), 5),
+                fetch_limit=int(self.fetch_limit_var.get()),
+                output_dir=self.output_dir_var.get(),
+                wait=wait
+            )
+            
             self.log_message("설정이 저장되었습니다.", "SUCCESS")
             messagebox.showinfo("성공", "설정이 저장되었습니다!")
             
@@ -532,148 +529,132 @@ DEFAULT_HEADERS = {{
             messagebox.showerror("오류", f"설정 저장 실패: {e}")
     
     def start_plugin(self):
-        """플러그인 시작"""
+        """데이터 수집 시작 (엔진에 명령 전송)"""
         if self.is_running:
             return
         
-        try:
-            # 상태 업데이트
-            self.is_running = True
-            self.start_button.config(state=tk.DISABLED)
-            self.stop_button.config(state=tk.NORMAL)
-            self.status_var.set("실행 중...")
-            
-            # 통계 초기화
-            self.stats["start_time"] = datetime.now()
-            self.stats["total_runs"] = 0
-            self.stats["successful_runs"] = 0
-            self.stats["failed_runs"] = 0
-            self.stats["total_messages_saved"] = 0
-            
-            self.log_message("플러그인이 시작되었습니다.", "SUCCESS")
-            
-            # 메인 실행 루프 시작
-            self.run_main_loop()
-            
-        except Exception as e:
-            self.log_message(f"시작 오류: {e}", "ERROR")
-            self.stop_plugin()
+        self.start_button.config(state=tk.DISABLED)
+        self.status_var.set("시작 중...")
+        self.send_engine_command("start", on_success=lambda response: self.log_message("플러그인이 시작되었습니다.", "SUCCESS"))
     
     def stop_plugin(self):
-        """플러그인 중지"""
-        self.is_running = False
-        self.start_button.config(state=tk.NORMAL)
+        """데이터 수집 중지 (엔진에 명령 전송, 엔진 프로세스는 유지)"""
         self.stop_button.config(state=tk.DISABLED)
-        self.status_var.set("중지됨")
-        self.log_message("플러그인이 중지되었습니다.", "WARNING")
+        self.status_var.set("중지 중...")
+        self.send_engine_command("stop", on_success=lambda response: self.log_message("플러그인이 중지되었습니다.", "WARNING"))
     
-    def run_main_loop(self):
-        """메인 실행 루프"""
-        def main_loop_thread():
+    def send_engine_command(self, command, on_success=None, wait=False, **params):
+        """엔진 명령 전송 (Tk 메인 루프를 막지 않도록 별도 스레드에서, wait=True면 현재 스레드에서 응답까지 대기)"""
+        def worker():
             try:
-                # DB 클라이언트 및 데이터 핸들러 초기화
-                self.db_client = DBClient()
-                self.db_client.base_url = self.api_url_var.get()
-                self.db_client.jwt_token = self.jwt_token_var.get()
-                
-                self.data_handler = DataHandler()
-                self.data_handler.output_dir = self.output_dir_var.get()
-                
-                while self.is_running:
-                    try:
-                        # 실행 사이클
-                        self.run_single_cycle()
-                        
-                        # 다음 실행까지 대기 (최소 5초 보장)
-                        interval = max(int(self.interval_var.get()), 5)
-                        for _ in range(interval):
-                            if not self.is_running:
-                                break
-                            time.sleep(1)
-                            
-                    except Exception as e:
-                        self.log_message(f"실행 루프 오류: {e}", "ERROR")
-                        self.stats["failed_runs"] += 1
-                        time.sleep(5)
-                        
-            except Exception as e:
-                self.log_message(f"메인 루프 오류: {e}", "ERROR")
-            finally:
-                if self.is_running:
-                    self.stop_plugin()
-        
-        # 별도 스레드에서 실행
-        threading.Thread(target=main_loop_thread, daemon=True).start()
+                response = self.engine_client.request(command, **params)
+                if not response.get("ok"):
+                    self.log_message(f"엔진 명령 실패 ({command}): {response.get('error')}", "ERROR")
+                elif on_success:
+                    on_success(response)
+            except OSError as e:
+                self.log_message(f"엔진 연결 실패 ({command}): {e}", "ERROR")
+        
+        if wait:
+            worker()
+        else:
+            threading.Thread(target=worker, daemon=True).start()
     
-    def run_single_cycle(self):
-        """단일 실행 사이클"""
-        self.stats["total_runs"] += 1
-        self.stats["last_run_time"] = datetime.now()
+    def launch_engine(self):
+        """수집 엔진을 GUI와 독립된 백그라운드 프로세스로 실행"""
+        engine_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        kwargs = {"cwd": os.path.dirname(engine_script)}
+        
+        if sys.platform == "win32":
+            # GUI 창을 닫아도 엔진은 계속 실행되도록 분리
+            kwargs["creationflags"] = (subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+                                       | subprocess.CREATE_NO_WINDOW)
+        else:
+            kwargs["start_new_session"] = True
         
-        self.log_message(f"실행 사이클 #{self.stats['total_runs']} 시작", "INFO")
+        subprocess.Popen([sys.executable, engine_script, "--engine"],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         **kwargs)
+        self.log_message("🚀 수집 엔진을 백그라운드로 실행했습니다.", "INFO")
+    
+    def poll_engine_loop(self):
+        """엔진 상태/로그 주기적 조회 (백그라운드 스레드)"""
+        first_contact = True
+        launched = False
         
-        try:
-            # 최근 메시지 조회
-            fetch_limit = int(self.fetch_limit_var.get())
-            messages = self.db_client.get_recent_messages(fetch_limit)
-            
-            if messages is None:
-                self.log_message("메시지 조회 실패", "ERROR")
-                self.stats["failed_runs"] += 1
-                return
-            
-            # 메시지가 없어도 빈 데이터로 저장
-            if not messages:
-                self.log_message("조회된 메시지가 없습니다. 빈 데이터로 JSON 파일을 갱신합니다", "INFO")
-                messages = []  # 빈 리스트로 설정
-            
-            # JSON 파일로 저장
-            filepath = self.data_handler.save_messages_to_json(messages)
-            
-            if filepath:
-                self.log_message(f"{len(messages)}개 메시지 저장 완료", "SUCCESS")
-                self.stats["successful_runs"] += 1
-                self.stats["total_messages_saved"] += len(messages)
+        while not self.closing:
+            try:
+                status = self.engine_client.request("status")["status"]
+                logs = self.engine_client.request("logs", since=self.last_log_seq)["logs"]
                 
-                # UI 업데이트
-                self.root.after(0, self.update_stats)
-            else:
-                self.log_message("JSON 저장 실패", "ERROR")
-                self.stats["failed_runs"] += 1
+                for entry in logs:
+                    level = entry["level"]
+                    if level == "INFO" and entry["message"].startswith("✅"):
+                        level = "SUCCESS"
+                    self.log_queue.put((f"[{entry['time']}] {level} {entry['message']}\n", level))
+                    self.last_log_seq = entry["seq"]
                 
-        except Exception as e:
-            self.log_message(f"실행 사이클 오류: {e}", "ERROR")
-            self.stats["failed_runs"] += 1
+                self.is_running = status["running"]
+                self.stats = status["stats"]
+                self.engine_connected = True
+                self.stats_dirty = True
+                
+                if first_contact:
+                    # 자동 시작 체크는 Tk 메인 루프(drain_log_queue)에서 실행
+                    first_contact = False
+                    self.auto_start_pending = True
+                    
+            except OSError:
+                if self.engine_connected or not launched:
+                    self.engine_connected = False
+                    self.stats_dirty = True
+                    if not launched:
+                        launched = True
+                        self.launch_engine()
+                    else:
+                        self.log_message("엔진 연결이 끊어졌습니다. 다시 연결을 시도합니다...", "WARNING")
+            except Exception as e:
+                self.log_message(f"엔진 상태 조회 오류: {e}", "ERROR")
+            
+            time.sleep(GUI_POLL_MS / 1000)
     
     def update_stats(self):
-        """통계 업데이트"""
+        """통계 업데이트 (엔진에서 받은 상태 반영)"""
         self.total_runs_var.set(str(self.stats["total_runs"]))
         self.success_runs_var.set(str(self.stats["successful_runs"]))
         self.messages_saved_var.set(str(self.stats["total_messages_saved"]))
         
         if self.stats.get("last_run_time"):
-            last_run = self.stats["last_run_time"].strftime("%H:%M:%S")
+            last_run = datetime.fromisoformat(self.stats["last_run_time"]).strftime("%H:%M:%S")
             self.last_run_var.set(last_run)
+        
+        # 버튼/상태 표시
+        if not self.engine_connected:
+            self.status_var.set("엔진 연결 대기 중")
+            self.start_button.config(state=tk.DISABLED)
+            self.stop_button.config(state=tk.DISABLED)
+        elif self.is_running:
+            self.status_var.set("실행 중...")
+            self.start_button.config(state=tk.DISABLED)
+            self.stop_button.config(state=tk.NORMAL)
+        else:
+            self.status_var.set("중지됨")
+            self.start_button.config(state=tk.NORMAL)
+            self.stop_button.config(state=tk.DISABLED)
     
     def on_closing(self):
-        """창 닫기 이벤트 처리"""
-        if self.is_running:
-            if messagebox.askokcancel("종료", "플러그인이 실행 중입니다. 정말 종료하시겠습니까?"):
-                self.stop_plugin()
-                self.cleanup_and_exit()
-        else:
-            self.cleanup_and_exit()
+        """창 닫기 이벤트 처리 (데이터 수집은 엔진에서 계속됨)"""
+        self.cleanup_and_exit()
     
     def cleanup_and_exit(self):
         """정리 후 종료"""
         try:
-            # 설정 자동 저장
-            self.save_config()
-            self.log_message("💾 설정이 자동으로 저장되었습니다.", "SUCCESS")
+            self.closing = True
+            
+            # 설정 자동 저장 (연결을 닫기 전에 엔진 반영까지 완료)
+            self.save_config(wait=True)
             
-            # 소켓 정리
-            if hasattr(self, 'single_instance'):
-                self.single_instance.cleanup()
+            self.engine_client.close()
         except Exception as e:
             self.log_message(f"❌ 종료 중 오류: {e}", "ERROR")
         finally:
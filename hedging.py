@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+요청 헤징 모듈
+GET 요청이 최근 응답 시간의 백분위수 안에 끝나지 않으면 같은 요청을 한 번 더 보내
+먼저 도착한 응답을 사용 (느린 쪽 응답은 버림)
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Optional
+import logging
+
+import requests
+
+from config import HEDGE_PERCENTILE, HEDGE_MIN_DELAY, HEDGE_MIN_SAMPLES, HEDGE_MAX_RATE
+
+logger = logging.getLogger(__name__)
+
+# 헤징 기준 계산에 쓰는 최근 응답 시간 개수
+_LATENCY_WINDOW = 200
+
+class RequestHedger:
+    """백분위수 기반 헤지 요청 (두 번째 요청은 별도 세션으로 전송)"""
+
+    def __init__(self, session: requests.Session, percentile: float = HEDGE_PERCENTILE,
+                 min_delay: float = HEDGE_MIN_DELAY, min_samples: int = HEDGE_MIN_SAMPLES,
+                 max_rate: float = HEDGE_MAX_RATE):
+        self.session = session
+        self.hedge_session = requests.Session()
+        self.hedge_session.headers = session.headers  # 인증 헤더 등을 공유
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_rate = max_rate
+
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "skipped_by_rate": 0}
+        self._latencies = deque(maxlen=_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="HedgedRequest")
+
+    def _threshold(self) -> Optional[float]:
+        """헤지 요청을 보낼 대기 시간 (표본이 부족하면 None)"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            samples = sorted(self._latencies)
+        index = min(int(len(samples) * self.percentile / 100), len(samples) - 1)
+        return max(samples[index], self.min_delay)
+
+    def _timed_request(self, session: requests.Session, method: str, url: str, record: bool, **kwargs):
+        started = time.monotonic()
+        response = session.request(method, url, **kwargs)
+        if record:
+            # 헤지 여부와 무관하게 원 요청의 응답 시간으로 분포를 유지
+            with self._lock:
+                self._latencies.append(time.monotonic() - started)
+        return response
+
+    @staticmethod
+    def _discard(future):
+        """늦게 끝난 응답 정리"""
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """헤징을 적용한 요청 (예외는 session.request와 동일하게 전달)"""
+        self.stats["requests"] += 1
+        primary = self._executor.submit(self._timed_request, self.session, method, url, True, **kwargs)
+
+        threshold = self._threshold()
+        if threshold is None:
+            return primary.result()
+
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+
+        if self.stats["hedged"] >= self.stats["requests"] * self.max_rate:
+            # 헤지 비율 상한 (서버 부하 방지)
+            self.stats["skipped_by_rate"] += 1
+            return primary.result()
+
+        self.stats["hedged"] += 1
+        logger.debug(f"🪁 헤지 요청 전송: {threshold * 1000:.0f}ms 내 응답 없음 ({url})")
+        hedge = self._executor.submit(self._timed_request, self.hedge_session, method, url, False, **kwargs)
+
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for other in pending:
+                    other.add_done_callback(self._discard)
+                if future is hedge:
+                    self.stats["hedge_wins"] += 1
+                return future.result()
+
+        # 두 요청 모두 실패한 경우 마지막 예외 전달
+        raise error
+
+    def get_stats(self) -> Dict:
+        """헤지 비율/승률 (JSON 직렬화 가능)"""
+        requests_count = self.stats["requests"]
+        hedged = self.stats["hedged"]
+        threshold = self._threshold()
+        return {
+            **self.stats,
+            "hedge_rate": round(hedged / requests_count, 3) if requests_count else 0.0,
+            "win_rate": round(self.stats["hedge_wins"] / hedged, 3) if hedged else 0.0,
+            "threshold_ms": round(threshold * 1000, 1) if threshold is not None else None
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.hedge_session.close()
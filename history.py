@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+스냅샷 이력 모듈
+주기적인 전체 스냅샷과 그 사이의 변경분(delta)을 세그먼트 파일(JSON Lines)에 이어 쓰고,
+세그먼트별 기간을 index.json에 기록해 보관 기간 정리를 폴더 조회 없이 수행
+
+세그먼트 파일 한 줄 형식:
+    {"type": "full", "at": 시각, "metadata": {...}, "messages": [...]}
+    {"type": "delta", "at": 시각, "metadata": {...}, "upserts": [...], "removed": [id, ...], "ids": [id, ...]}
+    (ids: 변경 후 메시지 순서, upserts: 새로 생겼거나 내용이 바뀐 메시지,
+     metadata: 사이클마다 바뀌는 VOLATILE_METADATA를 뺀 값, delta는 그중 바뀐 항목만
+     + 없어진 metadata 항목이 있으면 "metadataRemoved": [키, ...])
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+import logging
+
+from config import HISTORY_DIR, HISTORY_FULL_INTERVAL, HISTORY_RETENTION_DAYS
+from output_writer import write_atomic
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.json"
+
+# 사이클마다 바뀌어 이력에 기록하지 않는 metadata 항목 (exportedAt/lastSuccessAt은 기록 시각 at으로 복원)
+VOLATILE_METADATA = ("exportedAt", "lastSuccessAt", "aggregates")
+
+def stable_metadata(metadata: Dict) -> Dict:
+    """VOLATILE_METADATA를 뺀 metadata (월 서버 ETag 등 변경 판단용)"""
+    return {key: value for key, value in metadata.items() if key not in VOLATILE_METADATA}
+
+class SnapshotHistory:
+    """전체 스냅샷 + 변경분 세그먼트 이력 (메시지가 바뀐 사이클만 기록)"""
+
+    def __init__(self, history_dir: str = HISTORY_DIR, full_interval: float = HISTORY_FULL_INTERVAL,
+                 retention_days: float = HISTORY_RETENTION_DAYS):
+        self.history_dir = history_dir
+        self.full_interval = full_interval
+        self.retention_days = retention_days
+        self.index_path = os.path.join(history_dir, INDEX_FILENAME)
+        os.makedirs(history_dir, exist_ok=True)
+        self.index = self._load_index()
+
+        # 현재 세그먼트 (재시작 후 첫 기록은 항상 새 세그먼트의 전체 스냅샷)
+        self._segment: Optional[Dict] = None
+        self._segment_started = 0.0
+        self._last_messages: List = []  # 마지막으로 기록한 메시지 목록
+        self._messages: Dict = {}  # id → 마지막으로 기록한 메시지
+        self._ids: Optional[List] = None  # 마지막으로 기록한 메시지 순서 (id로 구분할 수 없었으면 None)
+        self._metadata: Dict = {}  # 마지막으로 기록한 metadata (VOLATILE_METADATA 제외)
+
+    def _load_index(self) -> Dict:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if isinstance(index.get("segments"), list):
+                return index
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {"segments": []}
+
+    def _save_index(self):
+        write_atomic(self.index_path, json.dumps(self.index, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    def _start_segment(self, at: str):
+        # 같은 초에 세그먼트를 여러 번 시작해도 파일이 겹치지 않도록 마이크로초(+ 번호)까지 포함
+        base = f"segment_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S-%f')}"
+        used = {segment["file"] for segment in self.index["segments"]}
+        filename, counter = f"{base}.jsonl", 1
+        while filename in used or os.path.exists(os.path.join(self.history_dir, filename)):
+            filename, counter = f"{base}_{counter}.jsonl", counter + 1
+        self._segment = {"file": filename, "start": at, "end": at, "entries": 0, "bytes": 0}
+        self.index["segments"].append(self._segment)
+        self._segment_started = time.monotonic()
+
+    def append(self, snapshot: Dict) -> bool:
+        """스냅샷 1개 기록 (이전 기록과 메시지가 같으면 기록하지 않고 False)"""
+        messages = snapshot["messages"]
+        metadata = snapshot["metadata"]
+        at = metadata.get("exportedAt") or datetime.now().isoformat()
+        ids = [msg.get("id") for msg in messages]
+        # id로 구분할 수 없는 출력(OUTPUT_SCHEMA에 id가 없는 경우 등)은 변경분 대신 전체 스냅샷 (세그먼트는 유지)
+        keyed = None not in ids and len(set(ids)) == len(ids)
+        stable = stable_metadata(metadata)
+
+        if self._segment is None or time.monotonic() - self._segment_started >= self.full_interval:
+            self._start_segment(at)
+            self.prune()
+            record = {"type": "full", "at": at, "metadata": stable, "messages": messages}
+        elif not keyed or self._ids is None:
+            if messages == self._last_messages and stable == self._metadata:
+                return False
+            record = {"type": "full", "at": at, "metadata": stable, "messages": messages}
+        else:
+            upserts = [msg for msg in messages if self._messages.get(msg["id"]) != msg]
+            current = set(ids)
+            removed = [msg_id for msg_id in self._ids if msg_id not in current]
+            changed_metadata = {key: value for key, value in stable.items()
+                                if key not in self._metadata or self._metadata[key] != value}
+            removed_metadata = [key for key in self._metadata if key not in stable]
+            if not upserts and not removed and ids == self._ids and not changed_metadata and not removed_metadata:
+                return False
+            record = {"type": "delta", "at": at, "metadata": changed_metadata,
+                      "upserts": upserts, "removed": removed, "ids": ids}
+            if removed_metadata:
+                record["metadataRemoved"] = removed_metadata
+
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode('utf-8')
+        with open(os.path.join(self.history_dir, self._segment["file"]), 'ab') as f:
+            f.write(line)
+
+        self._last_messages = messages
+        self._messages = {msg["id"]: msg for msg in messages} if keyed else {}
+        self._ids = ids if keyed else None
+        self._metadata = stable
+        self._segment["end"] = at
+        self._segment["entries"] += 1
+        self._segment["bytes"] += len(line)
+        self._save_index()
+        return True
+
+    def prune(self, keep_days: Optional[float] = None) -> int:
+        """보관 기간이 지난 세그먼트 삭제 (index 기준, 현재 세그먼트 제외), 삭제한 개수 반환"""
+        keep_days = self.retention_days if keep_days is None else keep_days
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat()
+
+        kept, deleted = [], 0
+        for segment in self.index["segments"]:
+            if segment is self._segment or segment["end"] >= cutoff:
+                kept.append(segment)
+                continue
+            try:
+                os.remove(os.path.join(self.history_dir, segment["file"]))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"⚠️ 이력 세그먼트 삭제 실패 (다음 정리 때 재시도): {segment['file']} ({e})")
+                kept.append(segment)
+                continue
+            deleted += 1
+            logger.info(f"🗑️ 오래된 이력 삭제: {segment['file']} ({segment['start']} ~ {segment['end']})")
+
+        if deleted:
+            self.index["segments"] = kept
+            self._save_index()
+        return deleted
+
+    def get_stats(self) -> Dict:
+        segments = self.index["segments"]
+        return {
+            "segments": len(segments),
+            "bytes": sum(segment.get("bytes", 0) for segment in segments),
+            "oldest": segments[0]["start"] if segments else None
+        }
+
+def read_index(history_dir: str = HISTORY_DIR) -> List[Dict]:
+    """index.json의 세그먼트 목록 (시작 시각순)"""
+    try:
+        with open(os.path.join(history_dir, INDEX_FILENAME), 'r', encoding='utf-8') as f:
+            segments = json.load(f).get("segments", [])
+    except (OSError, ValueError, AttributeError):
+        return []
+    return sorted(segments, key=lambda segment: segment["start"])
+
+def iter_records(history_dir: str, segment: Dict) -> Iterator[Dict]:
+    """세그먼트의 기록을 순서대로 (기록 중 중단되어 잘린 줄은 건너뜀)"""
+    with open(os.path.join(history_dir, segment["file"]), 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"⚠️ 이력의 손상된 줄을 건너뜁니다: {segment['file']}")
+
+def apply_record(snapshot: Optional[Dict], record: Dict) -> Optional[Dict]:
+    """이전 스냅샷에 기록 1개 적용 (전체 스냅샷이면 그대로, 변경분이면 추가/수정/삭제/순서 반영)
+
+    변경분의 metadata는 바뀐 항목만 덮어쓰고(없어진 항목은 삭제), exportedAt/lastSuccessAt은 기록 시각으로 설정.
+    aggregates는 기록하지 않으므로 (이전 형식의 전체 스냅샷에 있더라도) 항상 제외해
+    재구성 결과가 시각이 세그먼트의 어디에 있는지와 무관하게 같은 형식
+    """
+    if record.get("type") == "full":
+        metadata = stable_metadata(record["metadata"])
+        messages = record["messages"]
+    elif snapshot is None:
+        return None  # 기준 전체 스냅샷이 없으면 변경분을 적용할 수 없음
+    else:
+        by_id = {msg["id"]: msg for msg in snapshot["messages"]}
+        for msg_id in record.get("removed", []):
+            by_id.pop(msg_id, None)
+        for msg in record.get("upserts", []):
+            by_id[msg["id"]] = msg
+        metadata = stable_metadata(snapshot["metadata"])
+        for key in record.get("metadataRemoved", []):
+            metadata.pop(key, None)
+        metadata.update(record.get("metadata", {}))
+        messages = [by_id[msg_id] for msg_id in record["ids"]]
+    metadata["exportedAt"] = metadata["lastSuccessAt"] = record["at"]
+    return {"metadata": metadata, "messages": messages}
+
+def snapshot_at(at: str, history_dir: str = HISTORY_DIR) -> Optional[Dict]:
+    """at(ISO 시각, 로컬 시간) 시점에 messages.json에 있던 스냅샷 재구성 (이력이 없는 시점이면 None)
+
+    index로 at 이전에 시작한 마지막 세그먼트를 찾고, 그 전체 스냅샷에 at까지의 변경분만 적용.
+    메시지가 바뀐 사이클만 기록되므로 metadata.exportedAt은 at 직전 마지막 변경 시각
+    """
+    segment = None
+    for candidate in read_index(history_dir):
+        if candidate["start"] > at:
+            break
+        segment = candidate
+    if segment is None:
+        return None
+
+    snapshot = None
+    for record in iter_records(history_dir, segment):
+        if record.get("at", "") > at:
+            break
+        snapshot = apply_record(snapshot, record)
+    return snapshot
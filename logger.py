@@ -2,14 +2,30 @@
 """
 로깅 모듈
 콘솔 및 파일 로그 출력을 담당
+로그 기록은 큐에만 넣고, 실제 콘솔/파일 출력은 별도 리스너 스레드가 처리
 """
 
+import atexit
+import glob
+import gzip
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
+import threading
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from config import LOG_TO_CONSOLE, LOG_TO_FILE, LOG_FILE_PATH
+from config import (
+    LOG_TO_CONSOLE, LOG_TO_FILE, LOG_FILE_PATH, LOG_LEVEL,
+    LOG_ROTATE_WHEN, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_COMPRESS_BACKUPS
+)
+
+# 큐 리스너 (프로세스당 1개, 최초 Logger 생성 시 구성)
+_listener = None
+_listener_lock = threading.Lock()
+_file_logging = False  # 이 프로세스가 로그 파일을 소유하는지 여부 (enable_file_logging)
 
 class ColoredFormatter(logging.Formatter):
     """컬러가 포함된 로그 포맷터"""
@@ -25,66 +41,174 @@ class ColoredFormatter(logging.Formatter):
     }
     
     def format(self, record):
-        # 컬러 적용
+        # 컬러 적용 (같은 레코드를 받는 파일 핸들러에 색상 코드가 섞이지 않도록 복사본 사용)
         if record.levelname in self.COLORS:
+            record = logging.makeLogRecord(record.__dict__)
             record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{self.COLORS['RESET']}"
         
         return super().format(record)
 
+def _gzip_namer(name: str) -> str:
+    """회전된 로그 파일명 (압축 시 .gz 확장자)"""
+    return f"{name}.gz"
+
+def _gzip_rotator(source: str, dest: str):
+    """회전된 로그 파일을 gzip으로 압축 후 원본 삭제"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+def _create_console_handler() -> logging.Handler:
+    """콘솔 핸들러 생성"""
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    
+    # 컬러 포맷터 사용
+    console_formatter = ColoredFormatter(
+        '[%(asctime)s] %(levelname)s %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    console_handler.setFormatter(console_formatter)
+    return console_handler
+
+def _create_file_handler() -> Optional[logging.Handler]:
+    """파일 핸들러 생성 (크기 또는 시간 기준 회전)"""
+    try:
+        # 로그 디렉토리 생성
+        log_dir = os.path.dirname(LOG_FILE_PATH)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+        
+        if LOG_ROTATE_WHEN:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                LOG_FILE_PATH, when=LOG_ROTATE_WHEN,
+                backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                LOG_FILE_PATH, maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True
+            )
+        
+        if LOG_COMPRESS_BACKUPS:
+            file_handler.namer = _gzip_namer
+            file_handler.rotator = _gzip_rotator
+        
+        file_handler.setLevel(logging.DEBUG)
+        
+        # 파일 포맷터 (컬러 없음)
+        file_formatter = logging.Formatter(
+            '[%(asctime)s] %(levelname)s %(name)s: %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        file_handler.setFormatter(file_formatter)
+        return file_handler
+        
+    except Exception as e:
+        print(f"❌ 로그 파일 설정 실패: {e}")
+        return None
+
+def _ensure_listener():
+    """큐 리스너 구성 (최초 1회)
+
+    모든 로거는 루트 로거의 QueueHandler로 레코드를 큐에 넣기만 하고,
+    콘솔 출력과 파일 쓰기/회전/압축은 리스너 스레드에서 처리한다.
+    파일 핸들러는 enable_file_logging을 호출한 프로세스만 추가한다.
+    """
+    global _listener
+    
+    with _listener_lock:
+        if _listener is not None:
+            return
+        
+        handlers = []
+        if LOG_TO_CONSOLE:
+            handlers.append(_create_console_handler())
+        
+        log_queue = queue.SimpleQueue()
+        root_logger = logging.getLogger()
+        root_logger.setLevel(LOG_LEVEL)
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+def add_listener_handler(handler: logging.Handler):
+    """리스너 스레드에서 실행될 핸들러 추가 (로그를 기록하는 스레드에 부담을 주지 않음)"""
+    _ensure_listener()
+    with _listener_lock:
+        if _listener is not None:
+            _listener.handlers = _listener.handlers + (handler,)
+
+def enable_file_logging():
+    """로그 파일 기록 시작 (LOG_TO_FILE일 때, 수집 엔진 프로세스에서만 호출)
+
+    GUI 등 다른 프로세스가 같은 로그 파일을 열어 두면 Windows에서 엔진의 회전(이름 변경/삭제)이
+    실패하므로, 모듈 import만으로는 파일을 열지 않는다.
+    """
+    global _file_logging
+    
+    if not LOG_TO_FILE or _file_logging:
+        return
+    file_handler = _create_file_handler()
+    if file_handler:
+        _file_logging = True
+        add_listener_handler(file_handler)
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 기록하고 리스너 종료"""
+    global _listener, _file_logging
+    
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _file_logging = False
+
+def get_log_files() -> List[str]:
+    """로그 파일 경로 목록 (회전된 이전 파일 → 현재 파일 순, 오래된 것부터)"""
+    numbered, timed = [], []
+    for path in glob.glob(f"{glob.escape(LOG_FILE_PATH)}.*"):
+        suffix = path[len(LOG_FILE_PATH) + 1:]
+        if suffix.endswith('.gz'):
+            suffix = suffix[:-3]
+        
+        if suffix.isdigit():
+            # 크기 기준 회전: 번호가 클수록 오래된 파일
+            numbered.append((int(suffix), path))
+        else:
+            # 시간 기준 회전: 날짜 접미사 순이 시간 순
+            timed.append(path)
+    
+    files = sorted(timed) + [path for _, path in sorted(numbered, reverse=True)]
+    if os.path.exists(LOG_FILE_PATH):
+        files.append(LOG_FILE_PATH)
+    return files
+
+def read_log_file(path: str) -> str:
+    """로그 파일 내용 읽기 (gzip 압축 파일 지원)"""
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
 class Logger:
     """로깅 시스템 관리 클래스"""
     
     def __init__(self, name: str = "DBToJSON"):
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.setLevel(LOG_LEVEL)
         
-        # 기존 핸들러 제거
+        # 기존 핸들러 제거 (출력은 루트 로거의 큐 핸들러가 담당)
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
         
-        self._setup_console_handler()
-        if LOG_TO_FILE:
-            self._setup_file_handler()
-    
-    def _setup_console_handler(self):
-        """콘솔 핸들러 설정"""
-        if not LOG_TO_CONSOLE:
-            return
-        
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # 컬러 포맷터 사용
-        console_formatter = ColoredFormatter(
-            '[%(asctime)s] %(levelname)s %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        console_handler.setFormatter(console_formatter)
-        
-        self.logger.addHandler(console_handler)
-    
-    def _setup_file_handler(self):
-        """파일 핸들러 설정"""
-        try:
-            # 로그 디렉토리 생성
-            log_dir = os.path.dirname(LOG_FILE_PATH)
-            if log_dir and not os.path.exists(log_dir):
-                os.makedirs(log_dir)
-            
-            file_handler = logging.FileHandler(LOG_FILE_PATH, encoding='utf-8')
-            file_handler.setLevel(logging.DEBUG)
-            
-            # 파일 포맷터 (컬러 없음)
-            file_formatter = logging.Formatter(
-                '[%(asctime)s] %(levelname)s %(name)s: %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            file_handler.setFormatter(file_formatter)
-            
-            self.logger.addHandler(file_handler)
-            
-        except Exception as e:
-            print(f"❌ 로그 파일 설정 실패: {e}")
+        _ensure_listener()
     
     def debug(self, message: str):
         """디버그 로그"""
@@ -126,6 +250,3 @@ def get_logger(name: str = "DBToJSON") -> Logger:
     """로거 인스턴스 반환"""
     return Logger(name)
 
-# 전역 로거 인스턴스
-logger = get_logger()
-
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+메시지 검열 모듈
+금칙어 목록을 Aho-Corasick 오토마톤으로 한 번 컴파일해 content를 한 번 훑는 것으로 모든 금칙어를 검사
+(목록 파일이 바뀔 때만 다시 컴파일, 판정 결과는 메시지 id별로 기억해 바뀌지 않은 메시지는 다시 검사하지 않음)
+
+금칙어는 띄어쓰기 경계를 넘어 일치하지 않음 ("시 발표"는 "시발"과 다름).
+띄어 써서 피하는 경우까지 잡아야 하는 단어는 목록에서 "~"를 앞에 붙임 (예: ~시발 → "시 발"도 일치)
+"""
+
+import os
+import re
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from config import MODERATION_WORDLIST_PATH, MODERATION_ACTION, MODERATION_CACHE_LIMIT
+from search_index import normalize
+
+logger = logging.getLogger(__name__)
+
+# 문장부호로 금칙어를 끊어 쓰는 경우도 잡도록 비교 전에 제거 (띄어쓰기는 단어 경계로 유지)
+_PUNCTUATION = re.compile(r"[^\w\s]+|_+")
+_WHITESPACE = re.compile(r"\s+")
+
+# 띄어쓰기를 무시하고 비교할 금칙어 표시
+COMPACT_PREFIX = "~"
+
+def _prepare(text: str) -> str:
+    """비교용 문자열 (정규화, 문장부호 제거, 연속 공백은 공백 1개)"""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub("", normalize(text))).strip()
+
+def _compact(text: str) -> str:
+    """띄어쓰기까지 제거한 비교용 문자열 ("~" 금칙어용)"""
+    return _WHITESPACE.sub("", _prepare(text))
+
+class AhoCorasick:
+    """다중 패턴 문자열 검색 오토마톤"""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (index,)
+
+        # 너비 우선으로 실패 링크 계산 (실패 링크 쪽 출력도 합쳐 검색 중 따라갈 필요 없음)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> List[str]:
+        """text에 포함된 패턴 목록 (중복 제거, 처음 나온 순서)"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        found = {}
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                found.setdefault(index, None)
+        return [self.patterns[index] for index in found]
+
+class ModerationFilter:
+    """금칙어 포함 메시지 표시(tag) 또는 제외(drop)
+
+    tag: 금칙어가 포함된 메시지에 flagged=True, flaggedWords 추가 (OUTPUT_SCHEMA에 해당 이름이 있어야 출력됨)
+    drop: 금칙어가 포함된 메시지를 목록에서 제외
+    """
+
+    def __init__(self, wordlist_path: str = MODERATION_WORDLIST_PATH, action: str = MODERATION_ACTION,
+                 cache_limit: int = MODERATION_CACHE_LIMIT):
+        if action not in ("tag", "drop"):
+            raise ValueError(f"알 수 없는 MODERATION_ACTION: {action}")
+        self.wordlist_path = wordlist_path
+        self.action = action
+        self.cache_limit = cache_limit
+        self.automaton: Optional[AhoCorasick] = None  # 띄어쓰기 경계를 지키는 금칙어
+        self.compact_automaton: Optional[AhoCorasick] = None  # "~" 금칙어 (띄어쓰기 무시)
+        self._mtime = None
+        self._decisions = OrderedDict()  # id → (content, 포함된 금칙어 목록)
+        self.stats = {"scanned": 0, "cached": 0, "flagged": 0, "dropped": 0}
+
+    def _reload_if_changed(self):
+        """목록 파일의 수정 시각이 바뀌었을 때만 다시 컴파일"""
+        try:
+            mtime = os.stat(self.wordlist_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+
+        if mtime is None:
+            logger.warning(f"⚠️ 금칙어 목록 파일이 없습니다: {self.wordlist_path} (검열 생략)")
+            self.automaton = None
+            self.compact_automaton = None
+        else:
+            words, compact_words = set(), set()
+            try:
+                with open(self.wordlist_path, 'r', encoding='utf-8-sig') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line or line.startswith("#"):
+                            continue
+                        if line.startswith(COMPACT_PREFIX):
+                            compact_words.add(_compact(line[len(COMPACT_PREFIX):]))
+                        else:
+                            words.add(_prepare(line))
+            except OSError as e:
+                logger.error(f"❌ 금칙어 목록 읽기 실패 (이전 목록 유지): {e}")
+                return
+            words.discard("")
+            compact_words.discard("")
+            self.automaton = AhoCorasick(sorted(words))
+            self.compact_automaton = AhoCorasick(sorted(compact_words)) if compact_words else None
+            logger.info(f"🛡️ 금칙어 목록 컴파일 완료: {len(words) + len(compact_words)}개 "
+                        f"(띄어쓰기 무시 {len(compact_words)}개)")
+        self._decisions.clear()  # 목록이 바뀌면 이전 판정 무효
+
+    def _check(self, msg: Dict) -> List[str]:
+        """메시지 1건의 금칙어 목록 (id와 content가 같으면 이전 판정 재사용)"""
+        msg_id = msg.get("id")
+        content = msg.get("content") or ""
+        decision = self._decisions.get(msg_id) if msg_id is not None else None
+        if decision is not None and decision[0] == content:
+            self.stats["cached"] += 1
+            return decision[1]
+
+        self.stats["scanned"] += 1
+        matches = self.automaton.find(_prepare(content))
+        if self.compact_automaton is not None:
+            matches += [word for word in self.compact_automaton.find(_compact(content)) if word not in matches]
+        if matches:
+            self.stats["flagged"] += 1
+            logger.info(f"🛡️ 금칙어 포함 메시지 {'제외' if self.action == 'drop' else '표시'}: id={msg_id} ({', '.join(matches)})")
+        if msg_id is not None:
+            self._decisions[msg_id] = (content, matches)
+            self._decisions.move_to_end(msg_id)
+            if len(self._decisions) > self.cache_limit:
+                self._decisions.popitem(last=False)
+        return matches
+
+    def process(self, messages: List[Dict]) -> List[Dict]:
+        """금칙어 표시/제외한 메시지 목록 (원래 순서 유지, 원본 dict는 수정하지 않음)"""
+        self._reload_if_changed()
+        if self.automaton is None:
+            return messages
+
+        result = []
+        for msg in messages:
+            matches = self._check(msg)
+            if not matches:
+                result.append(msg)
+            elif self.action == "drop":
+                self.stats["dropped"] += 1
+            else:
+                result.append({**msg, "flagged": True, "flaggedWords": matches})
+        return result
+
+    def get_stats(self) -> Dict:
+        patterns = sum(len(automaton.patterns) for automaton in (self.automaton, self.compact_automaton)
+                       if automaton is not None)
+        return {**self.stats, "action": self.action, "patterns": patterns}
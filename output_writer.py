@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+출력 분배 모듈
+한 번 직렬화한 출력 파일들을 여러 폴더(로컬, 다른 PC 공유 폴더, 백업 등)에 병렬로 기록
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from config import OUTPUT_DIR, OUTPUT_TARGETS, OUTPUT_WRITE_TIMEOUT, OUTPUT_WRITER_THREADS
+
+logger = logging.getLogger(__name__)
+
+def write_atomic(filepath: str, data: bytes):
+    """임시 파일에 쓴 뒤 교체 (읽는 쪽이 쓰다 만 파일을 보지 않도록)"""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+
+class OutputTarget:
+    """출력 대상 폴더 1개와 기록 통계"""
+
+    def __init__(self, name: str, path: str, timeout: float = OUTPUT_WRITE_TIMEOUT):
+        self.name = name
+        self.path = path
+        self.timeout = timeout
+        self.pending = None  # 진행 중인 기록 (끝나기 전에는 다음 기록을 건너뜀)
+        self.pending_since = 0.0  # 진행 중인 기록의 시작 시각 (time.monotonic)
+        self.pending_timed_out = False  # 진행 중인 기록의 시간 초과를 이미 집계했는지
+        self.written: Dict[str, bytes] = {}  # 파일명별 마지막으로 기록한 내용의 다이제스트
+        self.stats = {
+            "writes": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "skipped": 0,
+            "last_latency_ms": None,
+            "avg_latency_ms": None,
+            "last_error": None
+        }
+        self._total_latency = 0.0
+
+    def record(self, latency: float, error: Optional[str] = None):
+        """기록 1회 결과 반영 (latency: 초)"""
+        if error is None:
+            self.stats["writes"] += 1
+            self._total_latency += latency
+            self.stats["avg_latency_ms"] = round(self._total_latency / self.stats["writes"] * 1000, 1)
+        else:
+            self.stats["failures"] += 1
+            self.stats["last_error"] = error
+        self.stats["last_latency_ms"] = round(latency * 1000, 1)
+
+class OutputFanout:
+    """출력 파일을 모든 대상 폴더에 병렬로 기록 (느린 대상이 로컬 출력을 지연시키지 않음)"""
+
+    def __init__(self, local_dir: str = OUTPUT_DIR, targets: Optional[List[Dict]] = None,
+                 max_workers: int = OUTPUT_WRITER_THREADS):
+        if targets is None:
+            targets = OUTPUT_TARGETS
+
+        self.local = OutputTarget("local", local_dir)
+        self.targets = [self.local] + [
+            OutputTarget(target["name"], target["path"], target.get("timeout", OUTPUT_WRITE_TIMEOUT))
+            for target in targets
+        ]
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, len(self.targets)),
+                                            thread_name_prefix="OutputWriter")
+
+    def set_local_dir(self, path: str):
+        self.local.path = path
+        self.local.written.clear()
+
+    def _write_target(self, target: OutputTarget, files: List[Tuple[str, bytes, bytes]]):
+        """대상 폴더 1개에 파일들을 순서대로 기록 (이 대상에 이미 같은 내용을 쓴 파일은 건너뜀)"""
+        started = time.monotonic()
+        try:
+            if not os.path.exists(target.path):
+                os.makedirs(target.path)
+            for filename, data, digest in files:
+                if target.written.get(filename) == digest:
+                    continue
+                write_atomic(os.path.join(target.path, filename), data)
+                target.written[filename] = digest
+        except Exception as e:
+            with self._lock:
+                target.record(time.monotonic() - started, f"{type(e).__name__}: {e}")
+            raise
+
+        with self._lock:
+            target.record(time.monotonic() - started)
+
+    def _log_result(self, target: OutputTarget, future):
+        """원격 대상 기록이 끝나면 실패만 로그 (통계는 _write_target에서 반영)"""
+        error = future.exception()
+        if error is not None:
+            logger.error(f"❌ 출력 기록 실패: {target.name} ({target.path}) - {error}")
+
+    def _check_pending(self, target: OutputTarget) -> bool:
+        """이전 기록이 아직 진행 중이면 건너뜀 집계 후 True (timeout을 넘겼으면 시간 초과도 1회 집계)"""
+        if target.pending is None or target.pending.done():
+            return False
+
+        elapsed = time.monotonic() - target.pending_since
+        with self._lock:
+            target.stats["skipped"] += 1
+            timed_out = elapsed >= target.timeout and not target.pending_timed_out
+            if timed_out:
+                target.stats["timeouts"] += 1
+                target.pending_timed_out = True
+        if timed_out:
+            logger.warning(f"⚠️ 출력 기록 시간 초과 ({target.timeout}초): {target.name} ({target.path})")
+        logger.warning(f"⚠️ 이전 기록이 끝나지 않아 건너뜀: {target.name} ({target.path}, {elapsed:.1f}초 경과)")
+        return True
+
+    def write(self, files: List[Tuple[str, bytes]]) -> bool:
+        """모든 대상에 기록을 시작하고 로컬 기록만 기다려 성공 여부 반환
+
+        다른 대상은 백그라운드에서 끝나며 실패는 통계/로그로만 남김
+        (끝나기 전에 다음 기록이 오면 그 대상은 건너뛰고, timeout을 넘긴 기록은 시간 초과로 집계)
+        """
+        files = [(filename, data, hashlib.blake2b(data, digest_size=16).digest()) for filename, data in files]
+
+        local_started = False
+        for target in self.targets:
+            if self._check_pending(target):
+                continue
+            target.pending_since = time.monotonic()
+            target.pending_timed_out = False
+            target.pending = self._executor.submit(self._write_target, target, files)
+            if target is self.local:
+                local_started = True
+            else:
+                target.pending.add_done_callback(lambda future, target=target: self._log_result(target, future))
+
+        if not local_started:
+            return False
+
+        local = self.local
+        try:
+            local.pending.result(timeout=local.timeout)
+            return True
+        except FutureTimeoutError:
+            with self._lock:
+                local.stats["timeouts"] += 1
+                local.pending_timed_out = True
+            logger.warning(f"⚠️ 출력 기록 시간 초과 ({local.timeout}초): {local.name} ({local.path})")
+        except Exception as e:
+            logger.error(f"❌ 출력 기록 실패: {local.name} ({local.path}) - {e}")
+        return False
+
+    def get_stats(self) -> List[Dict]:
+        """대상별 기록 통계 (JSON 직렬화 가능)"""
+        with self._lock:
+            return [{"name": target.name, "path": target.path, **target.stats} for target in self.targets]
+
+    def close(self):
+        """진행 중인 기록은 기다리지 않고 종료"""
+        self._executor.shutdown(wait=False)
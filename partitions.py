@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+파티션별 최신 메시지 모듈
+필드 값(언어, 상태 등)마다 최신 N개를 크기 제한 힙으로 유지 (수집할 때마다 증분 갱신)
+전체 최신 FETCH_LIMIT개에 특정 언어가 거의 없어도 해당 언어 화면에는 그 언어의 최신 N개가 남음
+"""
+
+import heapq
+import itertools
+from collections.abc import Hashable
+from typing import Dict, Iterable, List, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _partition_key(value) -> Hashable:
+    """필드 값 → 파티션 키 (리스트 등 해시 불가 값은 문자열로)"""
+    return value if isinstance(value, Hashable) else repr(value)
+
+class PartitionTopN:
+    """필드 1개의 값별 최신 limit개 (값마다 created_at 기준 최소 힙, 루트가 가장 오래된 메시지)"""
+
+    def __init__(self, field: str, limit: int):
+        self.field = field
+        self.limit = limit
+        self._heaps: Dict[Hashable, List] = {}  # 파티션 키 → [(created_at, 순번, id)]
+        self._entries: Dict = {}  # id → (파티션 키, 출력용 메시지)
+        self._counter = itertools.count()  # created_at이 같을 때 id 비교를 피하기 위한 순번
+
+    def _remove(self, msg_id):
+        key, _ = self._entries.pop(msg_id)
+        heap = self._heaps[key]
+        heap[:] = [item for item in heap if item[2] != msg_id]
+        heapq.heapify(heap)
+
+    def add(self, msg_id, created_at: str, message: Dict):
+        """메시지 1개 반영 (이미 있으면 내용 갱신, 필드 값이 바뀌었으면 파티션 이동)"""
+        key = _partition_key(message.get(self.field))
+        entry = self._entries.get(msg_id)
+        if entry is not None:
+            if entry[0] == key:
+                self._entries[msg_id] = (key, message)
+                return
+            self._remove(msg_id)
+
+        heap = self._heaps.setdefault(key, [])
+        if len(heap) >= self.limit and created_at <= heap[0][0]:
+            return  # 유지 중인 메시지보다 오래됨
+
+        self._entries[msg_id] = (key, message)
+        if len(heap) >= self.limit:
+            _, _, evicted = heapq.heapreplace(heap, (created_at, next(self._counter), msg_id))
+            del self._entries[evicted]
+        else:
+            heapq.heappush(heap, (created_at, next(self._counter), msg_id))
+
+    def discard(self, msg_ids: Iterable) -> int:
+        """메시지 제거 (유지 중이 아닌 id는 무시), 제거한 개수 반환"""
+        keys = []
+        for msg_id in msg_ids:
+            entry = self._entries.pop(msg_id, None)
+            if entry is not None:
+                keys.append(entry[0])
+        # 바뀐 파티션의 힙만 한 번씩 다시 구성
+        for key in set(keys):
+            heap = self._heaps[key]
+            heap[:] = [item for item in heap if item[2] in self._entries]
+            heapq.heapify(heap)
+        return len(keys)
+
+    def ids_since(self, created_at: str, inclusive: bool = True) -> Set:
+        """created_at 이후(inclusive면 같은 시각 포함)에 등록된 유지 중인 메시지 id"""
+        return {item[2] for heap in self._heaps.values() for item in heap
+                if item[0] > created_at or (inclusive and item[0] == created_at)}
+
+    def top(self, values: Iterable, limit: int) -> List[Dict]:
+        """여러 값의 파티션을 합친 최신 limit개 (최신순)"""
+        items = [item for value in values for item in self._heaps.get(_partition_key(value), ())]
+        return [self._entries[item[2]][1] for item in heapq.nlargest(limit, items)]
+
+    def get_counts(self) -> Dict[str, int]:
+        return {str(key): len(heap) for key, heap in self._heaps.items() if heap}
+
+class PartitionIndex:
+    """필드별 PartitionTopN 묶음 ({필드: 유지 개수})"""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.partitions = {field: PartitionTopN(field, limit) for field, limit in limits.items()}
+
+    def ingest(self, messages: List[Dict], projected: List[Dict]):
+        """원본 메시지(id, created_at)와 같은 순서의 출력용 메시지를 모든 필드에 반영"""
+        if not self.partitions:
+            return
+        for msg, message in zip(messages, projected):
+            msg_id = msg.get("id")
+            if msg_id is None:
+                continue
+            created_at = msg.get("created_at") or ""
+            for partition in self.partitions.values():
+                partition.add(msg_id, created_at, message)
+
+    def discard(self, msg_ids: Iterable) -> int:
+        """모든 필드에서 메시지 제거 (삭제/금칙어 제외된 메시지), 필드별 제거 개수 중 최댓값 반환"""
+        msg_ids = set(msg_ids)
+        return max((partition.discard(msg_ids) for partition in self.partitions.values()), default=0)
+
+    def ids_since(self, created_at: str, inclusive: bool = True) -> Set:
+        """created_at 이후에 등록된, 어느 필드에든 유지 중인 메시지 id"""
+        return set().union(*(partition.ids_since(created_at, inclusive) for partition in self.partitions.values()))
+
+    def top(self, field: str, values: Iterable, limit: int) -> List[Dict]:
+        partition = self.partitions.get(field)
+        return partition.top(values, limit) if partition is not None else []
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """필드별 파티션 크기 (JSON 직렬화 가능)"""
+        return {field: partition.get_counts() for field, partition in self.partitions.items()}
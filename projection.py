@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+필드 투영 모듈
+config.OUTPUT_SCHEMA에 선언한 출력 구조(필드 선택/이름 변경/기본값/파생 필드)를
+한 번만 파이썬 코드로 컴파일해 매 사이클 재사용
+"""
+
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+# 필드 정의에서 허용하는 키
+_FIELD_KEYS = {"name", "source", "default", "truncate", "epoch"}
+
+def _truncate(value, length: int):
+    """문자열을 length자로 자름 (문자열이 아니면 그대로)"""
+    if isinstance(value, str) and len(value) > length:
+        return value[:length]
+    return value
+
+def _epoch(value, unit: str = "s") -> Optional[int]:
+    """ISO 8601 시각 → 유닉스 시간 (시간대 정보가 없으면 UTC로 간주, 해석 실패 시 None)"""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    seconds = parsed.timestamp()
+    return int(seconds * 1000) if unit == "ms" else int(seconds)
+
+def _field_expression(index: int, field: Dict, namespace: Dict) -> str:
+    """필드 1개의 값을 계산하는 파이썬 식 생성 (상수는 namespace로 전달)"""
+    source = field.get("source", field["name"])
+    if not isinstance(source, str):
+        raise ValueError(f"source는 문자열이어야 합니다: {field}")
+
+    expr = f"m.get({source!r})"
+
+    if "default" in field:
+        namespace[f"_d{index}"] = field["default"]
+        expr = f"(_d{index} if (_v := {expr}) is None else _v)"
+
+    if "truncate" in field:
+        length = field["truncate"]
+        if not isinstance(length, int) or length < 0:
+            raise ValueError(f"truncate는 0 이상의 정수여야 합니다: {field}")
+        expr = f"_truncate({expr}, {length})"
+
+    if "epoch" in field:
+        unit = field["epoch"]
+        if unit not in ("s", "ms"):
+            raise ValueError(f"epoch는 \"s\" 또는 \"ms\"여야 합니다: {field}")
+        expr = f"_epoch({expr}, {unit!r})"
+
+    return expr
+
+def compile_projection(schema: List[Dict]) -> Callable[[List[Dict]], List[Dict]]:
+    """출력 스키마를 메시지 목록 변환 함수로 컴파일"""
+    if not schema:
+        raise ValueError("OUTPUT_SCHEMA가 비어 있습니다")
+
+    namespace = {"_truncate": _truncate, "_epoch": _epoch}
+    entries = []
+    names = set()
+
+    for index, field in enumerate(schema):
+        if isinstance(field, str):
+            field = {"name": field}
+        unknown = set(field) - _FIELD_KEYS
+        if unknown:
+            raise ValueError(f"알 수 없는 필드 설정 {sorted(unknown)}: {field}")
+        name = field.get("name")
+        if not isinstance(name, str) or name in names:
+            raise ValueError(f"필드 이름이 없거나 중복되었습니다: {field}")
+        names.add(name)
+
+        entries.append(f"{name!r}: {_field_expression(index, field, namespace)}")
+
+    # 메시지마다 dict 리터럴 하나로 변환 (필드 이름은 상수로 들어가고 스키마 반복이 없음)
+    source = "def project(messages):\n    return [{" + ", ".join(entries) + "} for m in messages]\n"
+    exec(compile(source, "<output_schema>", "exec"), namespace)
+    project = namespace["project"]
+    project.field_names = [field if isinstance(field, str) else field["name"] for field in schema]
+    project.source = source
+    return project
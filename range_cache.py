@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+기간 조회 캐시 모듈
+이미 지난 날짜(닫힌 구간)의 조회 결과를 서버 버전별로 하루 단위 파일에 저장해 재조회 없이 응답
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+from typing import Dict, List, Optional
+import logging
+
+from config import RANGE_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# 서버가 버전을 알려주지 않을 때 사용하는 폴더 이름
+UNVERSIONED = "unversioned"
+
+_VERSION_FILENAME = "version"
+
+def _safe_name(version: Optional[str]) -> str:
+    """서버 버전 → 폴더 이름 (경로 문자 제거)"""
+    if not version:
+        return UNVERSIONED
+    return re.sub(r"[^0-9A-Za-z._-]", "_", str(version))[:64]
+
+class RangeCache:
+    """닫힌 날짜별 메시지 캐시 (cache_dir/<서버 버전>/<YYYY-MM-DD>.json)"""
+
+    def __init__(self, cache_dir: str = RANGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self.version = self._load_version()
+
+    def _load_version(self) -> Optional[str]:
+        """마지막으로 확인한 서버 버전 (재시작 직후 첫 요청 전에도 캐시를 쓰기 위함)"""
+        try:
+            with open(os.path.join(self.cache_dir, _VERSION_FILENAME), 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def set_version(self, version: Optional[str]):
+        """서버 버전 갱신 (바뀌면 이전 버전의 캐시 삭제)"""
+        if not version or version == self.version:
+            return
+        with self._lock:
+            previous, self.version = self.version, version
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(os.path.join(self.cache_dir, _VERSION_FILENAME), 'w', encoding='utf-8') as f:
+                    f.write(version)
+                for name in os.listdir(self.cache_dir):
+                    path = os.path.join(self.cache_dir, name)
+                    if os.path.isdir(path) and name != _safe_name(version):
+                        shutil.rmtree(path, ignore_errors=True)
+            except OSError as e:
+                logger.warning(f"⚠️ 기간 캐시 버전 갱신 실패: {e}")
+        if previous:
+            logger.info(f"🗂️ 서버 버전 변경 ({previous} → {version}): 기간 캐시 초기화")
+
+    def _path(self, day: str) -> str:
+        return os.path.join(self.cache_dir, _safe_name(self.version), f"{day}.json")
+
+    def get(self, day: str) -> Optional[List[Dict]]:
+        """캐시된 하루치 메시지 (없거나 읽을 수 없으면 None)"""
+        try:
+            with open(self._path(day), 'r', encoding='utf-8') as f:
+                messages = json.load(f)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return messages
+
+    def put(self, day: str, messages: List[Dict]):
+        """하루치 메시지 저장 (임시 파일 후 교체)"""
+        path = self._path(day)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(messages, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ 기간 캐시 저장 실패 ({day}): {e}")
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "version": self.version}
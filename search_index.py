@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+메시지 검색 색인 모듈
+content를 글자 2-gram으로 나눈 역색인을 수집할 때마다 증분 갱신 (한국어는 띄어쓰기와 무관하게 부분 일치 검색)
+"""
+
+import heapq
+import json
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+
+from config import SEARCH_INDEX_MAX_DOCS
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+def normalize(text) -> str:
+    """검색용 정규화 (NFKC + 소문자, 한글 자모 조합 통일)"""
+    if not isinstance(text, str):
+        return ""
+    return unicodedata.normalize("NFKC", text).lower()
+
+def tokenize(text: str) -> Set[str]:
+    """정규화된 문자열 → 단어별 글자 2-gram 집합 (한 글자 단어는 그대로)"""
+    tokens = set()
+    for word in _WORD_PATTERN.findall(text):
+        if len(word) == 1:
+            tokens.add(word)
+        else:
+            tokens.update(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+class SearchIndex:
+    """메시지 id 기준 역색인 (2-gram 후보 교집합 → 원문 부분 일치로 확인)"""
+
+    def __init__(self, max_docs: int = SEARCH_INDEX_MAX_DOCS):
+        self.max_docs = max_docs
+        self._postings: Dict[str, Set] = {}
+        self._docs = OrderedDict()  # id → (정규화된 content, 원문 content, created_at), 오래된 것부터 제거
+        self._lock = threading.Lock()
+        self.version = 0  # 색인이 바뀔 때마다 증가 (내보내기 생략 판단용)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _remove(self, msg_id):
+        normalized = self._docs.pop(msg_id)[0]
+        for token in tokenize(normalized):
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.discard(msg_id)
+                if not posting:
+                    del self._postings[token]
+
+    def add(self, messages: List[Dict]) -> int:
+        """메시지 반영 (새 메시지와 content가 바뀐 메시지만 색인), 색인한 개수 반환"""
+        indexed = 0
+        with self._lock:
+            for msg in messages:
+                msg_id = msg.get("id")
+                content = msg.get("content")
+                if msg_id is None or not isinstance(content, str):
+                    continue
+
+                doc = self._docs.get(msg_id)
+                if doc is not None:
+                    if doc[1] == content:
+                        continue
+                    self._remove(msg_id)
+
+                normalized = normalize(content)
+                self._docs[msg_id] = (normalized, content, msg.get("created_at", ""))
+                for token in tokenize(normalized):
+                    self._postings.setdefault(token, set()).add(msg_id)
+                indexed += 1
+
+            while len(self._docs) > self.max_docs:
+                self._remove(next(iter(self._docs)))
+
+            if indexed:
+                self.version += 1
+        return indexed
+
+    def discard(self, msg_ids: Iterable) -> int:
+        """색인에서 메시지 제거 (검열로 제외된 메시지 등), 제거한 개수 반환"""
+        removed = 0
+        with self._lock:
+            for msg_id in msg_ids:
+                if msg_id in self._docs:
+                    self._remove(msg_id)
+                    removed += 1
+            if removed:
+                self.version += 1
+        return removed
+
+    def _match(self, term: str) -> Set:
+        """검색어 1개와 부분 일치하는 id 집합"""
+        tokens = tokenize(term)
+        if not tokens:
+            return set()
+        if any(len(token) == 1 for token in tokens):
+            # 한 글자 검색어는 2-gram으로 찾을 수 없으므로 원문 검색
+            return {msg_id for msg_id, doc in self._docs.items() if term in doc[0]}
+
+        # 희소한 토큰부터 교집합 (후보를 빨리 줄임)
+        postings = sorted((self._postings.get(token, set()) for token in tokens), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return candidates
+        return {msg_id for msg_id in candidates if term in self._docs[msg_id][0]}
+
+    def search(self, query: str, limit: int = 50) -> List[Dict]:
+        """공백으로 구분한 모든 검색어를 포함하는 메시지 (최신순)"""
+        terms = normalize(query).split()
+        if not terms:
+            return []
+
+        with self._lock:
+            matched = self._match(terms[0])
+            for term in terms[1:]:
+                if not matched:
+                    break
+                matched &= self._match(term)
+
+            # 전체 정렬 대신 상위 limit개만 선택
+            newest = heapq.nlargest(limit, matched, key=lambda msg_id: self._docs[msg_id][2] or "")
+            return [{"id": msg_id, "content": self._docs[msg_id][1], "created_at": self._docs[msg_id][2]}
+                    for msg_id in newest]
+
+    def find_keywords(self, keywords: List[str], within: Optional[Iterable] = None) -> Dict[str, List]:
+        """키워드별 포함 메시지 id (캠페인 키워드 강조용, within이 있으면 그 id 중에서만)"""
+        scope = set(within) if within is not None else None
+        with self._lock:
+            result = {}
+            for keyword in keywords:
+                matched = self._match(normalize(keyword).strip())
+                if scope is not None:
+                    matched &= scope
+                result[keyword] = sorted(matched, key=str)
+            return result
+
+    def to_bytes(self) -> bytes:
+        """내보내기용 JSON ({"tokens": {2-gram: [id, ...]}, "docs": 개수})"""
+        with self._lock:
+            data = {
+                "version": self.version,
+                "docs": len(self._docs),
+                "tokens": {token: sorted(ids, key=str) for token, ids in self._postings.items()}
+            }
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+    def get_stats(self) -> Dict:
+        return {"docs": len(self._docs), "tokens": len(self._postings), "version": self.version}
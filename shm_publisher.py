@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+공유 메모리 배포 모듈
+최신 스냅샷을 이름 있는 공유 메모리에 이중 버퍼로 기록 (같은 PC의 시각화 앱용)
+
+메모리 구조 (리틀 엔디언)
+  헤더 64바이트: magic "HMGW"(4) | layout(u32) | seq(u64) | slot_capacity(u64) | 예약
+  슬롯 0/1   : seq(u64) | length(u64) | crc32(u32) | 예약(12) | 데이터(slot_capacity)
+
+쓰기: seq+1 번 스냅샷을 (seq+1) % 2 슬롯에 기록 → 슬롯 헤더 확정 → 전역 seq 갱신
+읽기: 전역 seq → 해당 슬롯 헤더의 seq 일치 확인 → 데이터 복사 → crc32 및 seq 재확인
+"""
+
+import struct
+import zlib
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import logging
+
+from config import SHM_NAME, SHM_SLOT_SIZE
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HMGW"
+LAYOUT_VERSION = 1
+HEADER_SIZE = 64
+SLOT_HEADER_SIZE = 32
+
+_HEADER = struct.Struct("<4sIQQ")      # magic, layout, seq, slot_capacity
+_SLOT_HEADER = struct.Struct("<QQI")   # seq, length, crc32
+_SEQ_OFFSET = 8                        # 헤더 내 전역 seq 위치
+
+def _slot_offset(slot: int, slot_capacity: int) -> int:
+    return HEADER_SIZE + slot * (SLOT_HEADER_SIZE + slot_capacity)
+
+class SharedSnapshotPublisher:
+    """공유 메모리 스냅샷 기록기 (엔진 프로세스 1개가 소유)"""
+
+    def __init__(self, name: str = SHM_NAME, slot_capacity: int = SHM_SLOT_SIZE):
+        self.name = name
+        self.slot_capacity = slot_capacity
+        size = HEADER_SIZE + 2 * (SLOT_HEADER_SIZE + slot_capacity)
+
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.seq = 0
+        except FileExistsError:
+            # 이전 실행에서 남은 세그먼트 재사용 (크기가 맞는 경우)
+            self._shm = shared_memory.SharedMemory(name=name, create=False)
+            if self._shm.size < size:
+                self._shm.close()
+                raise ValueError(f"기존 공유 메모리 크기 부족: {name} ({self._shm.size} < {size})")
+            magic, layout, seq, _ = _HEADER.unpack_from(self._shm.buf, 0)
+            self.seq = seq if magic == MAGIC and layout == LAYOUT_VERSION else 0
+
+        _HEADER.pack_into(self._shm.buf, 0, MAGIC, LAYOUT_VERSION, self.seq, slot_capacity)
+        logger.info(f"🧠 공유 메모리 배포 시작: {name} (슬롯 {slot_capacity // 1024}KB x 2)")
+
+    def publish(self, data: bytes) -> bool:
+        """스냅샷 기록 (용량 초과 시 False, 파일 출력만 유지됨)"""
+        if len(data) > self.slot_capacity:
+            logger.error(f"❌ 공유 메모리 용량 초과: {len(data)} > {self.slot_capacity}바이트 (SHM_SLOT_SIZE 확인)")
+            return False
+
+        buf = self._shm.buf
+        next_seq = self.seq + 1
+        offset = _slot_offset(next_seq % 2, self.slot_capacity)
+
+        # 1) 슬롯 무효화 → 2) 데이터 기록 → 3) 슬롯 헤더 확정 → 4) 전역 seq 갱신
+        _SLOT_HEADER.pack_into(buf, offset, 0, 0, 0)
+        data_offset = offset + SLOT_HEADER_SIZE
+        buf[data_offset:data_offset + len(data)] = data
+        _SLOT_HEADER.pack_into(buf, offset, next_seq, len(data), zlib.crc32(data))
+        struct.pack_into("<Q", buf, _SEQ_OFFSET, next_seq)
+
+        self.seq = next_seq
+        return True
+
+    def close(self, unlink: bool = True):
+        """공유 메모리 해제"""
+        if self._shm is None:
+            return
+        self._shm.close()
+        if unlink:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._shm = None
+
+class SharedSnapshotReader:
+    """공유 메모리 스냅샷 판독기 (소비자 측 참조 구현)"""
+
+    def __init__(self, name: str = SHM_NAME):
+        self._shm = shared_memory.SharedMemory(name=name, create=False)
+        magic, layout, _, self.slot_capacity = _HEADER.unpack_from(self._shm.buf, 0)
+        if magic != MAGIC or layout != LAYOUT_VERSION:
+            self._shm.close()
+            raise ValueError(f"알 수 없는 공유 메모리 형식: {name}")
+
+    def read(self, retries: int = 5) -> Optional[Tuple[int, bytes]]:
+        """(seq, 데이터) 반환, 아직 기록 전이거나 계속 갱신 중이면 None"""
+        buf = self._shm.buf
+        for _ in range(retries):
+            seq = struct.unpack_from("<Q", buf, _SEQ_OFFSET)[0]
+            if seq == 0:
+                return None
+
+            offset = _slot_offset(seq % 2, self.slot_capacity)
+            slot_seq, length, crc = _SLOT_HEADER.unpack_from(buf, offset)
+            if slot_seq != seq or length > self.slot_capacity:
+                continue
+
+            data_offset = offset + SLOT_HEADER_SIZE
+            data = bytes(buf[data_offset:data_offset + length])
+
+            # 복사 중 기록기가 같은 슬롯을 덮어쓰지 않았는지 확인
+            if zlib.crc32(data) == crc and _SLOT_HEADER.unpack_from(buf, offset)[0] == seq:
+                return seq, data
+        return None
+
+    def close(self):
+        self._shm.close()
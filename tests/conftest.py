@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+pytest 공통 설정
+저장소 루트의 평면 모듈(config, db_client 등)을 import할 수 있도록 경로 추가, 공용 DBClient 픽스처
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_client import DBClient  # noqa: E402
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """카세트/추적 기록 없이 임시 폴더에서 동작하는 DBClient"""
+    monkeypatch.chdir(tmp_path)  # 토큰/기간 캐시 파일을 임시 폴더에 생성
+    db_client = DBClient(cassette_mode=None)
+    db_client.tracer.dump = lambda *args, **kwargs: None
+    yield db_client
+    db_client.close()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+회로 차단기 테스트
+반개방 시험 요청이 결과를 판단할 수 없게 끝나도 차단기가 멈추지 않는지 확인
+"""
+
+import pytest
+import requests
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+def _open_breaker(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == OPEN
+
+def test_inconclusive_probe_reopens_and_allows_next_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=10)
+    _open_breaker(breaker)
+
+    now[0] += 10
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()  # 시험 요청 진행 중
+
+    breaker.record_inconclusive()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()  # 다시 대기
+
+    now[0] += 10
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_inconclusive_result_does_not_change_closed_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=10)
+    breaker.record_failure()
+    breaker.record_inconclusive()
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 1
+
+def test_probe_with_unexpected_exception_releases_breaker(client, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    sent = []
+
+    def broken_send(method, endpoint, url, **kwargs):
+        sent.append(endpoint)
+        raise requests.exceptions.ChunkedEncodingError("연결 중 응답이 끊김")
+
+    monkeypatch.setattr(client, "_send", broken_send)
+    _open_breaker(client.breaker)
+
+    now[0] += client.breaker.cooldown
+    assert client._make_request("GET", "/api/messages", authenticate=False) is None
+    assert len(sent) == 1
+    assert client.breaker.state == OPEN
+
+    # 대기 후 다음 시험 요청은 다시 전송되어야 함
+    now[0] += client.breaker.cooldown
+    client._make_request("GET", "/api/messages", authenticate=False)
+    assert len(sent) == 2
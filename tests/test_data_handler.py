@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+데이터 처리 테스트
+메시지가 같은 사이클에는 버전 사이드카가 다시 기록되지 않는지 확인
+"""
+
+import json
+import os
+
+from data_handler import DataHandler
+
+def test_version_sidecar_changes_only_with_messages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = DataHandler()
+    handler.set_output_dir(str(tmp_path / "output"))
+    sidecar = tmp_path / "output" / handler.version_filename
+    messages = [{"id": 1, "content": "안녕", "created_at": "2026-10-19T10:00:00Z"}]
+    try:
+        assert handler.save_messages_to_json(messages, {"aggregates": {"computedAt": "1"}})
+        first = sidecar.read_bytes()
+        os.utime(sidecar, ns=(0, 0))
+
+        # 저장 시각/집계만 다른 사이클 → 사이드카 그대로
+        assert handler.save_messages_to_json(list(messages), {"aggregates": {"computedAt": "2", "1m": {"total": 1}}})
+        assert sidecar.read_bytes() == first
+        assert sidecar.stat().st_mtime_ns == 0
+
+        messages.append({"id": 2, "content": "새 메시지", "created_at": "2026-10-19T10:00:05Z"})
+        assert handler.save_messages_to_json(messages, {"aggregates": {"computedAt": "3"}})
+        manifest = json.loads(sidecar.read_bytes())
+        assert manifest["version"] == json.loads(first)["version"] + 1
+        assert manifest["count"] == 2
+        assert sidecar.stat().st_mtime_ns != 0
+    finally:
+        handler.close()
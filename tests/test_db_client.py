@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+DB 클라이언트 재시도 테스트
+Retry-After가 최대 대기 시간을 넘으면 그만큼 잠들지 않고 재시도를 포기하는지 확인
+"""
+
+import pytest
+
+import db_client
+from config import RETRY_MAX_DELAY
+from db_client import _parse_retry_after
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(db_client.time, "sleep", recorded.append)
+    return recorded
+
+def test_short_retry_after_is_honoured(client, sleeps):
+    assert client._backoff(0, retry_after=2.0)
+    assert sleeps == [2.0]
+
+def test_long_retry_after_gives_up_without_sleeping(client, sleeps):
+    # 사이클 제한이 없는 호출(백필 등)
+    assert client._limits() is None
+    assert not client._backoff(0, retry_after=86400.0)
+    assert not client._backoff(0, retry_after=RETRY_MAX_DELAY + 1)
+    assert sleeps == []
+
+def test_retry_after_parsing():
+    assert _parse_retry_after("5") == 5.0
+    assert _parse_retry_after("-3") == 0.0
+    assert _parse_retry_after("inf") is None
+    assert _parse_retry_after("nan") is None
+    assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert _parse_retry_after("nonsense") is None
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+중복 메시지 감지 테스트
+SimHash 밴드 색인, 시간 창 밖 지문 제거, 짧은/이모지 메시지 처리 확인
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from dedup import NearDuplicateDetector, simhash
+
+BASE = datetime(2026, 10, 19, 10, 0, tzinfo=timezone.utc)
+
+def _message(msg_id, content, seconds=0):
+    return {"id": msg_id, "content": content,
+            "created_at": (BASE + timedelta(seconds=seconds)).isoformat().replace("+00:00", "Z")}
+
+def _duplicate_of(detector, *messages):
+    return {msg["id"]: msg.get("duplicateOf") for msg in detector.process(list(messages))}
+
+@pytest.mark.parametrize("max_distance", [0, 3, 7])
+def test_bands_cover_all_bits_and_catch_close_fingerprints(max_distance):
+    detector = NearDuplicateDetector(max_distance=max_distance)
+    assert sum(width for _, width in detector._bands) == 64
+    assert sorted(shift for shift, _ in detector._bands) == [shift for shift, _ in detector._bands]
+
+    rng = random.Random(max_distance)
+    for _ in range(200):
+        fingerprint = rng.getrandbits(64)
+        close = fingerprint
+        for bit in rng.sample(range(64), max_distance):
+            close ^= 1 << bit
+        # 해밍 거리 d 이하이면 적어도 한 밴드가 같음
+        assert set(detector._band_keys(fingerprint)) & set(detector._band_keys(close))
+
+def test_punctuation_and_spacing_variants_are_duplicates():
+    assert simhash("오늘 공연 최고예요!!") == simhash("오늘공연 최고예요 ~!")
+    detector = NearDuplicateDetector(max_distance=3)
+    assert _duplicate_of(detector,
+                         _message(1, "오늘 공연 최고예요!!"),
+                         _message(2, "오늘공연 최고예요 ~!", 5),
+                         _message(3, "오늘 공연 최고예요", 10),
+                         _message(4, "다음 주에 또 만나요", 15)) == {1: None, 2: 1, 3: 1, 4: None}
+
+def test_counts_and_collapse():
+    marked = NearDuplicateDetector(action="mark")
+    result = marked.process([_message(1, "응원합니다 화이팅"), _message(2, "응원합니다 화이팅!", 1),
+                             _message(3, "응원합니다, 화이팅", 2)])
+    assert result[0]["duplicateCount"] == 2
+    assert [msg.get("duplicateOf") for msg in result] == [None, 1, 1]
+
+    collapsed = NearDuplicateDetector(action="collapse")
+    result = collapsed.process([_message(1, "응원합니다 화이팅"), _message(2, "응원합니다 화이팅!", 1)])
+    assert [msg["id"] for msg in result] == [1]
+    assert result[0]["duplicateCount"] == 1
+
+def test_messages_outside_window_are_not_duplicates_and_are_evicted():
+    detector = NearDuplicateDetector(window=600)
+    assert _duplicate_of(detector, _message(1, "같은 내용의 메시지")) == {1: None}
+    assert detector.get_stats()["tracked"] == 1
+
+    # 창(600초)이 지난 뒤 같은 내용 → 원본 지문은 제거되고 새 원본
+    assert _duplicate_of(detector, _message(2, "같은 내용의 메시지", 601)) == {2: None}
+    assert detector.get_stats()["tracked"] == 1
+    assert all(entry[1] == 2 for bucket in detector._buckets.values() for entry in bucket)
+
+    assert _duplicate_of(detector, _message(3, "같은 내용의 메시지", 700)) == {3: 2}
+
+def test_decisions_are_not_recomputed():
+    detector = NearDuplicateDetector()
+    messages = [_message(1, "반복되는 메시지"), _message(2, "반복되는 메시지", 1)]
+    first = detector.process(messages)
+    assert detector.process(messages) == first
+    assert detector.get_stats()["checked"] == 2
+
+def test_short_or_emoji_only_messages_are_not_grouped():
+    assert simhash("ㅋ") is None
+    assert simhash("!!") is None
+    assert simhash("!!!") != simhash("???")  # 문장부호만 있으면 공백만 빼고 그대로 비교
+    assert simhash("😀🎉") is None
+    assert simhash("😀😀😀") != simhash("🎉🎉🎉")
+
+    detector = NearDuplicateDetector()
+    assert _duplicate_of(detector, _message(1, "😀😀😀"), _message(2, "🎉🎉🎉", 1),
+                         _message(3, "!!"), _message(4, "??", 1), _message(5, "😀😀😀", 2)) == \
+        {1: None, 2: None, 3: None, 4: None, 5: 1}
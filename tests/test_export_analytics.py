@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+분석용 내보내기 테스트
+파일마다 값이 달라도(한 파일에서 컬럼 전체가 빈 값이어도) 같은 스키마로 기록되어 폴더 전체를 읽을 수 있는지 확인
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from export_analytics import ColumnarExporter, analytics_schema, schema_columns
+
+COLUMNS = ["id", "author", "content", "language", "created_at", "createdAtMs"]
+
+def _export(tmp_path, rows, file_format="parquet"):
+    schema = analytics_schema(COLUMNS, epoch_columns=["createdAtMs"])
+    exporter = ColumnarExporter(str(tmp_path), schema, file_format, batch_rows=2)
+    for row in rows:
+        exporter.add(row)
+    exporter.close()
+    return exporter, schema
+
+ROWS = [
+    # 첫 파일: author가 모두 비어 있음
+    {"id": 1, "author": None, "content": "안녕", "language": "ko", "created_at": "2026-10-18T10:00:00Z",
+     "createdAtMs": 1792317600000},
+    {"id": 2, "content": "hi", "language": None, "created_at": "2026-10-18T11:00:00.5+09:00", "createdAtMs": None},
+    # 둘째 파일: 시각 형식과 값 타입이 다름
+    {"id": "abc", "author": "kim", "content": {"text": "객체"}, "language": "en",
+     "created_at": "2026-10-18T12:00:00.123456789Z", "extra": 1},
+    {"id": 4, "author": "lee", "content": "x", "language": "ko", "created_at": "not a time"},
+    # 다른 날짜 파티션
+    {"id": 5, "author": None, "content": "y", "language": None, "created_at": "2026-10-19T00:00:00Z"},
+]
+
+def test_parts_share_one_schema_and_read_back_together(tmp_path):
+    exporter, schema = _export(tmp_path, ROWS)
+    assert exporter.stats["files"] == 4  # 2026-10-18 두 개, 2026-10-19, unknown
+    assert exporter.stats["coerced"] == 1
+
+    for path in tmp_path.rglob("*.parquet"):
+        assert ds.dataset(str(path)).schema.remove_metadata().equals(schema)
+
+    frame = pd.read_parquet(tmp_path).sort_values("content").reset_index(drop=True)
+    assert len(frame) == 5
+    assert frame["author"].isna().sum() == 3
+    assert set(frame["id"]) == {"1", "2", "abc", "4", "5"}
+    assert "extra" not in frame.columns
+    created = frame.set_index("content")["created_at"]
+    assert str(created["hi"]) == "2026-10-18 02:00:00.500000+00:00"
+    assert str(created['{"text": "객체"}']) == "2026-10-18 12:00:00.123456+00:00"
+    assert pd.isna(created["x"])
+
+def test_arrow_parts_use_the_same_schema(tmp_path):
+    _, schema = _export(tmp_path, ROWS, file_format="arrow")
+    table = ds.dataset(str(tmp_path), format="ipc", partitioning="hive").to_table()
+    assert table.num_rows == 5
+    assert table.schema.field("language").type == pa.dictionary(pa.int32(), pa.string())
+    assert table.schema.field("createdAtMs").type == pa.int64()
+
+def test_schema_columns_follow_output_schema(monkeypatch):
+    monkeypatch.setattr("export_analytics.OUTPUT_SCHEMA",
+                        ["id", {"name": "preview", "source": "content", "truncate": 10},
+                         {"name": "createdAtMs", "source": "created_at", "epoch": "ms"}])
+    assert schema_columns("history") == (["id", "preview", "createdAtMs"], ["createdAtMs"])
+    assert schema_columns("archive") == (["id", "content", "created_at"], [])
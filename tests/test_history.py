@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+스냅샷 이력 테스트
+전체 스냅샷/변경분 기록을 apply_record와 snapshot_at으로 재구성했을 때 저장한 내용과 같은지 확인
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import history
+from history import SnapshotHistory, apply_record, iter_records, read_index, snapshot_at
+
+BASE = datetime.now().replace(microsecond=0) - timedelta(hours=1)
+
+def _at(seconds: int) -> str:
+    return (BASE + timedelta(seconds=seconds)).isoformat()
+
+def _snapshot(seconds: int, messages, **metadata):
+    at = _at(seconds)
+    return {
+        "metadata": {"exportedAt": at, "lastSuccessAt": at, "totalCount": len(messages),
+                     "aggregates": {"computedAt": at}, "source": "test", **metadata},
+        "messages": messages
+    }
+
+def _expected(snapshot, at: str):
+    """재구성 결과로 기대하는 스냅샷 (aggregates 제외, 저장 시각은 기록 시각)"""
+    metadata = {key: value for key, value in snapshot["metadata"].items() if key != "aggregates"}
+    metadata["exportedAt"] = metadata["lastSuccessAt"] = at
+    return {"metadata": metadata, "messages": snapshot["messages"]}
+
+@pytest.fixture
+def clock(monkeypatch):
+    """세그먼트 시작 판단용 monotonic 시계"""
+    now = [1000.0]
+    monkeypatch.setattr(history.time, "monotonic", lambda: now[0])
+    return now
+
+def _records(history_dir):
+    return [record for segment in read_index(str(history_dir)) for record in iter_records(str(history_dir), segment)]
+
+def test_deltas_round_trip_through_apply_record_and_snapshot_at(tmp_path, clock):
+    store = SnapshotHistory(str(tmp_path), full_interval=3600)
+    a, b, c = {"id": 1, "content": "a"}, {"id": 2, "content": "b"}, {"id": 3, "content": "c"}
+    snapshots = [
+        _snapshot(0, [a, b]),
+        _snapshot(10, [c, a, b]),                              # 추가
+        _snapshot(20, [c, {"id": 1, "content": "a2"}, b]),     # 수정
+        _snapshot(30, [b, c]),                                 # 삭제 + 순서 변경
+        _snapshot(40, [b, c], highlights={"응원": [2]}),        # metadata만 변경
+        _snapshot(50, []),                                     # 모두 삭제
+    ]
+    for snapshot in snapshots:
+        assert store.append(snapshot)
+
+    records = _records(tmp_path)
+    assert [record["type"] for record in records] == ["full"] + ["delta"] * 5
+    assert all("aggregates" not in record["metadata"] for record in records)
+    assert records[3]["removed"] == [1] and records[3]["upserts"] == []
+    assert records[4]["metadata"] == {"highlights": {"응원": [2]}}
+
+    snapshot = None
+    for record, original in zip(records, snapshots):
+        snapshot = apply_record(snapshot, record)
+        assert snapshot == _expected(original, record["at"])
+
+    for seconds, original in zip(range(0, 60, 10), snapshots):
+        assert snapshot_at(_at(seconds + 5), str(tmp_path)) == _expected(original, _at(seconds))
+
+def test_unchanged_snapshot_is_not_recorded(tmp_path, clock):
+    store = SnapshotHistory(str(tmp_path), full_interval=3600)
+    messages = [{"id": 1, "content": "a"}]
+    assert store.append(_snapshot(0, messages))
+    # 저장 시각/집계만 다른 사이클
+    assert not store.append(_snapshot(10, list(messages)))
+    assert len(_records(tmp_path)) == 1
+    assert snapshot_at(_at(15), str(tmp_path))["metadata"]["exportedAt"] == _at(0)
+
+def test_missing_or_duplicate_ids_are_recorded_in_full_within_segment(tmp_path, clock):
+    store = SnapshotHistory(str(tmp_path), full_interval=3600)
+    snapshots = [
+        _snapshot(0, [{"id": 1, "content": "a"}]),
+        _snapshot(10, [{"content": "id 없음"}, {"id": 1, "content": "a"}]),
+        _snapshot(20, [{"id": 1, "content": "a"}, {"id": 1, "content": "중복"}]),
+        _snapshot(30, [{"id": 1, "content": "a"}, {"id": 2, "content": "b"}]),
+    ]
+    for snapshot in snapshots:
+        assert store.append(snapshot)
+    assert not store.append(_snapshot(40, snapshots[-1]["messages"]))
+
+    assert len(read_index(str(tmp_path))) == 1
+    assert [record["type"] for record in _records(tmp_path)] == ["full", "full", "full", "full"]
+    for seconds, original in zip(range(0, 40, 10), snapshots):
+        assert snapshot_at(_at(seconds), str(tmp_path)) == _expected(original, _at(seconds))
+
+def test_snapshot_at_segment_boundaries(tmp_path, clock):
+    store = SnapshotHistory(str(tmp_path), full_interval=60)
+    first = _snapshot(0, [{"id": 1, "content": "a"}])
+    second = _snapshot(10, [{"id": 1, "content": "a"}, {"id": 2, "content": "b"}])
+    third = _snapshot(70, [{"id": 2, "content": "b"}])
+    store.append(first)
+    clock[0] += 10
+    store.append(second)
+    clock[0] += 60  # 새 세그먼트
+    store.append(third)
+
+    segments = read_index(str(tmp_path))
+    assert [segment["start"] for segment in segments] == [_at(0), _at(70)]
+    assert len({segment["file"] for segment in segments}) == 2
+
+    assert snapshot_at(_at(-1), str(tmp_path)) is None
+    assert snapshot_at(_at(0), str(tmp_path)) == _expected(first, _at(0))
+    assert snapshot_at(_at(69), str(tmp_path)) == _expected(second, _at(10))
+    assert snapshot_at(_at(70), str(tmp_path)) == _expected(third, _at(70))
+    assert snapshot_at(_at(10_000), str(tmp_path)) == _expected(third, _at(70))
+
+def test_full_and_delta_reconstructions_have_same_shape(tmp_path, clock):
+    store = SnapshotHistory(str(tmp_path), full_interval=3600)
+    store.append(_snapshot(0, [{"id": 1, "content": "a"}]))
+    store.append(_snapshot(10, [{"id": 2, "content": "b"}]))
+
+    from_full = snapshot_at(_at(5), str(tmp_path))
+    from_delta = snapshot_at(_at(15), str(tmp_path))
+    assert "aggregates" not in from_full["metadata"]
+    assert set(from_full["metadata"]) == set(from_delta["metadata"])
+
+def test_legacy_full_record_aggregates_are_dropped(tmp_path):
+    segment = {"file": "segment_legacy.jsonl", "start": _at(0), "end": _at(10), "entries": 2, "bytes": 0}
+    records = [
+        {"type": "full", "at": _at(0), "metadata": {"exportedAt": _at(0), "aggregates": {"1m": {}}, "source": "old"},
+         "messages": [{"id": 1}]},
+        {"type": "delta", "at": _at(10), "metadata": {}, "upserts": [{"id": 2}], "removed": [], "ids": [1, 2]},
+    ]
+    (tmp_path / segment["file"]).write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+    (tmp_path / "index.json").write_text(json.dumps({"segments": [segment]}), encoding="utf-8")
+
+    for seconds in (5, 15):
+        metadata = snapshot_at(_at(seconds), str(tmp_path))["metadata"]
+        assert "aggregates" not in metadata
+        assert metadata["source"] == "old"
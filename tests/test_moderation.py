@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+금칙어 검열 테스트
+금칙어가 띄어쓰기 경계를 넘어 일치하지 않는지, "~" 금칙어만 띄어쓰기를 무시하는지 확인
+"""
+
+import pytest
+
+from moderation import AhoCorasick, ModerationFilter
+
+@pytest.fixture
+def make_filter(tmp_path):
+    def factory(*words, action="drop"):
+        wordlist = tmp_path / "banned_words.txt"
+        wordlist.write_text("\n".join(("# 주석",) + words) + "\n", encoding="utf-8")
+        return ModerationFilter(str(wordlist), action=action)
+    return factory
+
+def _kept(moderation, *contents):
+    messages = [{"id": index, "content": content} for index, content in enumerate(contents)]
+    return [msg["content"] for msg in moderation.process(messages)]
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    assert sorted(automaton.find("ushers")) == ["he", "hers", "she"]
+    assert automaton.find("xyz") == []
+
+def test_word_does_not_match_across_spaces(make_filter):
+    moderation = make_filter("시발")
+    assert _kept(moderation, "시 발표 일정", "내일 시발 진짜", "시.발") == ["시 발표 일정"]
+
+def test_pattern_with_space_matches_collapsed_whitespace(make_filter):
+    moderation = make_filter("나쁜 말")
+    assert _kept(moderation, "나쁜   말 하지 마", "나쁜말", "나쁜 사람 말") == ["나쁜말", "나쁜 사람 말"]
+
+def test_compact_prefix_opts_into_cross_space_matching(make_filter):
+    moderation = make_filter("~시발", "바보")
+    assert _kept(moderation, "시 발", "시  .  발", "바 보", "바보야") == ["바 보"]
+
+def test_tag_mode_reports_matched_words(make_filter):
+    moderation = make_filter("~시발", "바보", action="tag")
+    result = moderation.process([{"id": 1, "content": "바보 시 발"}, {"id": 2, "content": "시 발표"}])
+    assert result[0]["flaggedWords"] == ["바보", "시발"]
+    assert result[1]["flagged"] is True  # "~" 금칙어는 띄어쓰기를 무시하므로 "시 발표"도 일치
+    assert moderation.get_stats()["patterns"] == 2
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+출력 분배 테스트
+느린 원격 대상이 로컬 기록(사이클)을 지연시키지 않고, 다음 기록에서 건너뜀/시간 초과로 집계되는지 확인
+"""
+
+import threading
+import time
+
+import output_writer
+from output_writer import OutputFanout
+
+def _stats(fanout: OutputFanout, name: str):
+    return next(stats for stats in fanout.get_stats() if stats["name"] == name)
+
+def test_write_waits_only_for_local_target(tmp_path, monkeypatch):
+    release = threading.Event()
+    original = output_writer.write_atomic
+
+    def slow_remote(filepath, data):
+        if str(tmp_path / "remote") in filepath:
+            release.wait(5)
+        original(filepath, data)
+
+    monkeypatch.setattr(output_writer, "write_atomic", slow_remote)
+    fanout = OutputFanout(str(tmp_path / "local"),
+                          [{"name": "share", "path": str(tmp_path / "remote"), "timeout": 0.05}])
+    try:
+        started = time.monotonic()
+        assert fanout.write([("messages.json", b"1")])
+        assert time.monotonic() - started < 1
+        assert (tmp_path / "local" / "messages.json").read_bytes() == b"1"
+
+        # 원격 기록이 아직 진행 중 → 건너뜀, timeout을 넘겼으므로 시간 초과 1회
+        time.sleep(0.1)
+        assert fanout.write([("messages.json", b"2")])
+        assert fanout.write([("messages.json", b"3")])
+        share = _stats(fanout, "share")
+        assert (share["skipped"], share["timeouts"], share["writes"]) == (2, 1, 0)
+
+        release.set()
+        fanout.targets[1].pending.result(timeout=5)
+        assert fanout.write([("messages.json", b"4")])
+        fanout.targets[1].pending.result(timeout=5)
+        assert (tmp_path / "remote" / "messages.json").read_bytes() == b"4"
+        assert _stats(fanout, "share")["writes"] == 2
+        assert _stats(fanout, "local")["writes"] == 4
+    finally:
+        release.set()
+        fanout.close()
+
+def test_remote_failure_does_not_fail_write(tmp_path):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    fanout = OutputFanout(str(tmp_path / "local"), [{"name": "broken", "path": str(blocker / "sub")}])
+    try:
+        assert fanout.write([("messages.json", b"1")])
+        fanout.targets[1].pending.exception(timeout=5)
+        assert _stats(fanout, "broken")["failures"] == 1
+    finally:
+        fanout.close()
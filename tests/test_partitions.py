@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+파티션별 최신 메시지 테스트
+값별 유지 개수 제한, 오래된 메시지 밀어내기, 삭제/금칙어 제외된 메시지 제거 확인
+"""
+
+from data_handler import DataHandler
+from partitions import PartitionIndex, PartitionTopN
+
+def _message(msg_id, created_at, lang="ko"):
+    return {"id": msg_id, "created_at": created_at, "lang": lang}
+
+def _ingest(index: PartitionIndex, *messages):
+    index.ingest(list(messages), [dict(msg) for msg in messages])
+
+def _top_ids(index: PartitionIndex, *values, limit=10):
+    return [msg["id"] for msg in index.top("lang", values, limit)]
+
+def test_each_value_keeps_its_newest_messages():
+    index = PartitionIndex({"lang": 2})
+    _ingest(index, _message(1, "2026-10-19T10:00:01"), _message(2, "2026-10-19T10:00:02"),
+            _message(3, "2026-10-19T10:00:03"), _message(4, "2026-10-19T09:00:00", lang="en"))
+    # 가장 오래된 ko 메시지가 밀려나도 en 파티션은 그대로
+    _ingest(index, _message(0, "2026-10-19T09:59:59"))
+
+    assert _top_ids(index, "ko") == [3, 2]
+    assert _top_ids(index, "en") == [4]
+    assert _top_ids(index, "ko", "en", limit=3) == [3, 2, 4]
+    assert index.get_stats() == {"lang": {"ko": 2, "en": 1}}
+
+def test_changed_value_moves_message_between_partitions():
+    partition = PartitionTopN("lang", 5)
+    partition.add(1, "2026-10-19T10:00:01", {"id": 1, "lang": "ko"})
+    partition.add(1, "2026-10-19T10:00:01", {"id": 1, "lang": "en"})
+    assert partition.get_counts() == {"en": 1}
+
+def test_discard_removes_from_every_field():
+    index = PartitionIndex({"lang": 5, "status": 5})
+    index.ingest([_message(1, "a"), _message(2, "b")],
+                 [{"id": 1, "lang": "ko", "status": "ok"}, {"id": 2, "lang": "ko", "status": "ok"}])
+
+    assert index.discard([2, 99]) == 1
+    assert _top_ids(index, "ko") == [1]
+    assert [msg["id"] for msg in index.top("status", ["ok"], 10)] == [1]
+    assert index.discard([2]) == 0
+
+def test_messages_missing_from_fetch_window_are_removed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = DataHandler()
+    handler.partitions = PartitionIndex({"lang": 10})
+    _ingest(handler.partitions, _message(3, "2026-10-19T10:00:03"), _message(2, "2026-10-19T10:00:02"),
+            _message(1, "2026-10-19T10:00:01"), _message(0, "2026-10-19T10:00:00"))
+
+    # id 2가 원본에서 삭제됨 (id 0은 조회 범위 밖으로 밀려났을 뿐이므로 유지)
+    fetched = [_message(4, "2026-10-19T10:00:04"), _message(3, "2026-10-19T10:00:03"),
+               _message(1, "2026-10-19T10:00:01")]
+    assert handler.discard_missing(fetched, complete=False) == 1
+    assert _top_ids(handler.partitions, "ko") == [3, 1, 0]
+
+def test_limited_fetch_keeps_ties_at_oldest_timestamp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = DataHandler()
+    handler.partitions = PartitionIndex({"lang": 10})
+    _ingest(handler.partitions, _message(1, "2026-10-19T10:00:01"), _message(2, "2026-10-19T10:00:01"))
+
+    fetched = [_message(2, "2026-10-19T10:00:01")]
+    assert handler.discard_missing(fetched, complete=False) == 0  # 조회 한도로 잘렸을 수 있음
+    assert handler.discard_missing(fetched, complete=True) == 1
+    assert _top_ids(handler.partitions, "ko") == [2]
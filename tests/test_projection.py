@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+필드 투영 테스트
+출력 스키마 컴파일 결과와 잘못된 설정(epoch 단위 등)을 컴파일 시점에 거부하는지 확인
+"""
+
+import pytest
+
+from projection import compile_projection
+
+def test_projection_renames_truncates_and_converts_epoch():
+    project = compile_projection([
+        "id",
+        {"name": "preview", "source": "content", "truncate": 3, "default": ""},
+        {"name": "createdAt", "source": "created_at", "epoch": "s"},
+        {"name": "createdAtMs", "source": "created_at", "epoch": "ms"},
+    ])
+    message = {"id": 1, "content": "안녕하세요", "created_at": "2026-10-19T00:00:01.5Z"}
+    assert project([message, {"id": 2}]) == [
+        {"id": 1, "preview": "안녕하", "createdAt": 1792368001, "createdAtMs": 1792368001500},
+        {"id": 2, "preview": "", "createdAt": None, "createdAtMs": None},
+    ]
+    assert project.field_names == ["id", "preview", "createdAt", "createdAtMs"]
+
+@pytest.mark.parametrize("unit", ["MS", "millis", True, None])
+def test_unknown_epoch_unit_is_rejected(unit):
+    with pytest.raises(ValueError, match="epoch"):
+        compile_projection([{"name": "createdAt", "source": "created_at", "epoch": unit}])
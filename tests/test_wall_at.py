@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+특정 시각 월 재구성 도구 테스트
+시각 입력 해석과, 세그먼트 경계 시각의 재구성 결과를 파일로 저장하는지 확인
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+import history
+import wall_at
+from history import SnapshotHistory
+
+def test_parse_time_formats():
+    assert wall_at.parse_time("2026-10-19 19:42") == datetime(2026, 10, 19, 19, 42)
+    assert wall_at.parse_time("2026-10-19T19:42:05") == datetime(2026, 10, 19, 19, 42, 5)
+    today = wall_at.parse_time("19:42")
+    assert (today.date(), today.hour, today.minute) == (datetime.now().date(), 19, 42)
+    with pytest.raises(ValueError):
+        wall_at.parse_time("어제 저녁")
+
+def _run(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["wall_at.py", *args])
+    with pytest.raises(SystemExit) as exited:
+        wall_at.main()
+        raise SystemExit(0)
+    return exited.value.code
+
+def test_reconstructs_wall_at_segment_boundary(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(history.time, "monotonic", lambda: now[0])
+    base = datetime.now().replace(second=0, microsecond=0) - timedelta(hours=1)
+    history_dir = tmp_path / "history"
+    store = SnapshotHistory(str(history_dir), full_interval=60)
+
+    def append(minutes, messages):
+        at = (base + timedelta(minutes=minutes)).isoformat()
+        store.append({"metadata": {"exportedAt": at, "aggregates": {}}, "messages": messages})
+
+    append(0, [{"id": 1, "content": "첫 세그먼트"}])
+    now[0] += 30
+    append(1, [{"id": 1, "content": "첫 세그먼트"}, {"id": 2, "content": "변경분"}])
+    now[0] += 60
+    append(2, [{"id": 3, "content": "둘째 세그먼트"}])
+
+    out = tmp_path / "wall.json"
+    # 둘째 세그먼트 시작 1초 전 → 첫 세그먼트의 변경분까지
+    before = (base + timedelta(minutes=2) - timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S")
+    assert _run(monkeypatch, before, "--out", str(out), "--history-dir", str(history_dir)) == 0
+    snapshot = json.loads(out.read_text(encoding="utf-8"))
+    assert [msg["id"] for msg in snapshot["messages"]] == [1, 2]
+    assert snapshot["metadata"]["exportedAt"] == (base + timedelta(minutes=1)).isoformat()
+
+    # 둘째 세그먼트 시작 시각 정각
+    at = (base + timedelta(minutes=2)).strftime("%Y-%m-%d %H:%M")
+    assert _run(monkeypatch, at, "--out", str(out), "--history-dir", str(history_dir)) == 0
+    assert [msg["id"] for msg in json.loads(out.read_text(encoding="utf-8"))["messages"]] == [3]
+
+def test_time_before_history_exits_with_error(tmp_path, monkeypatch):
+    assert _run(monkeypatch, "2000-01-01 00:00", "--history-dir", str(tmp_path)) == 1
+    assert _run(monkeypatch, "언젠가", "--history-dir", str(tmp_path)) == 2
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+월 서버 테스트
+사이클마다 바뀌는 metadata(저장 시각, 집계)만 다른 스냅샷은 같은 ETag이고 WebSocket 전송도 없는지 확인
+"""
+
+import json
+
+from wall_server import WallServer
+
+class _RecordingClient:
+    """받은 프레임의 본문을 기록하는 클라이언트"""
+
+    def __init__(self):
+        self.payloads = []
+
+    def send(self, frame: bytes) -> bool:
+        length = frame[1] & 0x7F
+        offset = 2 if length < 126 else (4 if length == 126 else 10)
+        self.payloads.append(json.loads(frame[offset:]))
+        return True
+
+    def close(self):
+        pass
+
+def _snapshot(exported_at, messages, **metadata):
+    return {
+        "metadata": {"exportedAt": exported_at, "lastSuccessAt": exported_at,
+                     "aggregates": {"computedAt": exported_at}, "totalCount": len(messages), **metadata},
+        "messages": messages
+    }
+
+def test_same_messages_keep_etag_and_send_nothing():
+    server = WallServer()
+    client = _RecordingClient()
+    messages = [{"id": 1, "content": "안녕"}, {"id": 2, "content": "반가워"}]
+
+    server.publish(_snapshot("2026-10-19T10:00:00", messages))
+    server.add_client(client)
+    _, etag = server.get_snapshot()
+    server.publish(_snapshot("2026-10-19T10:00:05", list(messages)))
+
+    assert server.get_snapshot()[1] == etag
+    assert [payload["type"] for payload in client.payloads] == ["snapshot"]
+    # 본문은 최신 스냅샷 (약한 ETag이므로 저장 시각만 다른 본문은 같은 태그)
+    assert json.loads(server.get_snapshot()[0])["metadata"]["exportedAt"] == "2026-10-19T10:00:05"
+
+def test_changes_are_pushed_with_new_etag():
+    server = WallServer()
+    client = _RecordingClient()
+    server.publish(_snapshot("2026-10-19T10:00:00", [{"id": 1, "content": "안녕"}]))
+    server.add_client(client)
+    _, etag = server.get_snapshot()
+
+    server.publish(_snapshot("2026-10-19T10:00:05", [{"id": 2, "content": "새 메시지"}]))
+    update = client.payloads[-1]
+    assert update["type"] == "update"
+    assert update["added"] == [{"id": 2, "content": "새 메시지"}]
+    assert update["removed"] == [1]
+    assert update["etag"] == server.get_snapshot()[1] != etag
+
+    # 메시지가 같아도 사이클마다 바뀌지 않는 metadata가 바뀌면 전송
+    server.publish(_snapshot("2026-10-19T10:00:10", [{"id": 2, "content": "새 메시지"}], stale=True))
+    assert len(client.payloads) == 3
+    assert client.payloads[-1]["added"] == client.payloads[-1]["removed"] == []
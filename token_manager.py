@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+세션 토큰 관리 모듈
+로그인 응답의 만료 시각을 추적해 만료 전에 백그라운드에서 갱신하고,
+재시작 후에도 쓸 수 있도록 토큰을 안전하게 저장 (Windows: DPAPI 암호화, 그 외: 0600 권한)
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+import logging
+
+from config import (
+    JWT_TOKEN, LOGIN_ID_FIELD, LOGIN_ID_ENV, LOGIN_PASSWORD_ENV,
+    TOKEN_CACHE_PATH, TOKEN_REFRESH_MARGIN, TOKEN_MIN_LOGIN_INTERVAL
+)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+logger = logging.getLogger(__name__)
+
+# config.JWT_TOKEN에 들어 있을 수 있는 자리 표시 값
+_PLACEHOLDER_TOKENS = {"", "None", "your_jwt_token_here", "your_actual_jwt_token_here", "REQUIRED"}
+
+# 로그인 실패 후 백그라운드 재시도 간격(초)
+_REFRESH_RETRY_DELAY = 60
+
+_DPAPI_MARKER = b"DPAPI1\n"
+
+def _dpapi(data: bytes, protect: bool) -> bytes:
+    """Windows DPAPI(현재 사용자 범위)로 암호화/복호화"""
+    import ctypes
+    from ctypes import wintypes
+
+    class DATA_BLOB(ctypes.Structure):
+        _fields_ = [("cbData", wintypes.DWORD), ("pbData", ctypes.POINTER(ctypes.c_char))]
+
+    buffer = ctypes.create_string_buffer(data, len(data))
+    blob_in = DATA_BLOB(len(data), ctypes.cast(buffer, ctypes.POINTER(ctypes.c_char)))
+    blob_out = DATA_BLOB()
+
+    crypt32 = ctypes.windll.crypt32
+    func = crypt32.CryptProtectData if protect else crypt32.CryptUnprotectData
+    if not func(ctypes.byref(blob_in), None, None, None, None, 0, ctypes.byref(blob_out)):
+        raise OSError("DPAPI 처리 실패")
+    try:
+        return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally:
+        ctypes.windll.kernel32.LocalFree(blob_out.pbData)
+
+def _parse_expiry(value) -> Optional[float]:
+    """만료 시각(ISO 8601, 유닉스 시간 초/밀리초) → 유닉스 시간(초)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e12 else float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def _jwt_expiry(token: str) -> Optional[float]:
+    """JWT payload의 exp 클레임 (JWT가 아니면 None)"""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        return _parse_expiry(json.loads(base64.urlsafe_b64decode(payload)).get("exp"))
+    except (ValueError, AttributeError):
+        return None
+
+class TokenManager:
+    """세션 토큰 보관/갱신 (login_func: 로그인 요청 본문 → 응답 JSON 또는 None)"""
+
+    def __init__(self, login_func: Callable[[Dict], Optional[Dict]],
+                 cache_path: str = TOKEN_CACHE_PATH, refresh_margin: float = TOKEN_REFRESH_MARGIN,
+                 min_login_interval: float = TOKEN_MIN_LOGIN_INTERVAL):
+        self.login_func = login_func
+        self.cache_path = cache_path
+        self.refresh_margin = refresh_margin
+        self.min_login_interval = min_login_interval
+        self.token = None
+        self.expires_at = None  # 유닉스 시간(초), 모르면 None
+        self.refresh_count = 0
+        self._received_at = None  # 토큰을 받은(로드한) 시각, 수명 계산용
+        self._last_login_at = None  # 마지막 자동 로그인 시도 시각 (time.monotonic 기준)
+
+        self._login_id = os.environ.get(LOGIN_ID_ENV)
+        self._password = os.environ.get(LOGIN_PASSWORD_ENV)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+        if JWT_TOKEN not in _PLACEHOLDER_TOKENS and JWT_TOKEN is not None:
+            self._set_token(JWT_TOKEN, None)
+        self._load()
+
+    @property
+    def has_credentials(self) -> bool:
+        """자동 로그인에 쓸 계정 정보가 있는지 여부"""
+        return bool(self._login_id and self._password)
+
+    def get_token(self) -> Optional[str]:
+        return self.token
+
+    def _set_token(self, token: str, expires_at: Optional[float]):
+        self.token = token
+        self.expires_at = expires_at if expires_at is not None else _jwt_expiry(token)
+        self._received_at = time.time()
+
+    # ------------------------------------------------------------------
+    # 저장 / 로드
+    # ------------------------------------------------------------------
+    def _load(self):
+        """저장된 토큰 로드 (만료되었거나 읽을 수 없으면 무시)"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = f.read()
+            if data.startswith(_DPAPI_MARKER):
+                data = _dpapi(data[len(_DPAPI_MARKER):], protect=False)
+            cached = json.loads(data.decode('utf-8'))
+        except Exception as e:
+            logger.warning(f"⚠️ 저장된 세션 토큰을 읽을 수 없습니다: {e}")
+            return
+
+        expires_at = cached.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            logger.info("🔑 저장된 세션 토큰이 만료되어 사용하지 않습니다")
+            return
+        self._set_token(cached.get("token"), expires_at)
+        logger.info(f"🔑 저장된 세션 토큰 로드 (만료: {self._format_expiry()})")
+
+    def _save(self):
+        """토큰 저장 (Windows: DPAPI 암호화, 그 외: 소유자만 읽기/쓰기)"""
+        if not self.cache_path:
+            return
+        data = json.dumps({"token": self.token, "expires_at": self.expires_at}).encode('utf-8')
+        try:
+            cache_dir = os.path.dirname(self.cache_path)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+
+            if os.name == "nt":
+                data = _DPAPI_MARKER + _dpapi(data, protect=True)
+
+            tmp_path = f"{self.cache_path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"⚠️ 세션 토큰 저장 실패: {e}")
+
+    def _format_expiry(self) -> str:
+        if self.expires_at is None:
+            return "알 수 없음"
+        return datetime.fromtimestamp(self.expires_at).strftime("%Y-%m-%d %H:%M:%S")
+
+    # ------------------------------------------------------------------
+    # 로그인 / 갱신
+    # ------------------------------------------------------------------
+    def login(self, login_id: Optional[str] = None, password: Optional[str] = None) -> bool:
+        """로그인해 새 토큰 발급 (인자가 없으면 환경 변수의 계정 정보 사용)"""
+        if login_id and password:
+            self._login_id, self._password = login_id, password
+        if not self.has_credentials:
+            logger.warning(f"⚠️ 로그인 정보가 없습니다 ({LOGIN_ID_ENV}/{LOGIN_PASSWORD_ENV} 환경 변수 또는 .env 확인)")
+            return False
+
+        logger.info(f"🔐 사용자 로그인 시도: {self._login_id}")
+        response = self.login_func({LOGIN_ID_FIELD: self._login_id, "password": self._password})
+        if not response:
+            logger.error("❌ 로그인 실패!")
+            return False
+
+        # 로그인 응답 형식: {"success", "token", "expires_at"} 또는 {"ok", "data": {"token", "expiresIn"}}
+        data = response.get("data") if isinstance(response.get("data"), dict) else {}
+        token = response.get("token") or data.get("token")
+        if not token or not (response.get("success") or response.get("ok")):
+            logger.error(f"❌ 로그인 실패: {response.get('error', '토큰 없음')}")
+            return False
+
+        expires_at = _parse_expiry(response.get("expires_at") or data.get("expires_at"))
+        expires_in = response.get("expiresIn") or data.get("expiresIn")
+        if expires_at is None and expires_in:
+            expires_at = time.time() + float(expires_in)
+
+        self._set_token(token, expires_at)
+        self.refresh_count += 1
+        self._save()
+        self._wake_event.set()  # 백그라운드 갱신 일정 재계산
+
+        user = response.get("user") or data.get("user") or {}
+        logger.info(f"✅ 로그인 성공! 세션 토큰 갱신됨 (사용자: {user.get('username', self._login_id)}, "
+                    f"만료: {self._format_expiry()})")
+        return True
+
+    def _seconds_until_login_allowed(self) -> float:
+        """자동 로그인 최소 간격까지 남은 시간(초)"""
+        if self._last_login_at is None:
+            return 0.0
+        return max(self._last_login_at + self.min_login_interval - time.monotonic(), 0.0)
+
+    def _auto_login(self) -> bool:
+        """자동 로그인 (갱신/재인증용, 최소 간격 기록)"""
+        self._last_login_at = time.monotonic()
+        return self.login()
+
+    def refresh(self, failed_token: Optional[str]) -> bool:
+        """401/419 응답 후 재인증 (다른 스레드가 이미 갱신했다면 로그인 없이 True)"""
+        with self._lock:
+            if self.token is not None and self.token != failed_token:
+                return True
+            wait = self._seconds_until_login_allowed()
+            if wait > 0:
+                logger.warning(f"⚠️ 직전 로그인 후 {self.min_login_interval}초가 지나지 않아 재로그인하지 않습니다 "
+                               f"({wait:.0f}초 후 가능)")
+                return False
+            return self._auto_login()
+
+    def _seconds_until_refresh(self) -> Optional[float]:
+        """만료 전 갱신까지 남은 시간 (여유 시간은 토큰 수명의 절반 이하, 최소 로그인 간격 이상)"""
+        if self.token is None:
+            return self._seconds_until_login_allowed()
+        if self.expires_at is None:
+            return None
+        margin = self.refresh_margin
+        if self._received_at is not None:
+            margin = min(margin, (self.expires_at - self._received_at) / 2)
+        return max(self.expires_at - margin - time.time(), self._seconds_until_login_allowed())
+
+    def _refresh_loop(self):
+        """만료 TOKEN_REFRESH_MARGIN초(수명이 짧으면 수명의 절반) 전에 미리 갱신"""
+        while not self._stop_event.is_set():
+            delay = self._seconds_until_refresh()
+            if delay is None or delay > 0:
+                self._wake_event.wait(delay)
+                self._wake_event.clear()
+                continue
+
+            with self._lock:
+                delay = self._seconds_until_refresh()
+                success = delay is None or delay > 0 or self._auto_login()
+            if not success:
+                self._stop_event.wait(_REFRESH_RETRY_DELAY)
+
+    def start(self):
+        """백그라운드 갱신 시작 (계정 정보가 있을 때만)"""
+        if not self.has_credentials or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._refresh_loop, name="TokenRefresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def get_status(self) -> Dict:
+        return {
+            "has_token": self.token is not None,
+            "expires_at": self._format_expiry() if self.token else None,
+            "refresh_count": self.refresh_count,
+            "auto_login": self.has_credentials
+        }
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+요청 추적 모듈
+API 요청별 구조화된 span을 링 버퍼에 기록하고, 일부만 샘플링해 로그로 출력
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+from config import TRACE_BUFFER_SIZE, TRACE_SAMPLE_RATE, TRACE_DUMP_DIR, TRACE_DUMP_MIN_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+class RequestTracer:
+    """요청 span 링 버퍼 (최근 N개만 보관, 오류 시 전체 덤프)"""
+
+    def __init__(self, capacity: int = TRACE_BUFFER_SIZE,
+                 sample_rate: float = TRACE_SAMPLE_RATE,
+                 dump_dir: str = TRACE_DUMP_DIR):
+        self.sample_rate = sample_rate
+        self.dump_dir = dump_dir
+        self.total_spans = 0
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self._last_dump = None
+
+    def record(self, method: str, endpoint: str, status: Optional[int] = None,
+               nbytes: int = 0, latency: float = 0.0, attempt: int = 1,
+               error: Optional[str] = None) -> Dict:
+        """요청 1건(시도 1회)의 span 기록"""
+        span = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "method": method,
+            "endpoint": endpoint,
+            "status": status,
+            "bytes": nbytes,
+            "latencyMs": round(latency * 1000, 1),
+            "attempt": attempt,
+            "error": error
+        }
+
+        with self._lock:
+            self._spans.append(span)
+            self.total_spans += 1
+
+        # 샘플링된 span만 로그로 출력
+        if self.sample_rate > 0 and self._random.random() < self.sample_rate:
+            logger.info(self._format_span(span))
+
+        return span
+
+    @staticmethod
+    def _format_span(span: Dict) -> str:
+        """span 한 줄 요약"""
+        result = span["status"] if span["status"] is not None else span["error"]
+        return (f"🧭 {span['method']} {span['endpoint']} → {result} "
+                f"{span['bytes'] / 1024:.1f}KB {span['latencyMs']:.0f}ms (시도 {span['attempt']})")
+
+    def snapshot(self) -> List[Dict]:
+        """현재 링 버퍼의 span 목록 (오래된 순)"""
+        with self._lock:
+            return list(self._spans)
+
+    def dump(self, reason: str) -> Optional[str]:
+        """링 버퍼 전체를 JSON Lines 파일로 덤프 (TRACE_DUMP_MIN_INTERVAL 간격으로 제한)"""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_dump is not None and now - self._last_dump < TRACE_DUMP_MIN_INTERVAL:
+                return None
+            self._last_dump = now
+            spans = list(self._spans)
+
+        if not spans:
+            return None
+
+        try:
+            if not os.path.exists(self.dump_dir):
+                os.makedirs(self.dump_dir)
+
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            filepath = os.path.join(self.dump_dir, f"trace_{timestamp}.jsonl")
+            with open(filepath, 'w', encoding='utf-8') as f:
+                for span in spans:
+                    f.write(json.dumps(span, ensure_ascii=False) + "\n")
+
+            logger.warning(f"🧭 요청 추적 덤프 ({reason}): 최근 {len(spans)}건 → {filepath}")
+            return filepath
+
+        except Exception as e:
+            logger.error(f"❌ 요청 추적 덤프 실패: {e}")
+            return None
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+특정 시각의 메시지 월 재구성 도구
+스냅샷 이력(HISTORY_DIR)에서 해당 시각에 messages.json에 있던 내용을 복원
+
+사용법:
+    python wall_at.py "2025-10-03 19:42" [--out wall_1942.json] [--history-dir ./history]
+    python wall_at.py 19:42   # 오늘 19:42
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+
+from config import HISTORY_DIR
+from history import snapshot_at
+from logger import get_logger
+
+_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%H:%M:%S", "%H:%M")
+
+def parse_time(value: str) -> datetime:
+    """시각 문자열 → datetime (날짜가 없으면 오늘)"""
+    for fmt in _FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if "%Y" not in fmt:
+            parsed = datetime.combine(datetime.now().date(), parsed.time())
+        return parsed
+    raise ValueError(f"시각 형식을 알 수 없습니다: {value} (예: 2025-10-03 19:42)")
+
+def main():
+    parser = argparse.ArgumentParser(description="특정 시각에 messages.json에 있던 내용을 이력에서 재구성합니다")
+    parser.add_argument("time", help="시각 (YYYY-MM-DD HH:MM[:SS] 또는 HH:MM[:SS])")
+    parser.add_argument("--out", help="저장할 파일 (생략 시 화면 출력)")
+    parser.add_argument("--history-dir", default=HISTORY_DIR, help="이력 폴더")
+    args = parser.parse_args()
+
+    logger = get_logger("WallAt")
+    try:
+        at = parse_time(args.time)
+    except ValueError as e:
+        logger.error_emoji(str(e))
+        sys.exit(2)
+
+    started = time.perf_counter()
+    snapshot = snapshot_at(at.isoformat(), args.history_dir)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if snapshot is None:
+        logger.error_emoji(f"{at.isoformat(sep=' ')} 시점의 이력이 없습니다 ({args.history_dir})")
+        sys.exit(1)
+
+    logger.success(f"{at.isoformat(sep=' ')} 시점 재구성 완료: {len(snapshot['messages'])}개 메시지 "
+                   f"(기준 저장 시각 {snapshot['metadata'].get('exportedAt')}, {elapsed_ms:.0f}ms)")
+
+    output = json.dumps(snapshot, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output)
+        logger.info(f"💾 저장 완료: {args.out}")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
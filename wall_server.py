@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+월 서버 모듈
+현재 메시지 스냅샷을 로컬 HTTP(ETag)로 제공하고, 변경분을 WebSocket으로 즉시 전송
+"""
+
+import base64
+import hashlib
+import json
+import queue
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+import logging
+
+from config import WALL_SERVER_HOST, WALL_SERVER_PORT, WALL_ALLOWED_ORIGINS
+from history import stable_metadata
+
+logger = logging.getLogger(__name__)
+
+# RFC 6455 핸드셰이크 GUID
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# 클라이언트별 미전송 메시지 한도 (초과 시 느린 클라이언트로 보고 연결 종료)
+_CLIENT_QUEUE_SIZE = 64
+
+# 클라이언트 → 서버 프레임 최대 크기 (ping/close만 받으므로 작게, 초과 시 연결 종료)
+_MAX_CLIENT_FRAME = 64 * 1024
+
+def _encode_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """서버 → 클라이언트 WebSocket 프레임 (마스킹 없음)"""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 65536:
+        header += bytes([126]) + struct.pack("!H", length)
+    else:
+        header += bytes([127]) + struct.pack("!Q", length)
+    return header + payload
+
+def _read_frame(rfile):
+    """클라이언트 → 서버 WebSocket 프레임 읽기 (opcode, payload), 연결 종료 또는 비정상 프레임이면 None"""
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None
+
+    opcode = head[0] & 0x0F
+    masked = head[1] & 0x80
+    length = head[1] & 0x7F
+    if length >= 126:
+        size = 2 if length == 126 else 8
+        extended = rfile.read(size)
+        if len(extended) < size:
+            return None
+        length = struct.unpack("!H" if size == 2 else "!Q", extended)[0]
+    if length > _MAX_CLIENT_FRAME:
+        logger.warning(f"⚠️ WebSocket 프레임이 너무 큽니다 ({length}바이트): 연결 종료")
+        return None
+
+    mask = rfile.read(4) if masked else b""
+    payload = rfile.read(length)
+    if len(payload) < length or len(mask) < (4 if masked else 0):
+        return None
+    if masked:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+class _WallClient:
+    """WebSocket 클라이언트 1개 (전송 큐 + 전송 스레드)"""
+
+    def __init__(self, handler: BaseHTTPRequestHandler):
+        self.handler = handler
+        self.outbox = queue.Queue(maxsize=_CLIENT_QUEUE_SIZE)
+        self.closed = threading.Event()
+
+    def send(self, frame: bytes) -> bool:
+        """전송 예약 (큐가 가득 차면 False)"""
+        try:
+            self.outbox.put_nowait(frame)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        """연결 종료 요청 (전송 스레드를 깨움)"""
+        self.closed.set()
+        try:
+            self.outbox.put_nowait(None)
+        except queue.Full:
+            pass  # 전송 스레드가 큐를 비우면서 closed를 확인함
+
+class _WallRequestHandler(BaseHTTPRequestHandler):
+    """HTTP GET(스냅샷) 및 WebSocket(변경분 푸시) 처리"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(f"🌐 {self.address_string()} {format % args}")
+
+    def _origin_allowed(self) -> bool:
+        """다른 웹 페이지의 접근 차단 (Origin 헤더가 없는 앱, 이 서버 주소, WALL_ALLOWED_ORIGINS만 허용)"""
+        origin = self.headers.get("Origin")
+        if origin is None or origin in WALL_ALLOWED_ORIGINS:
+            return True
+        port = self.server.server_address[1]
+        return origin in (f"http://127.0.0.1:{port}", f"http://localhost:{port}")
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+
+        if not self._origin_allowed():
+            logger.warning(f"⚠️ 허용되지 않은 Origin의 접근 차단: {self.headers.get('Origin')} {path}")
+            self.send_error(403)
+        elif path == "/ws" and self.headers.get("Upgrade", "").lower() == "websocket":
+            self._handle_websocket()
+        elif path in ("/", "/messages.json"):
+            self._handle_snapshot()
+        else:
+            self.send_error(404)
+
+    def _handle_snapshot(self):
+        """현재 스냅샷 반환 (If-None-Match가 같으면 304)"""
+        body, etag = self.server.wall.get_snapshot()
+        if body is None:
+            self.send_error(503, "아직 수집된 스냅샷이 없습니다")
+            return
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        if self.headers.get("Origin") in WALL_ALLOWED_ORIGINS:
+            self.send_header("Access-Control-Allow-Origin", self.headers["Origin"])
+            self.send_header("Vary", "Origin")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle_websocket(self):
+        """WebSocket 핸드셰이크 후 연결 종료까지 변경분 전송"""
+        key = self.headers.get("Sec-WebSocket-Key")
+        if not key:
+            self.send_error(400)
+            return
+
+        accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.close_connection = True
+
+        client = _WallClient(self)
+        threading.Thread(target=self._read_loop, args=(client,), daemon=True).start()
+        self.server.wall.add_client(client)
+
+        try:
+            while True:
+                frame = client.outbox.get()
+                if frame is None or client.closed.is_set():
+                    break
+                self.wfile.write(frame)
+                self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            self.server.wall.remove_client(client)
+            try:
+                self.wfile.write(_encode_frame(b"", opcode=0x8))
+            except OSError:
+                pass
+
+    def _read_loop(self, client: _WallClient):
+        """클라이언트 프레임 수신 (ping 응답, close 감지)"""
+        try:
+            while not client.closed.is_set():
+                frame = _read_frame(self.rfile)
+                if frame is None:
+                    break
+                opcode, payload = frame
+                if opcode == 0x8:  # close
+                    break
+                if opcode == 0x9:  # ping → pong
+                    client.send(_encode_frame(payload, opcode=0xA))
+        except OSError:
+            pass
+        finally:
+            client.close()
+
+class WallServer:
+    """현재 월 스냅샷을 메모리에서 제공하는 로컬 서버"""
+
+    def __init__(self, host: str = WALL_SERVER_HOST, port: int = WALL_SERVER_PORT):
+        self.host = host
+        self.port = port
+        self._lock = threading.Lock()
+        self._clients: List[_WallClient] = []
+        self._body = None
+        self._etag = None
+        self._messages_by_id: Dict = {}
+        self._metadata: Dict = {}  # 마지막 스냅샷의 metadata (사이클마다 바뀌는 항목 제외)
+        self._server = None
+
+    def start(self) -> bool:
+        """서버 시작 (백그라운드 스레드)"""
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), _WallRequestHandler)
+            self._server.daemon_threads = True
+            self._server.wall = self
+            threading.Thread(target=self._server.serve_forever, name="WallServer", daemon=True).start()
+            logger.info(f"🌐 월 서버 시작: http://{self.host}:{self.port}/messages.json, ws://{self.host}:{self.port}/ws")
+            return True
+        except OSError as e:
+            logger.error(f"❌ 월 서버 시작 실패: {e}")
+            self._server = None
+            return False
+
+    def stop(self):
+        """서버 종료 및 WebSocket 연결 정리"""
+        with self._lock:
+            clients = list(self._clients)
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def get_snapshot(self):
+        """(직렬화된 스냅샷, ETag)"""
+        with self._lock:
+            return self._body, self._etag
+
+    def add_client(self, client: _WallClient):
+        """새 WebSocket 클라이언트 등록 (현재 스냅샷 전체를 먼저 전송)"""
+        with self._lock:
+            self._clients.append(client)
+            body = self._body
+        if body is not None:
+            client.send(_encode_frame(b'{"type":"snapshot","data":' + body + b'}'))
+        logger.info(f"🌐 WebSocket 클라이언트 접속 (총 {len(self._clients)}개)")
+
+    def remove_client(self, client: _WallClient):
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+                logger.info(f"🌐 WebSocket 클라이언트 종료 (총 {len(self._clients)}개)")
+
+    def publish(self, snapshot: Dict):
+        """새 스냅샷 반영 (메시지나 metadata가 바뀐 경우에만 WebSocket으로 변경분 전송)"""
+        messages = snapshot.get("messages", [])
+        messages_by_id = {msg.get("id"): msg for msg in messages}
+        metadata = snapshot.get("metadata", {})
+        stable = stable_metadata(metadata)
+
+        with self._lock:
+            previous = self._messages_by_id
+            added = [msg for msg_id, msg in messages_by_id.items() if msg_id not in previous]
+            changed = [msg for msg_id, msg in messages_by_id.items()
+                       if msg_id in previous and previous[msg_id] != msg]
+            removed = [msg_id for msg_id in previous if msg_id not in messages_by_id]
+            modified = bool(added or changed or removed) or stable != self._metadata
+
+            # 약한 ETag: 메시지 + 사이클마다 바뀌는 항목(저장 시각, 집계)을 뺀 metadata 기준
+            # (내용이 같은 사이클 사이에는 같은 ETag → If-None-Match에 304)
+            tagged = {"metadata": stable, "messages": messages}
+            digest = hashlib.sha1(json.dumps(tagged, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+            etag = f'W/"{digest.hexdigest()[:16]}"'
+
+            self._etag = etag
+            self._body = json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            self._messages_by_id = messages_by_id
+            self._metadata = stable
+            clients = list(self._clients)
+
+        if not modified or not clients:
+            return
+
+        update = json.dumps({
+            "type": "update",
+            "etag": etag,
+            "metadata": metadata,
+            "added": added,
+            "changed": changed,
+            "removed": removed
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        frame = _encode_frame(update)
+
+        for client in clients:
+            if not client.send(frame):
+                logger.warning("⚠️ WebSocket 클라이언트 응답 지연으로 연결 종료")
+                client.close()